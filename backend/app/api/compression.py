@@ -0,0 +1,33 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Never gzip these: event streams must reach the client frame by frame, and
+# archives (the export's .gz download) are already compressed
+SKIP_CONTENT_TYPES = {"text/event-stream", "application/gzip", "application/zip"}
+
+
+class _SelectiveResponder(GZipResponder):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.passthrough = content_type.split(";")[0].strip() in SKIP_CONTENT_TYPES
+        if self.passthrough:
+            await self.send(message)
+        else:
+            await super().send_with_gzip(message)
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """Starlette's GZipMiddleware, minus SKIP_CONTENT_TYPES"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _SelectiveResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -1,58 +1,186 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple, Union
+from datetime import date, datetime, time
+import hashlib
 
-from ..models.database import get_db
+from ..models.database import get_async_db, SessionLocal
 from ..models.schemas import ContentResponse, ContentListResponse, APIResponse
-from ..services.content_service import ContentService
+from ..services.content_service import ContentService, AsyncContentService
+from ..services.pagination import InvalidCursor
+from ..services.export import EXPORT_FORMATS, SERIALIZERS, encode, gzip_stream
+from ..services.fast_json import FastJSONResponse, dumps
 
 router = APIRouter()
 
+# Per-user data: browsers may keep it but must revalidate (cheap with the ETag)
+CACHE_CONTROL = "private, no-cache"
+
+def _etag(*parts) -> str:
+    """Weak ETag from a data version plus whatever else shapes the response.
+
+    Weak because SelectiveGZipMiddleware may gzip the body after the tag is
+    set: the gzip and identity bytes differ, but they carry the same data.
+    """
+    return 'W/"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:24] + '"'
+
+def _not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """A 304 when If-None-Match already has this ETag, else None"""
+    header = request.headers.get("if-none-match")
+    if not etag or not header:
+        return None
+    # Weak comparison (RFC 9110 §13.1.2): W/ is ignored on both sides
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag.removeprefix("W/") in tags or "*" in tags:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+def _cache_headers(etag: Optional[str]) -> dict:
+    headers = {"Cache-Control": CACHE_CONTROL}
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+def _fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """?fields= → the ContentResponse fields to return (id always first)"""
+    if not fields:
+        return ContentService.CARD_FIELDS
+    if fields.strip() == "all":
+        return ContentService.RESPONSE_FIELDS
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ContentService.RESPONSE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ("id",) + tuple(dict.fromkeys(name for name in names if name != "id"))
+
 @router.get("/", response_model=ContentListResponse)
 async def get_contents(
+    request: Request,
     user_phone: str = Query(..., description="User phone number"),
     category: Optional[str] = Query(None, description="Filter by category"),
     search: Optional[str] = Query(None, description="Search query"),
-    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    mode: str = Query("text", pattern="^(text|semantic)$", description="Search mode: text (full-text) or semantic (similar meaning)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    skip: int = Query(0, ge=0, description="Number of items to skip (offset paging, prefer cursor)"),
     limit: int = Query(50, ge=1, le=100, description="Number of items to return"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, or 'all' (default: what the cards show)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get user's saved content"""
+    """
+    Get user's saved content. By default only the card fields (ContentCard)
+    are loaded and returned; `fields=` picks others (`all` = every
+    ContentResponse field). The body is encoded directly, not through the
+    response model, which documents the shape.
+    """
     try:
-        content_service = ContentService(db)
+        selected = _fields(fields)
+        content_service = AsyncContentService(db)
+        version = await content_service.user_version(user_phone)
+        etag = version and _etag("list", user_phone, version, sorted(request.query_params.multi_items()))
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+        next_cursor = None
+        # Whole rows only when every field is wanted
+        projection = None if selected == ContentService.RESPONSE_FIELDS else selected
         
-        if search:
-            contents = content_service.search_contents(user_phone, search, skip, limit)
+        if search and mode == "semantic":
+            contents = await content_service.semantic_search(user_phone, search, limit, projection)
+        elif search:
+            contents = await content_service.search_contents(user_phone, search, skip, limit, projection)
+        elif cursor or not skip:
+            contents, next_cursor = await content_service.list_contents(user_phone, category, cursor, limit, projection)
         elif category:
-            contents = content_service.get_contents_by_category(user_phone, category, skip, limit)
+            contents = await content_service.get_contents_by_category(user_phone, category, skip, limit, projection)
         else:
-            contents = content_service.get_user_contents(user_phone, skip, limit)
+            contents = await content_service.get_user_contents(user_phone, skip, limit, projection)
         
-        total = len(contents) if len(contents) < limit else None
+        if search and mode == "semantic":
+            total = len(contents)
+        else:
+            total = await content_service.count_contents(user_phone, category=None if search else category, query=search)
         
-        return ContentListResponse(
-            contents=[ContentResponse.from_orm(content) for content in contents],
-            total=total or 0,
-            page=skip // limit + 1,
-            size=limit
-        )
+        # Plain dicts straight to JSON bytes — no per-row Pydantic model
+        body = dumps({
+            "contents": [ContentService.as_dict(content, selected) for content in contents],
+            "total": total,
+            "page": skip // limit + 1,
+            "size": limit,
+            "next_cursor": next_cursor,
+        })
+        return FastJSONResponse(body, headers=_cache_headers(etag))
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/export")
+async def export_contents(
+    user_phone: str = Query(..., description="User phone number"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv|json)$", description="ndjson, csv or json"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    platform: Optional[str] = Query(None, description="Filter by platform"),
+    since: Optional[Union[datetime, date]] = Query(None, description="Saved at or after (ISO 8601 date or datetime)"),
+    until: Optional[Union[datetime, date]] = Query(None, description="Saved before (ISO 8601 date or datetime)"),
+    gzip: bool = Query(False, description="Gzip the file on the fly (.gz download)")
+):
+    """
+    Stream the user's whole library, oldest first. Rows are fetched in chunks
+    and serialized as they arrive, so memory stays flat for any library size.
+    """
+    # A bare date means midnight (UTC) of that day
+    since, until = (
+        datetime.combine(value, time.min) if type(value) is date else value
+        for value in (since, until)
+    )
+
+    def rows():
+        # Own session: it must outlive this handler while the body streams
+        db = SessionLocal()
+        try:
+            yield from ContentService(db).iter_export_rows(user_phone, category, platform, since, until)
+        finally:
+            db.close()
+
+    media_type, extension = EXPORT_FORMATS[format]
+    body = encode(SERIALIZERS[format](ContentService.EXPORT_COLUMNS, rows()))
+    filename = f"social-saver-export.{extension}"
+    if gzip:
+        body, media_type, filename = gzip_stream(body), "application/gzip", f"{filename}.gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content(
     content_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific content by ID"""
     try:
-        content_service = ContentService(db)
-        content = content_service.get_content_by_id(content_id)
-        
+        content_service = AsyncContentService(db)
+        version = await content_service.content_version(content_id)
+        if not version:
+            raise HTTPException(status_code=404, detail="Content not found")
+        etag = _etag("content", content_id, version)
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        content = await content_service.get_content_by_id(content_id)
         if not content:
             raise HTTPException(status_code=404, detail="Content not found")
         
+        response.headers.update(_cache_headers(etag))
         return ContentResponse.from_orm(content)
         
     except HTTPException:
@@ -60,15 +188,34 @@ async def get_content(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{content_id}/similar", response_model=List[ContentResponse])
+async def get_similar_contents(
+    content_id: int,
+    limit: int = Query(10, ge=1, le=50, description="Number of similar saves to return"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The user's saves most similar to this one (local embeddings, no network)"""
+    try:
+        content_service = AsyncContentService(db)
+        contents = await content_service.similar_contents(content_id, limit)
+        if contents is None:
+            raise HTTPException(status_code=404, detail="Content not found")
+        return [ContentResponse.from_orm(content) for content in contents]
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/{content_id}", response_model=APIResponse)
 async def delete_content(
     content_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete content"""
     try:
-        content_service = ContentService(db)
-        success = content_service.delete_content(content_id)
+        content_service = AsyncContentService(db)
+        success = await content_service.delete_content(content_id)
         
         if not success:
             raise HTTPException(status_code=404, detail="Content not found")
@@ -86,13 +233,41 @@ async def delete_content(
 @router.get("/stats/{user_phone}", response_model=dict)
 async def get_user_stats(
     user_phone: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user content statistics"""
     try:
-        content_service = ContentService(db)
-        stats = content_service.get_user_stats(user_phone)
+        content_service = AsyncContentService(db)
+        version = await content_service.user_version(user_phone)
+        etag = version and _etag("stats", user_phone, version)
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        stats = await content_service.get_user_stats(user_phone)
+        if not etag:
+            # First read built the rollup — tag it from now on
+            version = await content_service.user_version(user_phone)
+            etag = version and _etag("stats", user_phone, version)
+        response.headers.update(_cache_headers(etag))
         return stats
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stats/{user_phone}/timeseries", response_model=dict)
+async def get_user_timeseries(
+    user_phone: str,
+    days: int = Query(30, ge=1, le=365, description="Number of days, ending today (UTC)"),
+    category: Optional[str] = Query(None, description="Only this category"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Saves per day per category over the last N days"""
+    try:
+        content_service = AsyncContentService(db)
+        return await content_service.get_user_timeseries(user_phone, days, category)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import contextlib
+import json
+import os
+import logging
+
+from ..services.events import event_broker
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))   # seconds between keep-alive comments
+EVENTS_RETRY_MS  = 3000                                         # client reconnect delay
+
+def _frame(event) -> str:
+    return f"event: {event.type}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n"
+
+async def _stream(request: Request, user_phone: str):
+    yield f"retry: {EVENTS_RETRY_MS}\n: connected\n\n"
+    events = event_broker.subscribe(user_phone)
+    pending = None
+    try:
+        while not await request.is_disconnected():
+            if pending is None:
+                pending = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=EVENTS_HEARTBEAT)
+            if done:
+                event, pending = pending.result(), None
+                yield _frame(event)
+            else:
+                # Keeps proxies from closing an idle connection
+                yield ": ping\n\n"
+    finally:
+        if pending is not None:
+            pending.cancel()
+            with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                await pending
+        await events.aclose()
+
+@router.get("/")
+async def stream_events(request: Request, user_phone: str = Query(..., description="User phone number")):
+    """
+    Server-Sent Events stream of one user's changes: content-created,
+    content-updated, content-deleted, stats-changed, and resync when the
+    client fell behind and should reload.
+    """
+    return StreamingResponse(
+        _stream(request, user_phone),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+import os
+import logging
+
+from ..services.bulk_import import ImportManager, read_links
+from .whatsapp import build_content
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+IMPORT_MAX_LINKS  = int(os.getenv("IMPORT_MAX_LINKS", "5000"))
+IMPORT_CHUNK_SIZE = 64 * 1024
+
+import_manager = ImportManager(
+    build_content,
+    concurrency=int(os.getenv("IMPORT_CONCURRENCY", "4")),
+    batch_size=int(os.getenv("IMPORT_BATCH_SIZE", "50")),
+)
+
+async def _chunks(file: UploadFile):
+    while True:
+        chunk = await file.read(IMPORT_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+@router.post("/", status_code=202, response_model=dict)
+async def start_import(
+    user_phone: str = Query(..., description="User phone number"),
+    file: UploadFile = File(..., description="WhatsApp chat export (.txt) or a plain list of links"),
+):
+    """
+    Bulk-import links from an uploaded file. Links are read with the same
+    rules as a WhatsApp message (URL + optional #category on the same line),
+    de-duplicated, then scraped, enriched and saved in the background.
+    Only the first IMPORT_MAX_LINKS links are imported; the rest are counted
+    in `truncated`. Poll GET /api/imports/{job_id} for progress.
+    """
+    try:
+        links, duplicates, truncated = await read_links(_chunks(file), IMPORT_MAX_LINKS)
+    finally:
+        await file.close()
+
+    if not links:
+        raise HTTPException(status_code=400, detail="No links found in the uploaded file")
+
+    job = import_manager.start(user_phone, links, duplicates, truncated)
+    logger.info(f"Import {job.id}: {job.total} links for {user_phone} ({duplicates} duplicates dropped)")
+    if truncated:
+        logger.warning(f"Import {job.id}: {truncated} links past IMPORT_MAX_LINKS={IMPORT_MAX_LINKS} not imported")
+    return job.to_dict()
+
+@router.get("/{job_id}", response_model=dict)
+async def get_import(job_id: str):
+    """Progress of a bulk import"""
+    job = import_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job.to_dict()
@@ -0,0 +1,78 @@
+import time
+from typing import Callable, Iterator
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.metrics import Sample, http_request_seconds, registry
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4"   # Starlette appends the charset
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of every registered metric"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request into http_request_seconds, labelled by the
+    matched route template (not the raw path) to keep label cardinality
+    bounded. Event streams are skipped — their duration is a connection
+    lifetime, not a latency.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status  = 500
+        stream  = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status, stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                stream = Headers(raw=message["headers"]).get("content-type", "").startswith("text/event-stream")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if not stream:
+                route = scope.get("route")
+                http_request_seconds.labels(
+                    scope["method"], getattr(route, "path", "unmatched"), str(status),
+                ).observe(time.perf_counter() - started)
+
+
+def status_collector(snapshot: Callable[[], dict]) -> Callable[[], Iterator[Sample]]:
+    """
+    Expose the /status counters (cache hits, queue depths, quotas, …) as
+    metrics read at scrape time: section.key → <section>_<key>, and nested
+    per-provider dicts become a `name` label. Non-numeric values are skipped.
+    """
+    def sample(section: str, key: str, value, labels: dict):
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            yield f"{section}_{key}", f"{key} from /status {section}", labels, value
+
+    def collect() -> Iterator[Sample]:
+        for section, values in snapshot().items():
+            for key, value in values.items():
+                if isinstance(value, dict):
+                    for field, inner in value.items():
+                        yield from sample(section, field, inner, {"name": key})
+                else:
+                    yield from sample(section, key, value, {})
+    return collect
@@ -1,24 +1,55 @@
 from fastapi import APIRouter, Request, Form
 from fastapi.responses import Response
 from twilio.twiml.messaging_response import MessagingResponse
-from sqlalchemy.orm import Session
-import re
-import requests
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
+import time
 import logging
-from typing import Optional
+import httpx
+from typing import Optional, Tuple
 
-from ..models.database import get_db
-from ..models.schemas import PlatformType, ContentCreate, CategoryType
-from ..services.content_service import ContentService
+from ..models.database import session_scope
+from ..models.content import Content
+from ..models.schemas import PlatformType, ContentCreate, ContentUpdate, CategoryType, CategorySource
+from ..services.content_service import AsyncContentService, DuplicateContent
 from ..services.gemini_service import GeminiService
 from ..services.simple_ai_service import SimpleAIService
+from ..services.ingest_queue import IngestJob, IngestQueue
+from ..services.write_queue import write_queue
+from ..services.twilio_service import get_messenger
+from ..services.http_client import http_client
+from ..services.scrape_race import RacePolicy, Tier, has_description, run_chain
+from ..services.scrape_cache import scrape_cache
+from ..services.circuit_breaker import ProviderError, forget_failures, guarded
+from ..services.quota import metered, quota_manager
+from ..services.enrichment_batcher import EnrichmentBatcher
+from ..services.url_utils import URL_PATTERN, CATEGORY_HINT
+from ..services.startup import Lazy
+from ..services.metrics import (
+    category_overrides, db_insert_seconds, enrichment_seconds, link_seconds, webhook_seconds,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-gemini_service = GeminiService()
-simple_service = SimpleAIService()
+# Built on first use (or by warm_up) so provider SDKs stay off the import path
+gemini_service = Lazy(GeminiService)
+simple_service = Lazy(SimpleAIService)
+messenger      = Lazy(get_messenger)
+
+# Concurrent enrichments within the window share one Gemini prompt (window 0 disables)
+enrichment_batcher = EnrichmentBatcher(
+    gemini_service,
+    window=int(os.getenv("GEMINI_BATCH_WINDOW_MS", "200")) / 1000,
+    max_items=int(os.getenv("GEMINI_BATCH_SIZE", "8")),
+)
+
+# inline: reply with the summary in the webhook response (blocks until saved)
+# async:  ack immediately, ingest in background workers, reply via Twilio REST
+REPLY_MODE  = os.getenv("WHATSAPP_REPLY_MODE", "inline").lower()
+ACK_MESSAGE = os.getenv("WHATSAPP_ACK_MESSAGE", "⏳ Saving your link…")
+# Re-scrape and re-enrich a link that is already saved
+REFRESH_COMMAND = "#refresh"
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36'
@@ -34,13 +65,10 @@ def extract_url_and_category(message: str) -> tuple[Optional[str], Optional[str]
     Extract URL and optional category override from message.
     Supports: <url> #fitness  or  #coding <url>  in any order.
     """
-    url_match = re.search(r'https?://[^\s]+', message)
+    url_match = URL_PATTERN.search(message)
     url = url_match.group(0) if url_match else None
 
-    category_match = re.search(
-        r'#(fitness|coding|food|travel|design|fashion|business|education|entertainment)',
-        message.lower()
-    )
+    category_match = CATEGORY_HINT.search(message.lower())
     category = category_match.group(1) if category_match else None
 
     return url, category
@@ -62,30 +90,41 @@ def platform_to_enum(platform: str) -> PlatformType:
 
 # ─── CONTENT EXTRACTION ───────────────────────────────────────────────────────
 
-def fetch_youtube(url: str) -> Optional[dict]:
+def check_provider_status(resp, provider: str, fatal: tuple = (401, 402, 403, 429)) -> None:
+    """
+    Raise ProviderError for statuses that mean the provider itself is failing
+    (auth, quota, rate limit, 5xx) so its circuit breaker sees them.
+    Anything else non-200 is specific to this URL and simply yields no result.
+    """
+    if resp.status_code in fatal or resp.status_code >= 500:
+        raise ProviderError(f"{provider} returned {resp.status_code}: {resp.text[:200]}")
+
+
+async def fetch_youtube(url: str) -> Optional[dict]:
     """YouTube oEmbed — FREE, no API key. Returns real video title."""
-    try:
-        resp = requests.get(
-            f"https://www.youtube.com/oembed?url={url}&format=json",
-            headers=HEADERS, timeout=10
-        )
-        if resp.status_code == 200:
-            data   = resp.json()
-            title  = data.get('title', '')
-            author = data.get('author_name', '')
-            logger.info(f"YouTube fetched: '{title}' by {author}")
-            return {
-                'title':         title,
-                'description':   f'YouTube video by {author}' if author else 'YouTube video',
-                'thumbnail_url': data.get('thumbnail_url'),
-                'hashtags':      [],
-            }
-    except Exception as e:
-        logger.warning(f"YouTube oEmbed failed: {e}")
-    return None
+    resp = await http_client.get(
+        "https://www.youtube.com/oembed",
+        params={'url': url, 'format': 'json'},
+        headers=HEADERS, timeout=10
+    )
+    # 401/403/404 here mean a private or removed video, not an oEmbed outage
+    check_provider_status(resp, "YouTube oEmbed", fatal=(429,))
+    if resp.status_code != 200:
+        return None
+
+    data   = resp.json()
+    title  = data.get('title', '')
+    author = data.get('author_name', '')
+    logger.info(f"YouTube fetched: '{title}' by {author}")
+    return {
+        'title':         title,
+        'description':   f'YouTube video by {author}' if author else 'YouTube video',
+        'thumbnail_url': data.get('thumbnail_url'),
+        'hashtags':      [],
+    }
 
 
-def fetch_instagram_apify(url: str) -> Optional[dict]:
+async def fetch_instagram_apify(url: str) -> Optional[dict]:
     """
     Fetch real Instagram caption + hashtags using Apify's Instagram Scraper.
     Actor: apify/instagram-scraper
@@ -99,267 +138,388 @@ def fetch_instagram_apify(url: str) -> Optional[dict]:
         logger.warning("APIFY_API_TOKEN not set — skipping Apify Instagram fetch")
         return None
 
-    try:
-        endpoint = (
-            "https://api.apify.com/v2/acts/apify~instagram-scraper"
-            f"/run-sync-get-dataset-items?token={api_token}&timeout=30"
-        )
-        payload = {
-            "directUrls":   [url],
-            "resultsType":  "posts",
-            "resultsLimit": 1,
-        }
-
-        resp = requests.post(endpoint, json=payload, timeout=35)
-        logger.info(f"Apify status: {resp.status_code}")
-
-        if resp.status_code != 200:
-            logger.warning(f"Apify returned {resp.status_code}: {resp.text[:200]}")
-            return None
-
-        items = resp.json()
-        if not items or not isinstance(items, list):
-            logger.warning("Apify returned empty dataset")
-            return None
-
-        post      = items[0]
-        caption   = post.get('caption') or post.get('alt') or ''
-        hashtags  = post.get('hashtags') or []   # list of tag strings without #
-        thumbnail = (
-            post.get('displayUrl') or
-            post.get('thumbnailUrl') or
-            post.get('previewUrl')
-        )
+    endpoint = (
+        "https://api.apify.com/v2/acts/apify~instagram-scraper"
+        f"/run-sync-get-dataset-items?token={api_token}&timeout=30"
+    )
+    payload = {
+        "directUrls":   [url],
+        "resultsType":  "posts",
+        "resultsLimit": 1,
+    }
+
+    await quota_manager.record("apify")
+    resp = await http_client.post(endpoint, json=payload, timeout=35)
+    logger.info(f"Apify status: {resp.status_code}")
+
+    # 402/403 = free quota used up — let the breaker open instead of paying 35 s per request
+    check_provider_status(resp, "Apify")
+    if resp.status_code != 200:
+        logger.warning(f"Apify returned {resp.status_code}: {resp.text[:200]}")
+        return None
 
-        lines      = [l.strip() for l in caption.split('\n') if l.strip()]
-        first_line = lines[0][:250] if lines else ''
+    items = resp.json()
+    if not items or not isinstance(items, list):
+        logger.warning("Apify returned empty dataset")
+        return None
 
-        logger.info(f"Apify caption: '{first_line[:80]}'")
-        return {
-            'title':         first_line or 'Instagram Content',
-            'description':   caption[:600],
-            'thumbnail_url': thumbnail,
-            'hashtags':      hashtags,
-        }
+    post      = items[0]
+    caption   = post.get('caption') or post.get('alt') or ''
+    hashtags  = post.get('hashtags') or []   # list of tag strings without #
+    thumbnail = (
+        post.get('displayUrl') or
+        post.get('thumbnailUrl') or
+        post.get('previewUrl')
+    )
 
-    except Exception as e:
-        logger.warning(f"Apify Instagram fetch failed: {e}")
-    return None
+    lines      = [l.strip() for l in caption.split('\n') if l.strip()]
+    first_line = lines[0][:250] if lines else ''
 
+    logger.info(f"Apify caption: '{first_line[:80]}'")
+    return {
+        'title':         first_line or 'Instagram Content',
+        'description':   caption[:600],
+        'thumbnail_url': thumbnail,
+        'hashtags':      hashtags,
+    }
 
-def fetch_instagram_oembed(url: str) -> Optional[dict]:
-    """Instagram oEmbed fallback — returns title only, may 401 without auth."""
-    try:
-        resp = requests.get(
-            f"https://www.instagram.com/oembed?url={url}",
-            headers=HEADERS, timeout=10
-        )
-        if resp.status_code == 200:
-            data  = resp.json()
-            title = data.get('title', '')
-            if title:
-                logger.info(f"Instagram oEmbed: '{title}'")
-                return {
-                    'title':         title,
-                    'description':   '',
-                    'thumbnail_url': data.get('thumbnail_url'),
-                    'hashtags':      [],
-                }
-    except Exception as e:
-        logger.warning(f"Instagram oEmbed failed: {e}")
-    return None
 
+async def fetch_instagram_oembed(url: str) -> Optional[dict]:
+    """Instagram oEmbed fallback — returns title only, may 401 without auth."""
+    resp = await http_client.get(
+        "https://www.instagram.com/oembed",
+        params={'url': url},
+        headers=HEADERS, timeout=10
+    )
+    check_provider_status(resp, "Instagram oEmbed")
+    if resp.status_code != 200:
+        return None
 
-def fetch_instagram(url: str) -> Optional[dict]:
-    """
-    Instagram extraction chain:
-    1. Apify scraper  → full caption + hashtags (best, needs APIFY_API_TOKEN)
-    2. oEmbed         → title only (partial fallback)
-    3. None           → Gemini will infer from URL structure
-    Jina/generic scraping is skipped — Instagram login wall blocks them.
-    """
-    result = fetch_instagram_apify(url)
-    if result and result.get('title') and result['title'] != 'Instagram Content':
-        return result
+    data  = resp.json()
+    title = data.get('title', '')
+    if not title:
+        return None
+    logger.info(f"Instagram oEmbed: '{title}'")
+    return {
+        'title':         title,
+        'description':   '',
+        'thumbnail_url': data.get('thumbnail_url'),
+        'hashtags':      [],
+    }
 
-    result = fetch_instagram_oembed(url)
-    if result and result.get('title'):
-        return result
 
-    return None
+def is_real_instagram_result(result: Optional[dict]) -> bool:
+    """Apify sometimes returns a placeholder title — treat that as a miss."""
+    return bool(result and result.get('title') and result['title'] != 'Instagram Content')
 
 
-def fetch_via_jina(url: str) -> Optional[dict]:
+async def fetch_via_jina(url: str) -> Optional[dict]:
     """
     Jina AI Reader — 100% FREE, no API key.
     Great for Twitter/X, articles, blogs. Skipped for Instagram.
     """
-    try:
-        resp = requests.get(
-            f"https://r.jina.ai/{url}",
-            headers={**HEADERS, 'Accept': 'text/plain'},
-            timeout=15
-        )
-        if resp.status_code == 200:
-            text = resp.text.strip()
-            if len(text) > 50:
-                lines = [l.strip() for l in text.split('\n') if l.strip()]
-                title = lines[0][:200] if lines else ''
-                desc  = ' '.join(lines[1:4])[:400] if len(lines) > 1 else ''
-                logger.info(f"Jina extracted: '{title[:80]}'")
-                return {
-                    'title':         title,
-                    'description':   desc,
-                    'thumbnail_url': None,
-                    'hashtags':      [],
-                }
-    except Exception as e:
-        logger.warning(f"Jina fetch failed: {e}")
-    return None
+    resp = await http_client.get(
+        f"https://r.jina.ai/{url}",
+        headers={**HEADERS, 'Accept': 'text/plain'},
+        timeout=15
+    )
+    check_provider_status(resp, "Jina", fatal=(402, 429))
+    if resp.status_code != 200:
+        return None
 
+    text = resp.text.strip()
+    if len(text) <= 50:
+        return None
+    lines = [l.strip() for l in text.split('\n') if l.strip()]
+    title = lines[0][:200] if lines else ''
+    desc  = ' '.join(lines[1:4])[:400] if len(lines) > 1 else ''
+    logger.info(f"Jina extracted: '{title[:80]}'")
+    return {
+        'title':         title,
+        'description':   desc,
+        'thumbnail_url': None,
+        'hashtags':      [],
+    }
 
-def fetch_generic(url: str) -> Optional[dict]:
+
+async def fetch_generic(url: str) -> Optional[dict]:
     """Last resort: scrape og:title / og:description meta tags."""
-    try:
-        from bs4 import BeautifulSoup
-        resp = requests.get(url, headers=HEADERS, timeout=10, allow_redirects=True)
-        if resp.status_code != 200:
-            return None
-        bs    = BeautifulSoup(resp.text, 'html.parser')
-        title = bs.find('meta', property='og:title')
-        desc  = bs.find('meta', property='og:description')
-        img   = bs.find('meta', property='og:image')
-        t = title.get('content', '').strip() if title else ''
-        d = desc.get('content', '').strip()  if desc  else ''
-        i = img.get('content', '')           if img   else ''
-        if t:
-            return {'title': t, 'description': d, 'thumbnail_url': i or None, 'hashtags': []}
-    except Exception as e:
-        logger.warning(f"Generic scrape failed: {e}")
+    from bs4 import BeautifulSoup
+    resp = await http_client.get(url, headers=HEADERS, timeout=10, follow_redirects=True)
+    # The target site's own errors say nothing about our ability to scrape — never fatal
+    if resp.status_code != 200:
+        return None
+    bs    = BeautifulSoup(resp.text, 'html.parser')
+    title = bs.find('meta', property='og:title')
+    desc  = bs.find('meta', property='og:description')
+    img   = bs.find('meta', property='og:image')
+    t = title.get('content', '').strip() if title else ''
+    d = desc.get('content', '').strip()  if desc  else ''
+    i = img.get('content', '')           if img   else ''
+    if t:
+        return {'title': t, 'description': d, 'thumbnail_url': i or None, 'hashtags': []}
     return None
 
 
-def scrape(url: str, platform: str) -> Optional[dict]:
+# Apify, oEmbed and Jina are fetched from the provider's own host, so not
+# reaching it is a provider failure; generic scraping dials the link's own
+# host, where a connection error is only about that URL.
+HOST_ERRORS = (ProviderError, httpx.TransportError)
+
+# Declarative fallback chains — order is priority, the race policy decides
+# how aggressively lower tiers are started (see RacePolicy / SCRAPE_* env vars).
+# Every fetcher is wrapped by its provider's circuit breaker (shared across
+# chains), which also owns the adaptive timeout and negative cache.
+# Apify is additionally metered against its rate limit and monthly budget.
+SCRAPE_CHAINS = {
+    # Jina and generic scraping blocked by Instagram login wall — skip them.
+    # Apify is slow but returns full captions, so give it a head start.
+    'instagram': RacePolicy.from_env('instagram', [
+        Tier('apify', metered('apify',
+                              guarded('apify', fetch_instagram_apify, timeout=35, provider_errors=HOST_ERRORS),
+                              wait=float(os.getenv("APIFY_QUOTA_WAIT", "5"))),
+             accept=is_real_instagram_result),
+        # Title only: held back while Apify (caption + hashtags) is still running
+        Tier('instagram_oembed', guarded('instagram_oembed', fetch_instagram_oembed, timeout=10,
+                                         provider_errors=HOST_ERRORS),
+             preempt=has_description),
+    ], mode='hedged', hedge_delay=8.0),
+    'youtube': RacePolicy.from_env('youtube', [
+        Tier('youtube_oembed', guarded('youtube_oembed', fetch_youtube, timeout=10, provider_errors=HOST_ERRORS)),
+        Tier('jina',           guarded('jina', fetch_via_jina, timeout=15, provider_errors=HOST_ERRORS)),
+        Tier('generic',        guarded('generic', fetch_generic, timeout=10)),
+    ], mode='hedged', hedge_delay=1.5),
+    # Twitter, blogs, articles
+    'default': RacePolicy.from_env('default', [
+        Tier('jina',    guarded('jina', fetch_via_jina, timeout=15, provider_errors=HOST_ERRORS)),
+        Tier('generic', guarded('generic', fetch_generic, timeout=10)),
+    ], mode='hedged', hedge_delay=3.0),
+}
+
+
+async def scrape(url: str, platform: str) -> Optional[dict]:
     """
     Extraction chain per platform:
       Instagram  → Apify (captions) → oEmbed → None (Gemini infers from URL)
       YouTube    → oEmbed → Jina → generic
       Twitter/X  → Jina → generic
       Other      → Jina → generic
+    Tiers are raced according to each chain's RacePolicy. Results are cached
+    by canonical URL and concurrent scrapes of the same link are coalesced.
     """
-    if platform == 'youtube':
-        result = fetch_youtube(url)
-        if result and result.get('title'):
-            return result
+    policy = SCRAPE_CHAINS.get(platform, SCRAPE_CHAINS['default'])
+    return await scrape_cache.get_or_fetch(url, lambda: run_chain(url, policy))
 
-    elif platform == 'instagram':
-        # Jina and generic scraping blocked by Instagram login wall — skip them
-        return fetch_instagram(url)
 
-    # Twitter, blogs, articles
-    result = fetch_via_jina(url)
-    if result and result.get('title'):
-        return result
+# ─── MAIN PROCESSING ──────────────────────────────────────────────────────────
+
+async def build_content(
+    url: str,
+    user_phone: str,
+    category_override: Optional[str] = None,
+    refresh: bool = False
+) -> Tuple[ContentCreate, str]:
+    """
+    Scrape and enrich a link into a ContentCreate (not saved). Returns (content, method).
+    refresh=True bypasses the scrape and enrichment caches.
+    """
+    platform      = get_platform(url)
+    platform_enum = platform_to_enum(platform)
+
+    # ── Step 1: Scrape real content ────────────────────────────────────────
+    if refresh:
+        scrape_cache.invalidate(url)
+        forget_failures(url)
+    scraped       = await scrape(url, platform)
+    scraped_title = scraped.get('title', '')       if scraped else ''
+    scraped_desc  = scraped.get('description', '') if scraped else ''
+    thumbnail     = scraped.get('thumbnail_url')   if scraped else None
+    hashtags      = scraped.get('hashtags', [])    if scraped else []
+
+    # Append scraped hashtags into description for richer AI context
+    if hashtags:
+        hashtag_str  = ' '.join(f'#{h}' for h in hashtags[:10])
+        scraped_desc = f'{scraped_desc} {hashtag_str}'.strip()
+
+    logger.info(f"Scraped: '{scraped_title}' | Override: {category_override} | Platform: {platform}")
+    if refresh:
+        await gemini_service.invalidate_cache(url, platform, scraped_title, scraped_desc)
+
+    # ── Step 2: AI analysis ────────────────────────────────────────────────
+    # Keyword matching once the Gemini monthly budget is nearly spent
+    enrich_started = time.perf_counter()
+    await quota_manager.refresh("gemini")
+    if gemini_service.is_available() and not quota_manager.should_downgrade("gemini"):
+        ai_result = await enrichment_batcher.analyze(
+            url=url,
+            platform=platform,
+            scraped_title=scraped_title,
+            scraped_desc=scraped_desc,
+        )
+        title       = ai_result.get('title') or scraped_title or f'{platform.title()} Content'
+        description = ai_result.get('description') or scraped_desc or ''
+        ai_summary  = ai_result.get('ai_summary', f'Content from {platform}')
+        tags        = ai_result.get('tags', [])
+        try:
+            ai_category = CategoryType(ai_result.get('category', 'other'))
+        except ValueError:
+            ai_category = CategoryType.OTHER
+        method = "Gemini AI"
+        # Cached Gemini profiles predate the "source" key — only Gemini profiles are cached
+        source = CategorySource(ai_result.get('source', CategorySource.GEMINI))
+        enrichment_seconds.labels("gemini").observe(time.perf_counter() - enrich_started)
+    else:
+        title       = scraped_title or f'{platform.title()} Content'
+        description = scraped_desc or ''
+        ai_category, ai_summary, tags, method = await simple_service.analyze(title, description, platform, url)
+        source = CategorySource.LOCAL if method == "Local model" else CategorySource.KEYWORD
+        enrichment_seconds.labels("keyword").observe(time.perf_counter() - enrich_started)
+
+    # ── Step 3: Apply user's #hashtag category override if provided ────────
+    if category_override:
+        try:
+            category = CategoryType(category_override)
+            if category_override not in tags:
+                tags = [category_override, *tags]   # new list — never edit a shared/cached one
+            method = f"{method} + manual #{category_override}"
+            source = CategorySource.HASHTAG
+            category_overrides.labels("new").inc()
+        except ValueError:
+            category = ai_category
+            category_overrides.labels("invalid").inc()
+    else:
+        category = ai_category
+
+    # ── Step 4: Build the row ──────────────────────────────────────────────
+    content_create = ContentCreate(
+        url=url,
+        platform=platform_enum,
+        title=title,
+        description=description,
+        category=category,
+        category_source=source,
+        tags=tags,
+        ai_summary=ai_summary,
+        media_url=None,
+        thumbnail_url=thumbnail,
+        user_phone=user_phone,
+    )
+    return content_create, method
+
+
+def format_reply(content: ContentCreate, method: str, category_override: Optional[str] = None) -> str:
+    """WhatsApp confirmation for a saved link"""
+    platform = get_platform(str(content.url))
+    category = content.category
+
+    emoji_map = {
+        'fitness': '[Fitness]', 'coding': '[Coding]', 'food': '[Food]', 'travel': '[Travel]',
+        'design': '[Design]', 'fashion': '[Fashion]', 'business': '[Business]',
+        'education': '[Education]', 'entertainment': '[Entertainment]', 'other': '[Other]'
+    }
+    emoji         = emoji_map.get(category.value, '📌')
+    override_note = f" _(you tagged #{category_override})_" if category_override else ""
+
+    return (
+        f"[OK] Saved to *{category.value.title()}* {emoji}{override_note}\n\n"
+        f"[Info] {content.ai_summary}\n\n"
+        f"[{method}] • {platform.title()}_\n\n"
+        f"View: http://localhost:3000"
+    )
 
-    return fetch_generic(url)
 
+def recategorized_tags(tags: Optional[list], old_category: str, new_category: str) -> list:
+    """Tags after moving a save to another category: the old category tag swapped for the new one, first"""
+    return [new_category, *(tag for tag in tags or [] if tag not in (old_category, new_category))]
+
+
+def duplicate_reply(existing: Content) -> str:
+    """Reply for a link the user already saved"""
+    category = getattr(existing.category, 'value', existing.category)
+    saved_on = f" on {existing.created_at:%d %b %Y}" if existing.created_at else ""
+    return (
+        f"📌 Already saved{saved_on} in *{category.title()}*\n\n"
+        f"Send it again with #refresh to re-analyze it."
+    )
 
-# ─── MAIN PROCESSING ──────────────────────────────────────────────────────────
 
 async def process_link(
     url: str,
     user_phone: str,
-    db: Session,
-    category_override: Optional[str] = None
+    db: AsyncSession,
+    category_override: Optional[str] = None,
+    refresh: bool = False
 ) -> str:
+    started = time.perf_counter()
+    result  = "error"
     try:
-        platform      = get_platform(url)
-        platform_enum = platform_to_enum(platform)
-
-        # ── Step 1: Scrape real content ────────────────────────────────────────
-        scraped       = scrape(url, platform)
-        scraped_title = scraped.get('title', '')       if scraped else ''
-        scraped_desc  = scraped.get('description', '') if scraped else ''
-        thumbnail     = scraped.get('thumbnail_url')   if scraped else None
-        hashtags      = scraped.get('hashtags', [])    if scraped else []
-
-        # Append scraped hashtags into description for richer AI context
-        if hashtags:
-            hashtag_str  = ' '.join(f'#{h}' for h in hashtags[:10])
-            scraped_desc = f'{scraped_desc} {hashtag_str}'.strip()
-
-        logger.info(f"Scraped: '{scraped_title}' | Override: {category_override} | Platform: {platform}")
-
-        # ── Step 2: AI analysis ────────────────────────────────────────────────
-        if gemini_service.is_available():
-            ai_result = await gemini_service.analyze_url(
-                url=url,
-                platform=platform,
-                scraped_title=scraped_title,
-                scraped_desc=scraped_desc,
-            )
-            title       = ai_result.get('title') or scraped_title or f'{platform.title()} Content'
-            description = ai_result.get('description') or scraped_desc or ''
-            ai_summary  = ai_result.get('ai_summary', f'Content from {platform}')
-            tags        = ai_result.get('tags', [])
-            try:
-                ai_category = CategoryType(ai_result.get('category', 'other'))
-            except ValueError:
-                ai_category = CategoryType.OTHER
-            method = "Gemini AI"
-        else:
-            title       = scraped_title or f'{platform.title()} Content'
-            description = scraped_desc or ''
-            ai_category = await simple_service.categorize_content(title, description, platform)
-            ai_summary  = await simple_service.summarize_content(title, description, platform)
-            tags        = await simple_service.extract_tags(title, description, ai_category.value)
-            method = "Keyword match"
-
-        # ── Step 3: Apply user's #hashtag category override if provided ────────
-        if category_override:
-            try:
-                category = CategoryType(category_override)
-                if category_override not in tags:
-                    tags.insert(0, category_override)
-                method = f"{method} + manual #{category_override}"
-            except ValueError:
-                category = ai_category
-        else:
-            category = ai_category
-
-        # ── Step 4: Save to database ───────────────────────────────────────────
-        content_create = ContentCreate(
-            url=url,
-            platform=platform_enum,
-            title=title,
-            description=description,
-            category=category,
-            tags=tags,
-            ai_summary=ai_summary,
-            media_url=None,
-            thumbnail_url=thumbnail,
-            user_phone=user_phone,
-        )
-        ContentService(db).create_content(content_create)
-
-        emoji_map = {
-            'fitness': '[Fitness]', 'coding': '[Coding]', 'food': '[Food]', 'travel': '[Travel]',
-            'design': '[Design]', 'fashion': '[Fashion]', 'business': '[Business]',
-            'education': '[Education]', 'entertainment': '[Entertainment]', 'other': '[Other]'
-        }
-        emoji         = emoji_map.get(category.value, '📌')
-        override_note = f" _(you tagged #{category_override})_" if category_override else ""
-
-        return (
-            f"[OK] Saved to *{category.value.title()}* {emoji}{override_note}\n\n"
-            f"[Info] {ai_summary}\n\n"
-            f"[{method}] • {platform.title()}_\n\n"
-            f"View: http://localhost:3000"
-        )
+        # Repeat saves cost one indexed lookup, not a scrape + Gemini call
+        content_service = AsyncContentService(db)
+        existing = await content_service.find_by_url(user_phone, url)
+        if existing and not refresh:
+            old_category = getattr(existing.category, 'value', existing.category)
+            if category_override and category_override != old_category:
+                await content_service.update_content(existing.id, ContentUpdate(
+                    category=category_override, category_source=CategorySource.HASHTAG,
+                    tags=recategorized_tags(existing.tags, old_category, category_override),
+                ))
+                category_overrides.labels("existing").inc()
+                result = "recategorized"
+                return f"[OK] Already saved — moved to *{category_override.title()}*"
+            result = "duplicate"
+            return duplicate_reply(existing)
+
+        content, method = await build_content(url, user_phone, category_override, refresh=refresh)
+        if existing:
+            await content_service.update_content(existing.id, ContentUpdate(
+                title=content.title,
+                description=content.description,
+                category=content.category,
+                category_source=content.category_source,
+                tags=content.tags,
+                ai_summary=content.ai_summary,
+            ))
+            result = "refreshed"
+            return format_reply(content, f"{method} • refreshed", category_override)
+
+        insert_started = time.perf_counter()
+        try:
+            await write_queue.create(content)
+        except DuplicateContent as e:
+            result = "duplicate"
+            return duplicate_reply(e.existing)
+        finally:
+            db_insert_seconds.observe(time.perf_counter() - insert_started)
+        result = "saved"
+        return format_reply(content, method, category_override)
 
     except Exception as e:
         logger.error(f"process_link error: {e}", exc_info=True)
         return "❌ Something went wrong saving your link. Please try again."
+    finally:
+        link_seconds.labels(result).observe(time.perf_counter() - started)
+
+
+# ─── BACKGROUND INGESTION ─────────────────────────────────────────────────────
+
+async def run_ingest_job(job: IngestJob) -> None:
+    """Worker handler: full scrape → enrich → save pipeline, then reply via Twilio REST"""
+    async with session_scope() as db:
+        reply = await process_link(job.url, job.user_phone, db, job.category_override, job.refresh)
+    await messenger.send(to=job.reply_to, from_=job.reply_from, body=reply)
+
+
+ingest_queue = IngestQueue(
+    run_ingest_job,
+    workers=int(os.getenv("INGEST_WORKERS", "4")),
+    maxsize=int(os.getenv("INGEST_QUEUE_SIZE", "1000")),
+)
+
+
+def warm_up() -> None:
+    """Build the lazy providers now (provider SDK imports, client setup) instead of on the first message"""
+    for service in (gemini_service, simple_service, messenger):
+        service.get()
 
 
 # ─── WEBHOOK ──────────────────────────────────────────────────────────────────
@@ -372,10 +532,12 @@ async def whatsapp_webhook(
     Body: str = Form(...),
     MessageSid: str = Form(...)
 ):
+    started = time.perf_counter()
+    mode    = "error"
     try:
-        db         = next(get_db())
         user_phone = normalize_phone(From)
         url, category_override = extract_url_and_category(Body)
+        refresh = REFRESH_COMMAND in Body.lower()
 
         if not url:
             resp = MessagingResponse()
@@ -390,13 +552,35 @@ async def whatsapp_webhook(
                 "  `https://instagram.com/... #fitness`\n"
                 "  `https://youtube.com/... #coding`\n\n"
                 "Supported: #fitness #coding #food #travel\n"
-                "#design #fashion #business #education #entertainment"
+                "#design #fashion #business #education #entertainment\n\n"
+                "🔄 Already saved? Add #refresh to re-analyze it."
             )
+            mode = "help"
+            return Response(content=str(resp), media_type="application/xml")
+
+        if REPLY_MODE == "async" and ingest_queue.running:
+            job = IngestJob(
+                url=url,
+                user_phone=user_phone,
+                reply_to=From,
+                reply_from=To,
+                category_override=category_override,
+                refresh=refresh,
+            )
+            resp = MessagingResponse()
+            if ingest_queue.submit(job):
+                if ACK_MESSAGE:
+                    resp.message(ACK_MESSAGE)
+            else:
+                resp.message("⏳ We're busy saving other links right now. Please resend in a minute.")
+            mode = "async"
             return Response(content=str(resp), media_type="application/xml")
 
-        reply = await process_link(url, user_phone, db, category_override)
+        async with session_scope() as db:
+            reply = await process_link(url, user_phone, db, category_override, refresh)
         resp  = MessagingResponse()
         resp.message(reply)
+        mode = "inline"
         return Response(content=str(resp), media_type="application/xml")
 
     except Exception as e:
@@ -404,6 +588,8 @@ async def whatsapp_webhook(
         resp = MessagingResponse()
         resp.message("❌ Something went wrong. Please try again.")
         return Response(content=str(resp), media_type="application/xml")
+    finally:
+        webhook_seconds.labels(mode).observe(time.perf_counter() - started)
 
 
 @router.get("/whatsapp")
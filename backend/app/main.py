@@ -1,12 +1,32 @@
+# Time everything below: the cold-start report breaks imports down per package
+from app.services.startup import startup_report
+startup_report.start_import_timing()
+
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 import logging
 
-from app.api import whatsapp, content
-from app.models.database import engine, Base
+from app.api import whatsapp, content, imports, events, metrics
+from app.api.compression import SelectiveGZipMiddleware
+from app.api.metrics import MetricsMiddleware, status_collector
+from app.models.database import engine, Base, dispose_engines
+from app.models.migrations import upgrade_schema
+from app.services.http_client import http_client
+from app.services.scrape_cache import scrape_cache
+from app.services.enrichment_cache import enrichment_cache
+from app.services.circuit_breaker import breakers, negative_cache
+from app.services.quota import quota_manager
+from app.services.search_index import ensure_search_index
+from app.services.events import event_broker
+from app.services.write_queue import write_queue
+from app.services.metrics import registry
+
+startup_report.stop_import_timing()
 
 # Load environment variables
 load_dotenv()
@@ -15,14 +35,61 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# off:        providers (Gemini SDK, Twilio client) are built by the first message that needs them
+# background: built right after startup, without delaying readiness
+# blocking:   built before the app reports ready
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background").lower()
+
+def init_db():
+    """Schema work, run at startup rather than on import so tooling and workers import the app cheaply"""
+    # Create database tables
+    Base.metadata.create_all(bind=engine)
+    # Bring existing databases up to date (indexes/columns added after first deploy)
+    upgrade_schema(engine, destructive=os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true")
+    # Full-text search index (SQLite FTS5 / Postgres tsvector)
+    ensure_search_index(engine)
+
+async def warm_up():
+    with startup_report.phase("warm_up"):
+        await asyncio.to_thread(whatsapp.warm_up)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_report.phase("schema"):
+        await asyncio.to_thread(init_db)
+    # This month's provider usage, so quota checks never query the DB on the loop
+    await quota_manager.preload()
+    # Shared pooled HTTP client for the scrape layer
+    await http_client.start()
+    # Single writer that group-commits new saves
+    await write_queue.start()
+    # Background ingestion workers (used when WHATSAPP_REPLY_MODE=async)
+    await whatsapp.ingest_queue.start()
+    # Live dashboard push (SSE)
+    await event_broker.start()
+    warming = None
+    if STARTUP_WARMUP == "blocking":
+        await warm_up()
+    elif STARTUP_WARMUP == "background":
+        warming = asyncio.create_task(warm_up())
+    startup_report.ready()
+    yield
+    if warming is not None and not warming.done():
+        warming.cancel()
+    await event_broker.stop()
+    await imports.import_manager.stop()
+    await whatsapp.ingest_queue.stop()
+    await whatsapp.enrichment_batcher.stop()
+    await write_queue.stop()
+    await http_client.close()
+    await dispose_engines()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Social Saver Bot API",
     description="WhatsApp bot that saves social media content to a knowledge base",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -40,9 +107,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON pages (never the SSE stream or .gz downloads)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_LEVEL", "6")),
+)
+
+# Route latency histograms for /metrics (outermost, so compression is included)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(whatsapp.router, prefix="/webhook", tags=["whatsapp"])
 app.include_router(content.router, prefix="/api/content", tags=["content"])
+app.include_router(imports.router, prefix="/api/imports", tags=["imports"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
+app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/")
 async def root():
@@ -52,6 +132,27 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "Social Saver Bot"}
 
+def counters() -> dict:
+    """Operational counters for caches and background workers (/status, and /metrics at scrape time)"""
+    return {
+        "scrape_cache": scrape_cache.stats(),
+        "enrichment_cache": enrichment_cache.stats(),
+        "circuit_breakers": breakers.snapshot(),
+        "negative_cache": {"entries": len(negative_cache)},
+        "quotas": quota_manager.snapshot(),
+        "ingest_queue": {"running": whatsapp.ingest_queue.running, "pending": whatsapp.ingest_queue.qsize()},
+        "imports": {"active": imports.import_manager.active},
+        "write_queue": write_queue.stats(),
+        "events": {"subscribers": event_broker.subscribers()},
+    }
+
+registry.collector(status_collector(counters))
+
+@app.get("/status")
+async def status():
+    """Operational counters for caches and background workers"""
+    return {**counters(), "startup": startup_report.snapshot()}
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {exc}")
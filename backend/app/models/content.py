@@ -1,24 +1,80 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+import json
+import zlib
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index, ForeignKey, LargeBinary
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from .database import Base
 
+class CompressedJSON(TypeDecorator):
+    """JSON stored zlib-compressed in a binary column, decoded transparently on load"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"), 6)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value))
+
 class Content(Base):
     __tablename__ = "contents"
+    __table_args__ = (
+        # Keyset pagination: newest-first per user, with id as tie-breaker
+        Index("ix_contents_user_created_id", "user_phone", "created_at", "id"),
+        Index("ix_contents_user_category_created", "user_phone", "category", "created_at"),
+        # One row per link per user — repeat saves are answered from this index
+        Index("ux_contents_user_canonical_url", "user_phone", "canonical_url", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_phone = Column(String(20), index=True, nullable=False)
     url = Column(String(500), nullable=False)
+    canonical_url = Column(String(500))  # url_utils.canonicalize_url(url), set on insert
     platform = Column(String(50), nullable=False)
     title = Column(String(500))
+    # description and ai_summary stay inline and uncompressed: the FTS index and
+    # its triggers read them from this table, and ai_summary is a card field.
+    # Card lists load_only() their fields, so description is never read there.
     description = Column(Text)
     category = Column(String(50), nullable=False)
+    category_source = Column(String(20))  # schemas.CategorySource; NULL for rows saved before it was tracked
     tags = Column(JSON)  # Store as JSON array
     ai_summary = Column(Text)
     media_url = Column(String(500))
     thumbnail_url = Column(String(500))
-    raw_data = Column(JSON)  # Store original extracted data
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Original extracted data that has no column of its own — kept out of this
+    # (hot, scanned) table and only loaded when read
+    raw = relationship("ContentRaw", uselist=False, lazy="select", cascade="all, delete-orphan")
+
+    @property
+    def raw_data(self):
+        return self.raw.data if self.raw is not None else None
+
+    @raw_data.setter
+    def raw_data(self, value):
+        if value:
+            self.raw = ContentRaw(data=value)
+        else:
+            self.raw = None
+
     def __repr__(self):
         return f"<Content(id={self.id}, platform={self.platform}, category={self.category})>"
+
+class ContentRaw(Base):
+    """Side table for Content.raw_data, one compressed row per content (most have none)"""
+    __tablename__ = "content_raw"
+
+    content_id = Column(Integer, ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True)
+    data = Column(CompressedJSON, nullable=False)
+
+    def __repr__(self):
+        return f"<ContentRaw(content_id={self.content_id})>"
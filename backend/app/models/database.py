@@ -1,11 +1,16 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./social_saver.db")
 
 engine = create_engine(
@@ -15,6 +20,34 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# SQLite production profile: WAL (readers never block the writer), fsync only
+# at checkpoints, memory-mapped reads, a bigger page cache, and waiting on a
+# busy database instead of failing with "database is locked"
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous":  "NORMAL",
+    "mmap_size":    int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size":   -int(os.getenv("SQLITE_CACHE_KB", "65536")),   # negative = KiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store":   "MEMORY",
+}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def use_sqlite_profile(sync_engine) -> None:
+    """Apply SQLITE_PRAGMAS to every new connection of a SQLite engine (no-op otherwise)"""
+    if sync_engine.dialect.name == "sqlite" and SQLITE_PROFILE == "production":
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+
+use_sqlite_profile(engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -23,3 +56,62 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ── Async engine (API routes, webhook, background jobs) ──────────────────────
+
+# Same database through an asyncio driver: aiosqlite locally, asyncpg for Postgres
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+def _async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+def _pool_options() -> dict:
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle":  int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if ":memory:" not in ASYNC_DATABASE_URL:   # in-memory SQLite uses a single static connection
+        # aiosqlite defaults to NullPool (a new connection per session) — pool like Postgres does
+        options["poolclass"]    = AsyncAdaptedQueuePool
+        options["pool_size"]    = int(os.getenv("DB_POOL_SIZE", "10"))
+        options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        options["pool_timeout"] = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    return options
+
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options())
+    use_sqlite_profile(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+except ImportError as e:   # driver not installed — sessions fall back to the sync engine on a worker thread
+    logger.warning(f"Async database driver unavailable ({e}) — using the sync engine off the event loop")
+    async_engine = None
+    AsyncSessionLocal = None
+
+@asynccontextmanager
+async def session_scope():
+    """One session for a unit of work outside a request (webhook, workers), always closed"""
+    if AsyncSessionLocal is None:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_db():
+    """FastAPI dependency: a session scoped to the request"""
+    async with session_scope() as db:
+        yield db
+
+async def dispose_engines():
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
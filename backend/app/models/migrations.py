@@ -0,0 +1,270 @@
+import argparse
+import os
+import sys
+from typing import List, Optional
+from sqlalchemy import JSON, Column, DateTime, String, Text, cast, column, func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+import logging
+
+from .database import Base
+
+logger = logging.getLogger(__name__)
+
+# compact_raw_data report when there was nothing to compact
+EMPTY_REPORT = {"rows": 0, "kept": 0, "bytes_before": 0, "bytes_after": 0}
+
+class SchemaMigration(Base):
+    """One row per one-time data migration that has been applied"""
+    __tablename__ = "schema_migrations"
+
+    name = Column(String(100), primary_key=True)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
+
+def applied_migrations(engine: Engine) -> set:
+    with engine.connect() as conn:
+        return {name for (name,) in conn.execute(select(SchemaMigration.name))}
+
+def mark_applied(engine: Engine, name: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(SchemaMigration.__table__.insert().values(name=name))
+    logger.info(f"Migration {name} applied")
+
+def add_missing_columns(engine: Engine) -> set:
+    """create_all() skips tables that already exist — add any (nullable) column they are missing"""
+    inspector = inspect(engine)
+    added = set()
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.add(f"{table.name}.{column.name}")
+            logger.info(f"Added column {table.name}.{column.name}")
+    return added
+
+def create_missing_indexes(engine: Engine, skip: tuple = ()) -> None:
+    """create_all() skips tables that already exist — add any index they are missing (except `skip`)"""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing and index.name not in skip:
+                index.create(bind=engine)
+                logger.info(f"Created index {index.name}")
+
+def fill_canonical_urls(engine: Engine) -> int:
+    """Set canonical_url on rows saved before it existed (non-destructive); returns rows filled"""
+    from .content import Content
+    from ..services.url_utils import canonicalize_url
+
+    db = Session(bind=engine)
+    try:
+        filled = 0
+        for content in db.query(Content).filter(Content.canonical_url.is_(None)).yield_per(1000):
+            content.canonical_url = canonicalize_url(content.url)
+            filled += 1
+        db.commit()
+        return filled
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def has_duplicates(engine: Engine) -> bool:
+    """Whether any user saved the same link twice (what dedupe_contents would merge)"""
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT 1 FROM contents WHERE canonical_url IS NOT NULL"
+            " GROUP BY user_phone, canonical_url HAVING COUNT(*) > 1 LIMIT 1"
+        )).first() is not None
+
+def dedupe_contents(engine: Engine) -> int:
+    """
+    Fill canonical_url on old rows and merge rows that are the same link for
+    the same user: the oldest row is kept, gaps in its fields are filled from
+    the newer copies, tags are unioned, the copies are deleted.
+    Returns the number of rows removed.
+    """
+    from .content import Content
+    from .stats import UserStats
+
+    fill_canonical_urls(engine)
+    db = Session(bind=engine)
+    try:
+        groups: dict = {}
+        rows = db.query(Content.id, Content.user_phone, Content.canonical_url).order_by(Content.id)
+        for content_id, user_phone, canonical_url in rows:
+            groups.setdefault((user_phone, canonical_url), []).append(content_id)
+
+        removed, users = 0, set()
+        for (user_phone, _), ids in groups.items():
+            if len(ids) < 2:
+                continue
+            keeper, *copies = db.query(Content).filter(Content.id.in_(ids)).order_by(Content.id).all()
+            tags = list(keeper.tags or [])
+            for copy in reversed(copies):   # newest first
+                for field in ("title", "description", "ai_summary", "media_url", "thumbnail_url"):
+                    if not getattr(keeper, field) and getattr(copy, field):
+                        setattr(keeper, field, getattr(copy, field))
+                tags += [tag for tag in (copy.tags or []) if tag not in tags]
+                db.delete(copy)
+            keeper.tags = tags
+            removed += len(copies)
+            users.add(user_phone)
+
+        if users:
+            # Rollups for these users are rebuilt from the table on next use
+            db.query(UserStats).filter(UserStats.user_phone.in_(users)).delete(synchronize_session=False)
+        db.commit()
+        if removed:
+            logger.info(f"Merged {removed} duplicate saves across {len(users)} users")
+        return removed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def compact_raw_data(engine: Engine, batch_size: int = 1000) -> dict:
+    """
+    Move the legacy inline `contents.raw_data` JSON out of the hot table: the
+    fields that merely repeat the row's own columns are dropped, anything else
+    goes compressed into `content_raw`, then the column itself is dropped.
+    Returns a report (rows, rows kept, bytes before / after).
+    """
+    from .content import Content, ContentRaw
+
+    report = dict(EMPTY_REPORT)
+    if not _has_column(engine, "contents", "raw_data"):
+        return report
+
+    # Sized and filtered through its text form: Postgres has no length(json), and
+    # a stored Python None is the JSON literal 'null' there, not SQL NULL
+    raw_column = column("raw_data", JSON)
+    raw_text   = cast(raw_column, Text)
+    query = select(Content.__table__, raw_column, func.length(raw_text)) \
+        .where(raw_column.isnot(None), raw_text != "null")
+    kept_rows = []
+    with engine.begin() as conn:
+        for row in conn.execution_options(yield_per=batch_size).execute(query):
+            *_, raw, size = row
+            report["rows"] += 1
+            report["bytes_before"] += size or 0
+            stored = row._mapping
+            extra = {key: value for key, value in (raw or {}).items()
+                     if key not in stored or stored[key] != value}
+            if extra:
+                kept_rows.append({"content_id": row.id, "data": extra})
+                if len(kept_rows) >= batch_size:
+                    conn.execute(ContentRaw.__table__.insert(), kept_rows)
+                    report["kept"] += len(kept_rows)
+                    kept_rows = []
+        if kept_rows:
+            conn.execute(ContentRaw.__table__.insert(), kept_rows)
+            report["kept"] += len(kept_rows)
+        report["bytes_after"] = conn.execute(text(
+            "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM content_raw"
+        )).scalar()
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE contents DROP COLUMN raw_data"))
+    except Exception as e:
+        # SQLite before 3.35 cannot drop columns — empty it instead
+        logger.warning(f"Could not drop contents.raw_data ({e}); clearing it")
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE contents SET raw_data = NULL"))
+
+    logger.info(
+        f"Compacted raw_data: {report['rows']} rows, {report['kept']} kept, "
+        f"{report['bytes_before']} → {report['bytes_after']} bytes"
+    )
+    return report
+
+def vacuum(engine: Engine) -> Optional[tuple]:
+    """Give freed pages back to the filesystem (SQLite file databases only); (size before, size after)"""
+    path = engine.url.database
+    if engine.dialect.name != "sqlite" or not path or path == ":memory:":
+        return None
+    before = os.path.getsize(path)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+    return before, os.path.getsize(path)
+
+def upgrade_schema(engine: Engine, destructive: bool = False) -> dict:
+    """
+    In-place upgrades for databases created by older versions; returns the
+    raw_data compaction report. Columns and indexes are added every time
+    (idempotent). The one-time data migrations — merging duplicate saves and
+    dropping contents.raw_data — are recorded in schema_migrations and run at
+    most once; they only run with `destructive` (the CLI, or DB_AUTO_MIGRATE
+    at startup) unless there is nothing for them to change.
+    """
+    add_missing_columns(engine)
+    fill_canonical_urls(engine)
+    applied = applied_migrations(engine)
+    report  = dict(EMPTY_REPORT)
+    pending = []
+
+    if "dedupe_contents" not in applied:
+        if destructive or not has_duplicates(engine):
+            dedupe_contents(engine)
+            mark_applied(engine, "dedupe_contents")
+        else:
+            pending.append("dedupe_contents")
+    # The unique index cannot be built while duplicates remain
+    create_missing_indexes(engine, skip=("ux_contents_user_canonical_url",) if pending else ())
+
+    if "compact_raw_data" not in applied:
+        if destructive or not _has_column(engine, "contents", "raw_data"):
+            report = compact_raw_data(engine)
+            mark_applied(engine, "compact_raw_data")
+        else:
+            pending.append("compact_raw_data")
+
+    if pending:
+        logger.warning(
+            f"Pending data migrations: {', '.join(pending)} — run "
+            f"`python -m app.models.migrations upgrade` (or set DB_AUTO_MIGRATE=true)"
+        )
+    return report
+
+def _has_column(engine: Engine, table: str, name: str) -> bool:
+    return any(column["name"] == name for column in inspect(engine).get_columns(table))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m app.models.migrations upgrade [--vacuum]"""
+    from .database import engine, Base
+    from . import content, stats, usage   # noqa: F401 — register every table on Base.metadata
+    from ..services.search_index import ensure_search_index
+
+    parser = argparse.ArgumentParser(description="Upgrade the database schema in place")
+    parser.add_argument("command", choices=["upgrade"])
+    parser.add_argument("--vacuum", action="store_true", help="Afterwards, shrink the SQLite file (rewrites it)")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    report = upgrade_schema(engine, destructive=True)
+    ensure_search_index(engine)
+    saved = report["bytes_before"] - report["bytes_after"]
+    print(f"raw_data: {report['rows']} rows compacted, {report['kept']} kept in content_raw, "
+          f"{report['bytes_before']:,} → {report['bytes_after']:,} bytes ({saved:,} saved)")
+    if args.vacuum:
+        sizes = vacuum(engine)
+        if sizes:
+            print(f"Database file: {sizes[0]:,} → {sizes[1]:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
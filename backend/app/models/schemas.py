@@ -23,6 +23,13 @@ class CategoryType(str, Enum):
     OTHER = "other"
 
 # Content Models
+class CategorySource(str, Enum):
+    """Who picked a save's category — the local classifier only trains on GEMINI and HASHTAG"""
+    GEMINI = "gemini"      # Gemini profile
+    HASHTAG = "hashtag"    # the user's #category
+    LOCAL = "local"        # the local classifier itself
+    KEYWORD = "keyword"    # keyword matching
+
 class ContentBase(BaseModel):
     url: str
     platform: PlatformType
@@ -36,6 +43,7 @@ class ContentBase(BaseModel):
 
 class ContentCreate(ContentBase):
     user_phone: str
+    category_source: Optional[CategorySource] = None
 
 class ContentUpdate(BaseModel):
     title: Optional[str] = None
@@ -43,12 +51,15 @@ class ContentUpdate(BaseModel):
     category: Optional[CategoryType] = None
     tags: Optional[List[str]] = None
     ai_summary: Optional[str] = None
+    category_source: Optional[CategorySource] = None
 
 class ContentResponse(ContentBase):
     id: int
     user_phone: str
     created_at: datetime
     updated_at: Optional[datetime] = None  # FIX: was required datetime, crashes when None
+    snippet: Optional[str] = None  # highlighted match, only set by full-text search
+    similarity: Optional[float] = None  # cosine score, only set by similar / semantic search
 
     class Config:
         from_attributes = True
@@ -69,8 +80,29 @@ class APIResponse(BaseModel):
     message: str
     data: Optional[dict] = None
 
+class ContentCard(BaseModel):
+    """
+    A list-page item. By default exactly these (card) fields; `?fields=` may
+    return fewer or add other ContentResponse fields, so only id is required.
+    """
+    id: int
+    url: Optional[str] = None
+    platform: Optional[PlatformType] = None
+    title: Optional[str] = None
+    category: Optional[CategoryType] = None
+    tags: Optional[List[str]] = None
+    ai_summary: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    snippet: Optional[str] = None
+    similarity: Optional[float] = None
+
+    class Config:
+        extra = "allow"
+
 class ContentListResponse(BaseModel):
-    contents: List[ContentResponse]
+    contents: List[ContentCard]
     total: int
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
\ No newline at end of file
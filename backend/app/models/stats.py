@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, JSON
+from sqlalchemy.sql import func
+from .database import Base
+
+class UserStats(Base):
+    """Per-user rollup maintained alongside `contents` — the stats endpoint is one PK lookup"""
+    __tablename__ = "user_stats"
+
+    user_phone = Column(String(20), primary_key=True)
+    total_contents = Column(Integer, nullable=False, default=0)
+    category_counts = Column(JSON, nullable=False, default=dict)  # {"coding": 12, ...}
+    platform_counts = Column(JSON, nullable=False, default=dict)  # {"youtube": 7, ...}
+    version = Column(Integer, default=0)  # bumped on every write to the user's contents — backs ETags
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserStats(user_phone={self.user_phone}, total={self.total_contents})>"
+
+class UserDailyStats(Base):
+    """Saves per user, per day (UTC), per category — backs the stats time series"""
+    __tablename__ = "user_daily_stats"
+
+    user_phone = Column(String(20), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserDailyStats(user_phone={self.user_phone}, day={self.day}, category={self.category}, count={self.count})>"
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from .database import Base
+
+class ProviderUsage(Base):
+    __tablename__ = "provider_usage"
+
+    provider = Column(String(50), primary_key=True)
+    period = Column(String(7), primary_key=True)  # billing month, YYYY-MM (UTC)
+    used = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ProviderUsage(provider={self.provider}, period={self.period}, used={self.used})>"
@@ -1,4 +1,3 @@
-from openai import OpenAI
 import os
 from typing import Dict, Optional, List
 import logging
@@ -8,6 +7,7 @@ logger = logging.getLogger(__name__)
 
 class AIService:
     def __init__(self):
+        from openai import OpenAI
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         if not self.client.api_key:
             logger.warning("OpenAI API key not found in environment variables")
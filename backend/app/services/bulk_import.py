@@ -0,0 +1,205 @@
+import asyncio
+import codecs
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+from ..models.database import session_scope
+from ..models.schemas import ContentCreate
+from .content_service import AsyncContentService
+from .url_utils import canonicalize_url, extract_links
+
+logger = logging.getLogger(__name__)
+
+Link = Tuple[str, Optional[str]]   # (url, #category hint)
+
+async def read_links(chunks: AsyncIterator[bytes], max_links: int) -> Tuple[List[Link], int, int]:
+    """
+    Stream a chat export / link list line by line and collect its links,
+    de-duplicated by canonical URL (first occurrence wins).
+    Returns (links, duplicates_skipped, truncated): links found after the
+    first `max_links` are not imported, only counted in `truncated`.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    seen: Dict[str, bool] = {}
+    links: List[Link] = []
+    duplicates = truncated = 0
+    buffer = ""
+
+    def take(line: str):
+        nonlocal duplicates, truncated
+        for url, category in extract_links(line):
+            key = canonicalize_url(url)
+            if key in seen:
+                duplicates += 1
+            elif len(links) < max_links:
+                seen[key] = True
+                links.append((url, category))
+            else:
+                truncated += 1   # not remembered — memory stays bounded by max_links
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            take(line)
+    take(buffer + decoder.decode(b"", final=True))
+    return links, duplicates, truncated
+
+
+@dataclass
+class ImportJob:
+    """Progress of one bulk import, polled through the job-status endpoint"""
+    id: str
+    user_phone: str
+    total: int
+    status: str = "queued"          # queued | running | done | failed | cancelled
+    processed: int = 0
+    saved: int = 0
+    duplicates: int = 0             # repeated links in the upload (not in total)
+    truncated: int = 0              # links past IMPORT_MAX_LINKS, not imported (not in total)
+    skipped: int = 0                # already saved by the user
+    failed: int = 0
+    errors: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id":          self.id,
+            "user_phone":  self.user_phone,
+            "status":      self.status,
+            "total":       self.total,
+            "processed":   self.processed,
+            "saved":       self.saved,
+            "duplicates":  self.duplicates,
+            "truncated":   self.truncated,
+            "skipped":     self.skipped,
+            "failed":      self.failed,
+            "errors":      self.errors,
+            "created_at":  self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class ImportManager:
+    """
+    Runs bulk imports in the background: `concurrency` links are scraped and
+    enriched at a time by `build`, and rows are written `batch_size` per
+    transaction. Jobs are kept in memory (the most recent `keep` finished ones).
+    """
+
+    MAX_ERRORS = 20
+
+    def __init__(
+        self,
+        build: Callable[[str, str, Optional[str]], Awaitable[Tuple[ContentCreate, str]]],
+        concurrency: int = 4,
+        batch_size: int = 50,
+        keep: int = 100,
+        session_scope=session_scope,
+    ):
+        self.build           = build
+        self.concurrency     = max(1, concurrency)
+        self.batch_size      = max(1, batch_size)
+        self.keep            = keep
+        self.session_scope   = session_scope
+        self._jobs: Dict[str, ImportJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, user_phone: str, links: List[Link], duplicates: int = 0, truncated: int = 0) -> ImportJob:
+        job = ImportJob(id=uuid.uuid4().hex, user_phone=user_phone, total=len(links),
+                        duplicates=duplicates, truncated=truncated)
+        self._jobs[job.id] = job
+        self._prune()
+        task = asyncio.create_task(self._run(job, links), name=f"import-{job.id}")
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self._jobs.get(job_id)
+
+    @property
+    def active(self) -> int:
+        return len(self._tasks)
+
+    async def stop(self):
+        """Cancel running imports (rows already committed stay saved)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished_at]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job.id]
+
+    def _error(self, job: ImportJob, message: str):
+        if len(job.errors) < self.MAX_ERRORS:
+            job.errors.append(message)
+
+    async def _run(self, job: ImportJob, links: List[Link]):
+        job.status = "running"
+        pending: List[ContentCreate] = []
+        try:
+            links = await self._drop_saved(job, links)
+            queue = iter(links)
+
+            async def worker():
+                for url, category in queue:
+                    try:
+                        content, _ = await self.build(url, job.user_phone, category)
+                        pending.append(content)
+                    except Exception as e:
+                        job.failed += 1
+                        self._error(job, f"{url}: {e}")
+                    job.processed += 1
+                    if len(pending) >= self.batch_size:
+                        batch = pending[:]
+                        pending.clear()
+                        await self._save(job, batch)
+
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(links)) or 1)))
+            await self._save(job, pending)
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Import {job.id} failed: {e}", exc_info=True)
+            job.status = "failed"
+            self._error(job, str(e))
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            logger.info(
+                f"Import {job.id} {job.status}: {job.saved} saved, "
+                f"{job.skipped} skipped, {job.failed} failed of {job.total}"
+            )
+
+    async def _drop_saved(self, job: ImportJob, links: List[Link]) -> List[Link]:
+        """Skip links the user already has"""
+        existing = set()
+        async with self.session_scope() as db:
+            service = AsyncContentService(db)
+            for start in range(0, len(links), 500):
+                existing |= await service.existing_urls(job.user_phone, [url for url, _ in links[start:start + 500]])
+        remaining = [(url, category) for url, category in links if canonicalize_url(url) not in existing]
+        job.skipped   += len(links) - len(remaining)
+        job.processed += len(links) - len(remaining)
+        return remaining
+
+    async def _save(self, job: ImportJob, batch: List[ContentCreate]):
+        if not batch:
+            return
+        try:
+            async with self.session_scope() as db:
+                saved = await AsyncContentService(db).create_contents(batch)
+            job.saved   += len(saved)
+            job.skipped += len(batch) - len(saved)
+        except Exception as e:
+            job.failed += len(batch)
+            self._error(job, f"batch of {len(batch)} not saved: {e}")
@@ -0,0 +1,162 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MemoryCache:
+    """In-process TTL + LRU cache. Values are stored as-is."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 5000, ttl: float = 86400):
+        self.max_entries = max_entries
+        self.ttl         = ttl
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (time.time() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Persistent TTL + LRU cache in a standalone SQLite file, so entries survive restarts.
+    Several caches can share one file through different namespaces. Values must be JSON-serializable.
+    The file is opened on first use, not when the cache is built (i.e. at import).
+    """
+
+    backend = "sqlite"
+
+    # Trim to max_entries every N writes instead of on every write
+    EVICT_EVERY = 50
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 50000, ttl: float = 86400):
+        self.path        = path
+        self.namespace   = namespace
+        self.max_entries = max_entries
+        self.ttl         = ttl
+        self._writes     = 0
+        self._lock       = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """The connection, opened (and the table created) on first use — call with the lock held"""
+        if self._db is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_lru ON cache_entries (namespace, accessed_at)"
+            )
+            self._db = conn
+        return self._db
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), now + (ttl or self.ttl), now)
+            )
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?", (self.namespace, now)
+        )
+        self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+            " SELECT key FROM cache_entries WHERE namespace = ?"
+            " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries)
+        )
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+            return cur.rowcount > 0
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+
+def build_cache(backend: str, namespace: str, max_entries: int, ttl: float, path: str = "./cache.db"):
+    """Pick a cache backend by name ("memory" or "sqlite"), falling back to memory"""
+    if backend == "sqlite":
+        # The file itself is only opened on first use — just check it could be created
+        directory = os.path.dirname(os.path.abspath(path))
+        if os.access(directory, os.W_OK):
+            return SQLiteCache(path, namespace, max_entries=max_entries, ttl=ttl)
+        logger.error(f"SQLite cache directory {directory} is not writable — using in-process cache")
+    return MemoryCache(max_entries=max_entries, ttl=ttl)
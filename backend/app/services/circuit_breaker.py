@@ -0,0 +1,246 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type
+import logging
+
+from .cache import MemoryCache
+from .metrics import scrape_provider_seconds, scrape_skipped
+from .url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+class ProviderError(Exception):
+    """The upstream provider itself is failing (quota, auth, 5xx) — counts against its breaker"""
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one upstream provider.
+      closed    → calls flow; opens when the error rate over `window` seconds
+                  reaches `error_threshold` (after at least `min_calls` calls)
+      open      → calls are skipped for `open_seconds`
+      half_open → up to `probes` trial calls; success closes, failure re-opens
+    Also derives an adaptive timeout from the observed p99 latency.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        base_timeout: float = 10.0,
+        min_timeout: float = 2.0,
+        timeout_multiplier: float = 1.5,
+        window: float = 60.0,
+        min_calls: int = 5,
+        error_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+        probes: int = 1,
+    ):
+        self.name               = name
+        self.base_timeout       = base_timeout
+        self.min_timeout        = min(min_timeout, base_timeout)
+        self.timeout_multiplier = timeout_multiplier
+        self.window             = window
+        self.min_calls          = min_calls
+        self.error_threshold    = error_threshold
+        self.open_seconds       = open_seconds
+        self.probes             = probes
+
+        self.state            = self.CLOSED
+        self.opened_at        = 0.0
+        self.open_count       = 0
+        self._probes_inflight = 0
+        self._calls: deque    = deque(maxlen=1000)   # (timestamp, ok, latency)
+        self._p99: Optional[float] = None
+
+    # ── State ────────────────────────────────────────────────────────────────
+    def allow(self) -> bool:
+        """Whether a call may go through right now (reserves a probe slot when half-open)"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self.state = self.HALF_OPEN
+            self._probes_inflight = 0
+            logger.info(f"Circuit '{self.name}' half-open — probing")
+
+        if self.state == self.HALF_OPEN:
+            if self._probes_inflight >= self.probes:
+                return False
+            self._probes_inflight += 1
+        return True
+
+    def record(self, ok: bool, latency: float):
+        now = time.monotonic()
+        self._calls.append((now, ok, latency))
+        self._p99 = None
+
+        if self.state == self.HALF_OPEN:
+            self._probes_inflight = max(0, self._probes_inflight - 1)
+            if ok:
+                self.state = self.CLOSED
+                self._calls.clear()
+                logger.info(f"Circuit '{self.name}' closed")
+            else:
+                self._trip(now)
+            return
+
+        if not ok and self.state == self.CLOSED:
+            calls, errors = self._window_counts(now)
+            if calls >= self.min_calls and errors / calls >= self.error_threshold:
+                self._trip(now)
+
+    def release(self):
+        """A call ended without an outcome (e.g. cancelled) — free its probe slot"""
+        if self.state == self.HALF_OPEN:
+            self._probes_inflight = max(0, self._probes_inflight - 1)
+
+    def _trip(self, now: float):
+        self.state      = self.OPEN
+        self.opened_at  = now
+        self.open_count += 1
+        logger.warning(f"Circuit '{self.name}' opened for {self.open_seconds:.0f}s")
+
+    def _window_counts(self, now: float):
+        cutoff = now - self.window
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+        calls  = len(self._calls)
+        errors = sum(1 for _, ok, _ in self._calls if not ok)
+        return calls, errors
+
+    # ── Latency ──────────────────────────────────────────────────────────────
+    def percentile(self, q: float) -> Optional[float]:
+        latencies = sorted(lat for _, ok, lat in self._calls if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, math.ceil(q * len(latencies)) - 1))
+        return latencies[index]
+
+    def timeout(self) -> float:
+        """p99 of recent successful calls × multiplier, clamped to [min_timeout, base_timeout]"""
+        successes = sum(1 for _, ok, _ in self._calls if ok)
+        if successes < self.min_calls:
+            return self.base_timeout
+        if self._p99 is None:
+            self._p99 = self.percentile(0.99)
+        return max(self.min_timeout, min(self.base_timeout, self._p99 * self.timeout_multiplier))
+
+    def snapshot(self) -> dict:
+        calls, errors = self._window_counts(time.monotonic())
+        p50, p99 = self.percentile(0.5), self.percentile(0.99)
+        return {
+            "state":       self.state,
+            "calls":       calls,
+            "errors":      errors,
+            "error_rate":  round(errors / calls, 4) if calls else 0.0,
+            "p50_ms":      round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms":      round(p99 * 1000, 1) if p99 is not None else None,
+            "timeout_s":   round(self.timeout(), 2),
+            "times_opened": self.open_count,
+        }
+
+
+class BreakerRegistry:
+    """One breaker per provider name, shared across every chain that uses it"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str, **options) -> CircuitBreaker:
+        if name not in self._breakers:
+            defaults = {
+                "window":          float(os.getenv("BREAKER_WINDOW", "60")),
+                "min_calls":       int(os.getenv("BREAKER_MIN_CALLS", "5")),
+                "error_threshold": float(os.getenv("BREAKER_ERROR_THRESHOLD", "0.5")),
+                "open_seconds":    float(os.getenv("BREAKER_OPEN_SECONDS", "30")),
+            }
+            self._breakers[name] = CircuitBreaker(name, **{**defaults, **options})
+        return self._breakers[name]
+
+    def names(self) -> List[str]:
+        return list(self._breakers)
+
+    def snapshot(self) -> dict:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+
+breakers = BreakerRegistry()
+
+# (provider, canonical URL) pairs that recently failed or came back empty
+negative_cache = MemoryCache(
+    max_entries=int(os.getenv("NEGATIVE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("NEGATIVE_CACHE_TTL", "600")),
+)
+
+def forget_failures(url: str) -> int:
+    """Drop the negative-cache entries for `url` with every guarded provider (#refresh retries them all)"""
+    canonical = canonicalize_url(url)
+    return sum(negative_cache.delete(f"{name}:{canonical}") for name in breakers.names())
+
+
+def guarded(
+    name: str,
+    fetch: Callable[[str], Awaitable[Optional[dict]]],
+    timeout: float,
+    provider_errors: Tuple[Type[BaseException], ...] = (ProviderError,),
+) -> Callable[[str], Awaitable[Optional[dict]]]:
+    """
+    Wrap a scrape fetcher with its provider's circuit breaker, adaptive
+    timeout and negative cache. Failures are logged and turned into None.
+    Only `provider_errors` and timeouts count against the breaker — they say
+    nothing about the URL, so they are not negative-cached. Any other error
+    or an empty result is about this URL: negative-cached, breaker untouched.
+    Fetchers that only talk to their provider's own host can pass transport
+    errors (e.g. httpx.TransportError) as provider errors too.
+    """
+    breaker = breakers.get(name, base_timeout=timeout)
+
+    async def call(url: str) -> Optional[dict]:
+        negative_key = f"{name}:{canonicalize_url(url)}"
+        if negative_cache.get(negative_key):
+            scrape_skipped.labels(name, "negative_cache").inc()
+            return None
+        if not breaker.allow():
+            logger.info(f"Circuit '{name}' open — skipping")
+            scrape_skipped.labels(name, "circuit_open").inc()
+            return None
+
+        limit   = breaker.timeout()
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fetch(url), limit)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            elapsed = time.monotonic() - started
+            breaker.record(False, elapsed)
+            scrape_provider_seconds.labels(name, "timeout").observe(elapsed)
+            logger.warning(f"{name} timed out after {limit:.1f}s")
+            return None
+        except provider_errors as e:
+            elapsed = time.monotonic() - started
+            breaker.record(False, elapsed)
+            scrape_provider_seconds.labels(name, "error").observe(elapsed)
+            logger.warning(f"{name} failed: {e}")
+            return None
+        except Exception as e:
+            breaker.release()
+            scrape_provider_seconds.labels(name, "url_error").observe(time.monotonic() - started)
+            negative_cache.set(negative_key, True)
+            logger.warning(f"{name} failed for {url}: {e}")
+            return None
+
+        elapsed = time.monotonic() - started
+        breaker.record(True, elapsed)
+        scrape_provider_seconds.labels(name, "success" if result else "empty").observe(elapsed)
+        if not result:
+            negative_cache.set(negative_key, True)
+        return result
+
+    call.__name__ = f"guarded_{name}"
+    return call
@@ -1,12 +1,34 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, or_, and_, literal, select, String
+from sqlalchemy.exc import IntegrityError
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from datetime import datetime, timezone
 from ..models.content import Content
-from ..models.schemas import ContentCreate, ContentUpdate, PlatformType
+from ..models.stats import UserStats
+from ..models.schemas import ContentCard, ContentCreate, ContentUpdate, ContentResponse, PlatformType
+from .search_index import search_ids, count_matches
+from .pagination import encode_cursor, decode_cursor, InvalidCursor
+from .stats_rollup import StatsRollup
+from .url_utils import canonicalize_url
+from . import events
+from .vector_index import vector_index, embed_content, embed_text
+import inspect
 import logging
 
+from starlette.concurrency import run_in_threadpool
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+class DuplicateContent(Exception):
+    """The user already saved this link (same canonical URL)"""
+
+    def __init__(self, existing: Content):
+        super().__init__(f"Already saved as content {existing.id}")
+        self.existing = existing
+
+
 class ContentService:
     def __init__(self, db: Session):
         self.db = db
@@ -14,36 +36,141 @@ class ContentService:
     def create_content(self, content_data: ContentCreate) -> Content:
         """Create new content entry"""
         try:
-            db_content = Content(
-                user_phone=content_data.user_phone,
-                url=str(content_data.url),
-                platform=content_data.platform,
-                title=content_data.title,
-                description=content_data.description,
-                category=content_data.category,
-                tags=content_data.tags,
-                ai_summary=content_data.ai_summary,
-                media_url=str(content_data.media_url) if content_data.media_url else None,
-                thumbnail_url=str(content_data.thumbnail_url) if content_data.thumbnail_url else None,
-                raw_data=content_data.dict()
-            )
+            db_content = self._to_row(content_data)
             
             self.db.add(db_content)
+            StatsRollup(self.db).record_created(db_content)
             self.db.commit()
             self.db.refresh(db_content)
+            self._index_vectors(vector_index.add, [db_content])
+            self._publish(events.CONTENT_CREATED, [db_content])
             
             logger.info(f"Created content: {db_content.id}")
             return db_content
             
+        except IntegrityError:
+            # Lost a race with another save of the same link
+            self.db.rollback()
+            existing = self.find_by_url(content_data.user_phone, str(content_data.url))
+            if existing is None:
+                raise
+            raise DuplicateContent(existing)
         except Exception as e:
             logger.error(f"Error creating content: {e}")
             self.db.rollback()
             raise
 
-    def get_user_contents(self, user_phone: str, skip: int = 0, limit: int = 50) -> List[Content]:
-        """Get all content for a user"""
+    def create_contents(self, contents: List[ContentCreate]) -> List[Content]:
+        """
+        Create many content entries in one transaction. Links the user already
+        saved are skipped, so the result can be shorter than `contents`.
+        """
+        try:
+            return self._insert_many(contents)
+        except IntegrityError:
+            # A link was saved meanwhile — drop everything already present and retry once
+            self.db.rollback()
+            saved = self.existing_urls(contents[0].user_phone, [str(c.url) for c in contents]) \
+                if len({c.user_phone for c in contents}) == 1 else None
+            if not saved:
+                raise
+            return self._insert_many([c for c in contents if canonicalize_url(str(c.url)) not in saved])
+
+    def _insert_many(self, contents: List[ContentCreate]) -> List[Content]:
+        if not contents:
+            return []
+        try:
+            db_contents = [self._to_row(content_data) for content_data in contents]
+            self.db.add_all(db_contents)
+            StatsRollup(self.db).record_created(*db_contents)
+            self.db.flush()
+            # Embed before commit expires the rows, write the vectors once it succeeded
+            embedded = self._index_vectors(vector_index.embed, db_contents) or {}
+            self.db.commit()
+            self._index_vectors(vector_index.store, embedded)
+            self._publish(events.CONTENT_CREATED, db_contents)
+
+            logger.info(f"Created {len(db_contents)} contents")
+            return db_contents
+
+        except IntegrityError:
+            self.db.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Error creating contents: {e}")
+            self.db.rollback()
+            raise
+
+    @staticmethod
+    def _to_row(content_data: ContentCreate) -> Content:
+        return Content(
+            user_phone=content_data.user_phone,
+            url=str(content_data.url),
+            canonical_url=canonicalize_url(str(content_data.url)),
+            platform=content_data.platform,
+            title=content_data.title,
+            description=content_data.description,
+            category=content_data.category,
+            category_source=content_data.category_source,
+            tags=content_data.tags,
+            ai_summary=content_data.ai_summary,
+            media_url=str(content_data.media_url) if content_data.media_url else None,
+            thumbnail_url=str(content_data.thumbnail_url) if content_data.thumbnail_url else None,
+            # Only what the columns above do not already hold (usually nothing)
+            raw_data=content_data.dict(exclude=set(Content.__table__.columns.keys()))
+        )
+
+    def existing_urls(self, user_phone: str, urls: List[str]) -> set:
+        """Canonical forms of those `urls` the user has already saved"""
+        if not urls:
+            return set()
+        canonical = {canonicalize_url(url) for url in urls}
+        rows = self.db.query(Content.canonical_url)\
+            .filter(Content.user_phone == user_phone, Content.canonical_url.in_(canonical))\
+            .all()
+        return {url for (url,) in rows}
+
+    def find_by_url(self, user_phone: str, url: str) -> Optional[Content]:
+        """The user's existing save of this link (any variant of the URL), via the unique index"""
         try:
             return self.db.query(Content)\
+                .filter(Content.user_phone == user_phone, Content.canonical_url == canonicalize_url(url))\
+                .first()
+        except Exception as e:
+            logger.error(f"Error finding content by URL: {e}")
+            raise
+
+    # What the dashboard cards render — the default list projection (no
+    # description, media_url or raw_data). snippet / similarity are set by search.
+    CARD_FIELDS = tuple(ContentCard.model_fields)
+    RESPONSE_FIELDS = tuple(ContentResponse.model_fields)
+
+    @staticmethod
+    def _project(query, fields: Optional[Sequence[str]]):
+        """Load only the columns behind `fields` (None = whole rows); id and created_at always, for cursors"""
+        if fields is None:
+            return query
+        columns = Content.__table__.columns
+        return query.options(load_only(
+            Content.created_at, *(getattr(Content, f) for f in fields if f in columns and f != "id")
+        ))
+
+    @staticmethod
+    def as_dict(content: Content, fields: Sequence[str]) -> dict:
+        """Plain dict of the requested fields, ready for JSON (search-only fields are skipped when unset)"""
+        record = {}
+        for field in fields:
+            value = getattr(content, field, None)
+            if value is None and field in ("snippet", "similarity"):
+                continue
+            record[field] = getattr(value, "value", value)
+        return record
+
+    def get_user_contents(self, user_phone: str, skip: int = 0, limit: int = 50,
+                          fields: Optional[Sequence[str]] = None) -> List[Content]:
+        """Get all content for a user"""
+        try:
+            return self._project(self.db.query(Content), fields)\
                 .filter(Content.user_phone == user_phone)\
                 .order_by(Content.created_at.desc())\
                 .offset(skip)\
@@ -53,6 +180,123 @@ class ContentService:
             logger.error(f"Error getting user contents: {e}")
             raise
 
+    def list_contents(
+        self,
+        user_phone: str,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Content], Optional[str]]:
+        """
+        Keyset page of a user's content, newest first, ordered by (created_at, id).
+        Returns (contents, next_cursor); next_cursor is None on the last page.
+        Raises InvalidCursor for a malformed cursor.
+        """
+        try:
+            query = self._project(self.db.query(Content), fields).filter(Content.user_phone == user_phone)
+            if category:
+                query = query.filter(Content.category == category)
+            if cursor:
+                created_at, content_id = decode_cursor(cursor)
+                boundary = self._created_at_param(created_at)
+                query = query.filter(or_(
+                    Content.created_at < boundary,
+                    and_(Content.created_at == boundary, Content.id < content_id)
+                ))
+
+            contents = query.order_by(Content.created_at.desc(), Content.id.desc())\
+                .limit(limit + 1)\
+                .all()
+
+            next_cursor = None
+            if len(contents) > limit:
+                last = contents[limit - 1]
+                next_cursor = encode_cursor(last.created_at, last.id)
+            return contents[:limit], next_cursor
+        except InvalidCursor:
+            raise
+        except Exception as e:
+            logger.error(f"Error listing contents: {e}")
+            raise
+
+    def _created_at_param(self, value: datetime):
+        """
+        SQLite keeps created_at as text ('YYYY-MM-DD HH:MM:SS' from CURRENT_TIMESTAMP)
+        while a bound datetime renders with '.ffffff' — compare in the stored format.
+        """
+        if self.db.get_bind().dialect.name != "sqlite":
+            return value
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        stored = value.strftime("%Y-%m-%d %H:%M:%S")
+        if value.microsecond:
+            stored += f".{value.microsecond:06d}"
+        return literal(stored, String)
+
+    def count_contents(self, user_phone: str, category: Optional[str] = None, query: Optional[str] = None) -> int:
+        """Exact total for a listing — an index-only count, rows are never loaded"""
+        try:
+            if query:
+                matches = count_matches(self.db, user_phone, query)
+                if matches is not None:
+                    return matches
+                search_pattern = f"%{query}%"
+                return self.db.query(func.count(Content.id))\
+                    .filter(
+                        Content.user_phone == user_phone,
+                        (
+                            Content.title.ilike(search_pattern) |
+                            Content.description.ilike(search_pattern) |
+                            Content.ai_summary.ilike(search_pattern) |
+                            Content.category.ilike(search_pattern)
+                        )
+                    )\
+                    .scalar()
+
+            count_query = self.db.query(func.count(Content.id)).filter(Content.user_phone == user_phone)
+            if category:
+                count_query = count_query.filter(Content.category == category)
+            return count_query.scalar()
+        except Exception as e:
+            logger.error(f"Error counting contents: {e}")
+            raise
+
+    EXPORT_COLUMNS = (
+        "id", "url", "platform", "title", "description", "category", "tags",
+        "ai_summary", "media_url", "thumbnail_url", "created_at", "updated_at",
+    )
+
+    def iter_export_rows(
+        self,
+        user_phone: str,
+        category: Optional[str] = None,
+        platform: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        chunk_size: int = 500
+    ) -> Iterator:
+        """
+        Stream a user's content as plain rows (EXPORT_COLUMNS, oldest first)
+        through a server-side cursor, `chunk_size` rows per fetch — no ORM
+        objects, and raw_data is never read.
+        """
+        stmt = select(*(getattr(Content, column) for column in self.EXPORT_COLUMNS))\
+            .where(Content.user_phone == user_phone)
+        if category:
+            stmt = stmt.where(Content.category == category)
+        if platform:
+            stmt = stmt.where(Content.platform == platform)
+        if since:
+            stmt = stmt.where(Content.created_at >= self._created_at_param(since))
+        if until:
+            stmt = stmt.where(Content.created_at < self._created_at_param(until))
+        stmt = stmt.order_by(Content.created_at, Content.id)\
+            .execution_options(yield_per=chunk_size)
+
+        for partition in self.db.execute(stmt).partitions():
+            yield from partition
+
     def get_content_by_id(self, content_id: int) -> Optional[Content]:
         """Get content by ID"""
         try:
@@ -61,11 +305,33 @@ class ContentService:
             logger.error(f"Error getting content by ID: {e}")
             raise
 
-    def search_contents(self, user_phone: str, query: str, skip: int = 0, limit: int = 50) -> List[Content]:
-        """Search content by query"""
+    def search_contents(self, user_phone: str, query: str, skip: int = 0, limit: int = 50,
+                        fields: Optional[Sequence[str]] = None) -> List[Content]:
+        """
+        Search content by query. Uses the full-text index (BM25 / ts_rank, prefix
+        terms, highlighted `snippet` on each result) when available, ILIKE otherwise.
+        """
         try:
+            ranked = search_ids(self.db, user_phone, query, skip, limit)
+            if ranked is not None:
+                if not ranked:
+                    return []
+                by_id = {
+                    c.id: c for c in self._project(self.db.query(Content), fields)
+                    .filter(Content.id.in_([content_id for content_id, _, _ in ranked]))
+                    .all()
+                }
+                results = []
+                for content_id, rank, snippet in ranked:
+                    content = by_id.get(content_id)
+                    if content is not None:
+                        content.snippet     = snippet
+                        content.search_rank = rank
+                        results.append(content)
+                return results
+
             search_pattern = f"%{query}%"
-            return self.db.query(Content)\
+            return self._project(self.db.query(Content), fields)\
                 .filter(
                     Content.user_phone == user_phone,
                     (
@@ -83,10 +349,11 @@ class ContentService:
             logger.error(f"Error searching contents: {e}")
             raise
 
-    def get_contents_by_category(self, user_phone: str, category: str, skip: int = 0, limit: int = 50) -> List[Content]:
+    def get_contents_by_category(self, user_phone: str, category: str, skip: int = 0, limit: int = 50,
+                                 fields: Optional[Sequence[str]] = None) -> List[Content]:
         """Get contents by category"""
         try:
-            return self.db.query(Content)\
+            return self._project(self.db.query(Content), fields)\
                 .filter(
                     Content.user_phone == user_phone,
                     Content.category == category
@@ -106,12 +373,17 @@ class ContentService:
             if not db_content:
                 return None
 
+            old_category = db_content.category
             update_data = content_update.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_content, field, value)
+            StatsRollup(self.db).record_updated(db_content, old_category)
 
             self.db.commit()
             self.db.refresh(db_content)
+            if update_data.keys() & {"title", "description", "ai_summary", "tags"}:
+                self._index_vectors(vector_index.update, db_content)
+            self._publish(events.CONTENT_UPDATED, [db_content])
             
             logger.info(f"Updated content: {content_id}")
             return db_content
@@ -128,8 +400,12 @@ class ContentService:
             if not db_content:
                 return False
 
+            user_phone = db_content.user_phone
             self.db.delete(db_content)
+            StatsRollup(self.db).record_deleted(db_content)
             self.db.commit()
+            self._index_vectors(vector_index.remove, user_phone, content_id)
+            self._publish(events.CONTENT_DELETED, user_phone=user_phone, content_id=content_id)
             
             logger.info(f"Deleted content: {content_id}")
             return True
@@ -139,22 +415,174 @@ class ContentService:
             self.db.rollback()
             raise
 
+    def _publish(self, event_type: str, contents: List[Content] = (), user_phone: Optional[str] = None,
+                 content_id: Optional[int] = None):
+        """Push committed changes to the user's live dashboards, then their new stats"""
+        users = {user_phone} if user_phone else {c.user_phone for c in contents}
+        for user in users:
+            if not events.event_broker.wants(user):
+                continue
+            if content_id is not None:
+                events.publish(event_type, user, {"id": content_id})
+            for content in contents:
+                if content.user_phone == user:
+                    events.publish(event_type, user, {
+                        "content": ContentResponse.from_orm(content).model_dump(mode="json")
+                    })
+            events.publish(events.STATS_CHANGED, user, {"stats": StatsRollup(self.db).get(user)})
+
+    @staticmethod
+    def _index_vectors(operation, *args):
+        """Vectors are derived data — a failure is logged, never fails the save"""
+        try:
+            return operation(*args)
+        except Exception as e:
+            logger.error(f"Vector index {operation.__name__} failed: {e}")
+
+    def _vector_rows(self, user_phone: str) -> List[Content]:
+        return self.db.query(Content).filter(Content.user_phone == user_phone).order_by(Content.id).all()
+
+    def _ensure_vectors(self, user_phone: str):
+        """Build a user's vectors from the table the first time they are needed"""
+        if not vector_index.user(user_phone).exists():
+            vector_index.rebuild(user_phone, self._vector_rows(user_phone))
+
+    def _load_ranked(self, ranked: List[Tuple[int, float]], fields: Optional[Sequence[str]] = None) -> List[Content]:
+        """Load (id, cosine) hits in order, dropping ones with nothing in common"""
+        ranked = [(content_id, score) for content_id, score in ranked if score > 0]
+        by_id = {
+            c.id: c for c in self._project(self.db.query(Content), fields)
+            .filter(Content.id.in_([content_id for content_id, _ in ranked]))
+            .all()
+        }
+        results = []
+        for content_id, score in ranked:
+            content = by_id.get(content_id)
+            if content is not None:
+                content.similarity = round(score, 4)
+                results.append(content)
+        return results
+
+    def similar_contents(self, content_id: int, limit: int = 10) -> Optional[List[Content]]:
+        """The user's saves most similar to `content_id` (None if it does not exist)"""
+        try:
+            content = self.get_content_by_id(content_id)
+            if not content:
+                return None
+            if not vector_index.available:
+                return []
+            self._ensure_vectors(content.user_phone)
+            query = vector_index.vector_for(content.user_phone, content_id)
+            if query is None:
+                query = embed_content(content)
+            ranked = vector_index.search(content.user_phone, query, limit, exclude=content_id)
+            return self._load_ranked(ranked)
+        except Exception as e:
+            logger.error(f"Error finding similar contents: {e}")
+            raise
+
+    def semantic_search(self, user_phone: str, query: str, limit: int = 50,
+                        fields: Optional[Sequence[str]] = None) -> List[Content]:
+        """Saves closest to the query text in the local embedding space"""
+        try:
+            if not vector_index.available:
+                return self.search_contents(user_phone, query, 0, limit, fields)
+            self._ensure_vectors(user_phone)
+            ranked = vector_index.search(user_phone, embed_text([(query, 1.0)]), limit)
+            return self._load_ranked(ranked, fields)
+        except Exception as e:
+            logger.error(f"Error in semantic search: {e}")
+            raise
+
+    def user_version(self, user_phone: str) -> Optional[tuple]:
+        """Changes whenever any of the user's contents change (one PK lookup, no rows loaded)"""
+        return StatsRollup(self.db).version(user_phone)
+
+    def content_version(self, content_id: int) -> Optional[tuple]:
+        """Version of one content row plus its owner's, read from the index — None if it does not exist"""
+        row = self.db.query(Content.user_phone, Content.created_at, Content.updated_at, UserStats.version)\
+            .outerjoin(UserStats, UserStats.user_phone == Content.user_phone)\
+            .filter(Content.id == content_id)\
+            .first()
+        return tuple(row) if row else None
+
     def get_user_stats(self, user_phone: str) -> dict:
-        """Get user content statistics"""
+        """Get user content statistics (from the maintained rollup)"""
         try:
-            total_contents = self.db.query(Content)\
-                .filter(Content.user_phone == user_phone)\
-                .count()
-            
-            category_counts = self.db.query(Content.category, func.count(Content.id))\
-                .filter(Content.user_phone == user_phone)\
-                .group_by(Content.category)\
-                .all()
-            
-            return {
-                "total_contents": total_contents,
-                "category_counts": dict(category_counts)
-            }
+            return StatsRollup(self.db).get(user_phone)
         except Exception as e:
             logger.error(f"Error getting user stats: {e}")
             raise
+
+    def get_user_timeseries(self, user_phone: str, days: int = 30, category: Optional[str] = None) -> dict:
+        """Saves per day per category over the last `days` days"""
+        try:
+            return StatsRollup(self.db).timeseries(user_phone, days, category)
+        except Exception as e:
+            logger.error(f"Error getting user timeseries: {e}")
+            raise
+
+
+class AsyncContentService:
+    """
+    Awaitable ContentService for async code: `await service.list_contents(...)`
+    takes the same arguments as the sync method. With an AsyncSession the
+    sync implementation runs through run_sync on the async driver's
+    connection; with a plain Session (no async driver installed) it runs on
+    a worker thread. Either way the event loop is never blocked on the
+    database.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def run(self, operation: Callable[[ContentService], T]) -> T:
+        if isinstance(self.db, Session):
+            return await run_in_threadpool(operation, ContentService(self.db))
+        return await self.db.run_sync(lambda session: operation(ContentService(session)))
+
+    # ── Vector search: run_sync executes on the event loop thread, so only the
+    # database reads go through it — embedding, first-touch rebuilds, IVF
+    # training and the matrix scans run on a worker thread
+    async def _ensure_vectors(self, user_phone: str):
+        if not vector_index.user(user_phone).exists():
+            contents = await self.run(lambda service: service._vector_rows(user_phone))
+            await run_in_threadpool(vector_index.rebuild, user_phone, contents)
+
+    async def similar_contents(self, content_id: int, limit: int = 10) -> Optional[List[Content]]:
+        content = await self.get_content_by_id(content_id)
+        if not content:
+            return None
+        if not vector_index.available:
+            return []
+        await self._ensure_vectors(content.user_phone)
+
+        def rank():
+            query = vector_index.vector_for(content.user_phone, content_id)
+            if query is None:
+                query = embed_content(content)
+            return vector_index.search(content.user_phone, query, limit, exclude=content_id)
+        ranked = await run_in_threadpool(rank)
+        return await self.run(lambda service: service._load_ranked(ranked))
+
+    async def semantic_search(self, user_phone: str, query: str, limit: int = 50,
+                              fields: Optional[Sequence[str]] = None) -> List[Content]:
+        if not vector_index.available:
+            return await self.search_contents(user_phone, query, 0, limit, fields)
+        await self._ensure_vectors(user_phone)
+        ranked = await run_in_threadpool(
+            lambda: vector_index.search(user_phone, embed_text([(query, 1.0)]), limit)
+        )
+        return await self.run(lambda service: service._load_ranked(ranked, fields))
+
+    def __getattr__(self, name: str):
+        method = getattr(ContentService, name)
+        # Constants and static helpers are returned as they are
+        if name.startswith("_") or not callable(method) \
+                or isinstance(inspect.getattr_static(ContentService, name), staticmethod):
+            return method
+
+        async def call(*args, **kwargs):
+            return await self.run(lambda service: getattr(service, name)(*args, **kwargs))
+        call.__name__ = name
+        return call
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EnrichmentBatcher:
+    """
+    Collects concurrent enrichment requests for a short window (or until
+    `max_items` are pending) and sends them to Gemini as one batch prompt.
+    Callers just await `analyze()` as they would `GeminiService.analyze_url`.
+    """
+
+    def __init__(self, service, window: float = 0.2, max_items: int = 8):
+        self.service   = service
+        self.window    = window
+        self.max_items = max(1, max_items)
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()   # the loop only keeps weak references
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.max_items > 1
+
+    async def analyze(self, url: str, platform: str, scraped_title: str = "", scraped_desc: str = "") -> Dict:
+        if not self.enabled:
+            return await self.service.analyze_url(url, platform, scraped_title, scraped_desc)
+
+        loop   = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((
+            {"url": url, "platform": platform, "scraped_title": scraped_title, "scraped_desc": scraped_desc},
+            future,
+        ))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        """Send whatever is still pending and wait for every in-flight batch"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            if len(items) == 1:
+                item    = items[0]
+                results = [await self.service.analyze_url(
+                    item["url"], item["platform"], item["scraped_title"], item["scraped_desc"]
+                )]
+            else:
+                results = await self.service.analyze_batch(items)
+        except Exception as e:
+            logger.error(f"Enrichment batch of {len(items)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,126 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+from typing import Optional
+import logging
+
+from .cache import MemoryCache, build_cache
+from .url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+class EnrichmentCache:
+    """
+    Persistent cache of LLM enrichment profiles, keyed by a hash of the
+    normalized prompt inputs plus the model name and prompt version —
+    changing either one makes old entries unreachable. Profiles are copied
+    in and out, so callers may edit what they get (e.g. tags) freely.
+    A persistent backend sits behind an in-process front tier; the async
+    methods reach it through a worker thread, never on the event loop.
+    """
+
+    def __init__(self, backend, front_size: int = 2000):
+        self.backend = backend
+        self.front   = MemoryCache(max_entries=front_size, ttl=backend.ttl) \
+            if backend.backend != "memory" else None
+        self.hits    = 0
+        self.misses  = 0
+
+    @staticmethod
+    def key_for(model: str, prompt_version: str, url: str, platform: str, title: str = "", desc: str = "") -> str:
+        def norm(text: str) -> str:
+            return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+        payload = json.dumps([
+            model,
+            prompt_version,
+            canonicalize_url(url) if url else '',
+            norm(platform),
+            norm(title),
+            norm(desc),
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # ── Async (event loop) ───────────────────────────────────────────────────
+    async def aget(self, key: str) -> Optional[dict]:
+        value = self.front.get(key) if self.front is not None else None
+        if value is None:
+            value = await asyncio.to_thread(self._read, key)
+        return self._counted(value)
+
+    async def aset(self, key: str, profile: dict):
+        profile = copy.deepcopy(profile)
+        if self.front is not None:
+            self.front.set(key, profile)
+        await asyncio.to_thread(self._write, key, profile)
+
+    async def ainvalidate(self, key: str) -> bool:
+        if self.front is not None:
+            self.front.delete(key)
+        return await asyncio.to_thread(self.backend.delete, key)
+
+    # ── Sync (scripts, worker threads) ───────────────────────────────────────
+    def get(self, key: str) -> Optional[dict]:
+        value = self.front.get(key) if self.front is not None else None
+        return self._counted(value if value is not None else self._read(key))
+
+    def set(self, key: str, profile: dict):
+        profile = copy.deepcopy(profile)
+        if self.front is not None:
+            self.front.set(key, profile)
+        self._write(key, profile)
+
+    def invalidate(self, key: str) -> bool:
+        if self.front is not None:
+            self.front.delete(key)
+        return self.backend.delete(key)
+
+    def clear(self):
+        if self.front is not None:
+            self.front.clear()
+        self.backend.clear()
+
+    def _read(self, key: str) -> Optional[dict]:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Enrichment cache read failed: {e}")
+            return None
+        if value is not None and self.front is not None:
+            self.front.set(key, value)
+        return value
+
+    def _write(self, key: str, profile: dict):
+        try:
+            self.backend.set(key, profile)
+        except Exception as e:
+            logger.warning(f"Enrichment cache write failed: {e}")
+
+    def _counted(self, value: Optional[dict]) -> Optional[dict]:
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend":   self.backend.backend,
+            "entries":   len(self.backend),
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+enrichment_cache = EnrichmentCache(build_cache(
+    backend=os.getenv("ENRICHMENT_CACHE_BACKEND", "sqlite").lower(),
+    namespace="enrichment",
+    max_entries=int(os.getenv("ENRICHMENT_CACHE_SIZE", "20000")),
+    ttl=float(os.getenv("ENRICHMENT_CACHE_TTL", str(30 * 86400))),
+    path=os.getenv("CACHE_DB_PATH", "./cache.db"),
+))
@@ -0,0 +1,130 @@
+import asyncio
+import importlib
+from abc import ABC, abstractmethod
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Event types pushed to dashboards
+CONTENT_CREATED = "content-created"
+CONTENT_UPDATED = "content-updated"
+CONTENT_DELETED = "content-deleted"
+STATS_CHANGED   = "stats-changed"
+RESYNC          = "resync"          # subscriber fell behind — reload everything
+
+@dataclass
+class Event:
+    type: str
+    user_phone: str
+    data: dict = field(default_factory=dict)
+
+
+class Broker(ABC):
+    """
+    Pub/sub interface for per-user events. The default LocalBroker works
+    within one process; for several workers set EVENT_BROKER=package.module:Class
+    to a subclass backed by a shared bus (Redis pub/sub, Postgres LISTEN, …).
+    """
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @abstractmethod
+    def publish(self, event: Event):
+        """Fire-and-forget; safe to call from any thread, never raises"""
+
+    @abstractmethod
+    def subscribe(self, user_phone: str) -> AsyncIterator[Event]:
+        """Events for one user until the consumer stops iterating"""
+
+    def subscribers(self) -> int:
+        return 0
+
+    def wants(self, user_phone: str) -> bool:
+        """Whether events for this user may have a listener (lets publishers skip building them)"""
+        return True
+
+
+class LocalBroker(Broker):
+    """In-process fan-out: one bounded queue per subscriber, scoped by user_phone"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    def publish(self, event: Event):
+        if not self.wants(event.user_phone):
+            return
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is None or running is loop:
+            self._deliver(event)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Event):
+        with self._lock:
+            queues = list(self._queues.get(event.user_phone, ()))
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and tell it to reload
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(Event(RESYNC, event.user_phone))
+
+    async def subscribe(self, user_phone: str) -> AsyncIterator[Event]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._queues.setdefault(user_phone, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            with self._lock:
+                queues = self._queues.get(user_phone)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._queues[user_phone]
+
+    def subscribers(self) -> int:
+        return sum(len(queues) for queues in self._queues.values())
+
+    def wants(self, user_phone: str) -> bool:
+        return bool(self._queues.get(user_phone))
+
+
+def get_broker() -> Broker:
+    spec = os.getenv("EVENT_BROKER", "local")
+    if spec == "local":
+        return LocalBroker(queue_size=int(os.getenv("EVENT_QUEUE_SIZE", "100")))
+    module, _, name = spec.partition(":")
+    logger.info(f"Using event broker {spec}")
+    return getattr(importlib.import_module(module), name)()
+
+
+event_broker = get_broker()
+
+def publish(event_type: str, user_phone: str, data: Optional[dict] = None):
+    """Publish after commit; a broker failure is logged, never raised into the write path"""
+    try:
+        event_broker.publish(Event(event_type, user_phone, data or {}))
+    except Exception as e:
+        logger.error(f"Could not publish {event_type}: {e}")
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence
+
+# format → (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv":    ("text/csv", "csv"),
+    "json":   ("application/json", "json"),
+}
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+def _record(columns: Sequence[str], row) -> dict:
+    return {column: _jsonable(value) for column, value in zip(columns, row)}
+
+def ndjson_lines(columns: Sequence[str], rows: Iterable) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(_record(columns, row), ensure_ascii=False) + "\n"
+
+def json_array(columns: Sequence[str], rows: Iterable) -> Iterator[str]:
+    """A single JSON array, written one element at a time"""
+    yield "["
+    separator = ""
+    for row in rows:
+        yield separator + json.dumps(_record(columns, row), ensure_ascii=False)
+        separator = ","
+    yield "]\n"
+
+def csv_lines(columns: Sequence[str], rows: Iterable) -> Iterator[str]:
+    """CSV with a header row; tags are joined with ';'"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(columns)
+    yield flush()
+    for row in rows:
+        record = _record(columns, row)
+        if isinstance(record.get("tags"), list):
+            record["tags"] = ";".join(map(str, record["tags"]))
+        writer.writerow(["" if record[column] is None else record[column] for column in columns])
+        yield flush()
+
+SERIALIZERS = {"ndjson": ndjson_lines, "csv": csv_lines, "json": json_array}
+
+def encode(chunks: Iterable[str], flush_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """UTF-8 encode, coalescing small pieces into ~flush_bytes writes"""
+    pending, size = [], 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= flush_bytes:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream on the fly (constant memory)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)   # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,28 @@
+import json
+from datetime import date, datetime
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:   # stdlib json fallback — same output, slower
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return getattr(value, "value", str(value))
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON; orjson when installed (datetimes as ISO 8601 either way)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response that skips response_model validation — pass plain dicts or pre-encoded bytes"""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return content if isinstance(content, bytes) else dumps(content)
@@ -1,12 +1,40 @@
-import google.generativeai as genai
+import asyncio
 import os
+import time
 from typing import Dict, Optional, List
 import logging
 import json
 from ..models.schemas import CategoryType
+from .enrichment_cache import enrichment_cache
+from .circuit_breaker import ProviderError, breakers
+from .quota import QuotaExceeded, quota_manager
+from .keyword_matcher import keyword_matcher
+from .local_classifier import get_local_classifier, training_text, MIN_CONFIDENCE as LOCAL_MIN_CONFIDENCE
 
 logger = logging.getLogger(__name__)
 
+MODEL_NAME     = 'gemini-1.5-flash'
+# Bump whenever the prompt or response cleaning changes — invalidates cached profiles
+PROMPT_VERSION = 'v1'
+
+VALID_CATEGORIES = ["fitness","coding","food","travel","design","fashion","business","education","entertainment","other"]
+
+PROMPT_GUIDANCE = """Even if you cannot access the URL, infer from:
+- The platform type (Instagram/YouTube/Twitter/Facebook)
+- Any keywords, hashtags or readable words in URL path
+- Common content patterns on that platform
+
+IMPORTANT: Never return generic titles like "Instagram Post" or "YouTube Video".
+Be specific about what this content likely covers based on any clues in the URL."""
+
+PROFILE_SCHEMA = """{
+  "title": "Specific descriptive title inferred from URL and platform",
+  "description": "2-3 sentences about what this content likely covers",
+  "category": "exactly one of: fitness, coding, food, travel, design, fashion, business, education, entertainment, other",
+  "ai_summary": "One punchy sentence about value of this content",
+  "tags": ["tag1", "tag2", "tag3", "tag4"]
+}"""
+
 class GeminiService:
     """
     Uses Google Gemini to intelligently analyze social media URLs.
@@ -24,8 +52,10 @@ class GeminiService:
             logger.warning("GEMINI_API_KEY not set — falling back to keyword matching")
             return
         try:
+            # Imported here: the SDK adds over a second to cold start and is useless without a key
+            import google.generativeai as genai
             genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.model = genai.GenerativeModel(MODEL_NAME)
             logger.info("Gemini AI initialized successfully")
         except Exception as e:
             logger.error(f"Gemini init failed: {e}")
@@ -33,80 +63,197 @@ class GeminiService:
     def is_available(self) -> bool:
         return self.model is not None
 
+    async def _generate(self, prompt: str) -> str:
+        """
+        One generate_content call, off the event loop, behind the Gemini
+        rate limit, circuit breaker and adaptive timeout. Returns the response text.
+        """
+        # Breaker first: an open circuit must not spend rate-limit tokens
+        breaker = breakers.get("gemini", base_timeout=float(os.getenv("GEMINI_TIMEOUT", "30")))
+        if not breaker.allow():
+            raise ProviderError("Gemini circuit open")
+        try:
+            acquired = await quota_manager.acquire("gemini", timeout=float(os.getenv("GEMINI_QUOTA_WAIT", "10")))
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        if not acquired:
+            breaker.release()
+            raise QuotaExceeded("Gemini rate limit or monthly budget reached")
+        await quota_manager.record("gemini")
+
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                asyncio.to_thread(self.model.generate_content, prompt), breaker.timeout()
+            )
+            text = response.text
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record(False, time.monotonic() - started)
+            raise
+        breaker.record(True, time.monotonic() - started)
+        return text
+
+    @staticmethod
+    def _prompt_inputs(scraped_title: str, scraped_desc: str) -> tuple:
+        """Scraped fields exactly as they reach the prompt (placeholders dropped, desc truncated)"""
+        title = scraped_title if scraped_title and scraped_title not in ("Instagram Content", "YouTube Content") else ""
+        desc  = scraped_desc[:300] if scraped_desc and "Saved from" not in scraped_desc else ""
+        return title, desc
+
+    def _cache_key(self, url: str, platform: str, scraped_title: str, scraped_desc: str) -> str:
+        title, desc = self._prompt_inputs(scraped_title, scraped_desc)
+        return enrichment_cache.key_for(MODEL_NAME, PROMPT_VERSION, url, platform, title, desc)
+
+    async def invalidate_cache(self, url: str, platform: str, scraped_title: str = "", scraped_desc: str = "") -> bool:
+        """Drop the cached profile for these inputs so the next call re-enriches"""
+        return await enrichment_cache.ainvalidate(self._cache_key(url, platform, scraped_title, scraped_desc))
+
     async def analyze_url(self, url: str, platform: str, scraped_title: str = "", scraped_desc: str = "") -> Dict:
         """
         MAIN METHOD: Analyzes a URL using Gemini AI.
         Works even when scraping fails — Gemini infers from URL structure
         and its own knowledge of what content exists on each platform.
         Returns: title, description, category, ai_summary, tags
+        Profiles are cached by prompt inputs, so repeat saves skip the LLM call.
         """
+        cache_key = self._cache_key(url, platform, scraped_title, scraped_desc)
+        cached    = await enrichment_cache.aget(cache_key)
+        if cached:
+            return cached
+
         if not self.model:
             return self._keyword_fallback(url, platform, scraped_title, scraped_desc)
 
-        # Build context — use scraped data only if it's actually useful
-        context_parts = [f"URL: {url}", f"Platform: {platform}"]
-        if scraped_title and scraped_title not in ("Instagram Content", "YouTube Content", ""):
-            context_parts.append(f"Scraped title: {scraped_title}")
-        if scraped_desc and "Saved from" not in scraped_desc:
-            context_parts.append(f"Scraped description: {scraped_desc[:300]}")
-
         prompt = f"""You are analyzing a saved social media link. Based on URL and context, return a JSON profile.
 
-{chr(10).join(context_parts)}
-
-Even if you cannot access the URL, infer from:
-- The platform type (Instagram/YouTube/Twitter/Facebook)
-- Any keywords, hashtags or readable words in URL path
-- Common content patterns on that platform
+{chr(10).join(self._context_lines(url, platform, scraped_title, scraped_desc))}
 
-IMPORTANT: Never return generic titles like "Instagram Post" or "YouTube Video".
-Be specific about what this content likely covers based on any clues in the URL.
+{PROMPT_GUIDANCE}
 
 Respond ONLY with valid JSON (no markdown, no code blocks):
-{{
-  "title": "Specific descriptive title inferred from URL and platform",
-  "description": "2-3 sentences about what this content likely covers",
-  "category": "exactly one of: fitness, coding, food, travel, design, fashion, business, education, entertainment, other",
-  "ai_summary": "One punchy sentence about value of this content",
-  "tags": ["tag1", "tag2", "tag3", "tag4"]
-}}"""
+{PROFILE_SCHEMA}"""
 
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text.strip()
-
-            # Strip markdown if Gemini wraps in code blocks
-            if "```" in text:
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-            text = text.strip()
-
-            data = json.loads(text)
-
-            # Validate and clean category
-            raw_cat = data.get("category", "other").lower().strip()
-            valid_cats = ["fitness","coding","food","travel","design","fashion","business","education","entertainment","other"]
-            category = raw_cat if raw_cat in valid_cats else "other"
-
-            tags = [t.lower().strip() for t in data.get("tags", []) if t.strip()][:5]
-            if category not in tags:
-                tags.insert(0, category)
-
-            return {
-                "title":       data.get("title") or f"Content from {platform}",
-                "description": data.get("description") or "",
-                "category":    category,
-                "ai_summary":  data.get("ai_summary") or f"Saved {platform} content",
-                "tags":        tags,
-            }
+            text    = await self._generate(prompt)
+            data    = json.loads(self._strip_markdown(text))
+            profile = self._clean_profile(data, platform)
+            await enrichment_cache.aset(cache_key, profile)
+            return profile
 
         except Exception as e:
             logger.error(f"Gemini analyze_url failed: {e} — using fallback")
             return self._keyword_fallback(url, platform, scraped_title, scraped_desc)
 
+    async def analyze_batch(self, items: List[Dict]) -> List[Dict]:
+        """
+        Enrich several links with ONE Gemini request.
+        items: dicts with url, platform, scraped_title, scraped_desc.
+        Cached items are answered locally; anything the batch response is
+        missing or malformed for falls back to a per-item analyze_url call.
+        """
+        results: List[Optional[Dict]] = [None] * len(items)
+        keys    = [self._cache_key(i["url"], i["platform"], i.get("scraped_title", ""), i.get("scraped_desc", "")) for i in items]
+        todo    = []
+        for n, key in enumerate(keys):
+            cached = await enrichment_cache.aget(key)
+            if cached:
+                results[n] = cached
+            else:
+                todo.append(n)
+
+        if len(todo) > 1 and self.model:
+            blocks = []
+            for pos, n in enumerate(todo):
+                item  = items[n]
+                lines = self._context_lines(item["url"], item["platform"], item.get("scraped_title", ""), item.get("scraped_desc", ""))
+                blocks.append(f"[{pos}]\n" + "\n".join(lines))
+
+            prompt = f"""You are analyzing {len(todo)} saved social media links. Based on each URL and its context, return a JSON profile per link.
+
+{(chr(10) * 2).join(blocks)}
+
+{PROMPT_GUIDANCE}
+
+Respond ONLY with a valid JSON array of {len(todo)} objects (no markdown, no code blocks).
+Each object has an "index" field with the link's number in brackets, plus:
+{PROFILE_SCHEMA}"""
+
+            try:
+                text = await self._generate(prompt)
+                data = json.loads(self._strip_markdown(text))
+                if not isinstance(data, list):
+                    raise ValueError("batch response is not a JSON array")
+                for entry in data:
+                    if not isinstance(entry, dict):
+                        continue
+                    pos = entry.get("index")
+                    if isinstance(pos, int) and 0 <= pos < len(todo) and results[todo[pos]] is None:
+                        n = todo[pos]
+                        profile = self._clean_profile(entry, items[n]["platform"])
+                        await enrichment_cache.aset(keys[n], profile)
+                        results[n] = profile
+                logger.info(f"Gemini batch enriched {sum(results[n] is not None for n in todo)}/{len(todo)} links")
+            except Exception as e:
+                logger.error(f"Gemini analyze_batch failed: {e} — falling back to per-item calls")
+
+        missing = [n for n in todo if results[n] is None]
+        if missing:
+            singles = await asyncio.gather(*[
+                self.analyze_url(
+                    items[n]["url"], items[n]["platform"],
+                    items[n].get("scraped_title", ""), items[n].get("scraped_desc", ""),
+                )
+                for n in missing
+            ])
+            for n, profile in zip(missing, singles):
+                results[n] = profile
+        return results
+
+    def _context_lines(self, url: str, platform: str, scraped_title: str, scraped_desc: str) -> List[str]:
+        """Prompt context — use scraped data only if it's actually useful"""
+        title_in, desc_in = self._prompt_inputs(scraped_title, scraped_desc)
+        context_parts = [f"URL: {url}", f"Platform: {platform}"]
+        if title_in:
+            context_parts.append(f"Scraped title: {title_in}")
+        if desc_in:
+            context_parts.append(f"Scraped description: {desc_in}")
+        return context_parts
+
+    @staticmethod
+    def _strip_markdown(text: str) -> str:
+        """Strip markdown if Gemini wraps in code blocks"""
+        text = text.strip()
+        if "```" in text:
+            text = text.split("```")[1]
+            if text.startswith("json"):
+                text = text[4:]
+        return text.strip()
+
+    @staticmethod
+    def _clean_profile(data: Dict, platform: str) -> Dict:
+        """Validate and clean one Gemini profile"""
+        raw_cat = str(data.get("category") or "other").lower().strip()
+        category = raw_cat if raw_cat in VALID_CATEGORIES else "other"
+
+        tags = [str(t).lower().strip() for t in data.get("tags") or [] if str(t).strip()][:5]
+        if category not in tags:
+            tags.insert(0, category)
+
+        return {
+            "title":       data.get("title") or f"Content from {platform}",
+            "description": data.get("description") or "",
+            "category":    category,
+            "ai_summary":  data.get("ai_summary") or f"Saved {platform} content",
+            "tags":        tags,
+            "source":      "gemini",
+        }
+
     def _keyword_fallback(self, url: str, platform: str, title: str = "", desc: str = "") -> Dict:
-        """Keyword-based fallback when Gemini unavailable"""
+        """Local fallback when Gemini unavailable: trained classifier if confident, else keywords"""
         import re
 
         text = f"{title} {desc} {url}".lower()
@@ -119,23 +266,13 @@ Respond ONLY with valid JSON (no markdown, no code blocks):
             meaningful = [w for w in words if w.lower() not in skip]
             title = " ".join(meaningful[:5]).title() if meaningful else f"Content from {platform}"
 
-        categories = {
-            "fitness":       ['workout','gym','fitness','exercise','yoga','training','health','cardio','muscle'],
-            "coding":        ['code','programming','developer','software','tech','python','javascript','coding','tutorial'],
-            "food":          ['food','recipe','cooking','restaurant','meal','dinner','lunch','breakfast','chef'],
-            "travel":        ['travel','trip','vacation','destination','hotel','beach','mountain','city','tour'],
-            "design":        ['design','art','creative','architecture','graphic','aesthetic','ui','ux'],
-            "fashion":       ['fashion','style','outfit','clothing','dress','trend','wear','ootd'],
-            "business":      ['business','entrepreneur','startup','marketing','finance','money','invest'],
-            "education":     ['learn','tutorial','education','course','study','knowledge','skill','lesson'],
-            "entertainment": ['fun','entertainment','movie','music','game','funny','meme','comedy'],
-        }
-
-        best, best_score = "other", 0
-        for cat, keywords in categories.items():
-            score = sum(1 for kw in keywords if kw in text)
-            if score > best_score:
-                best, best_score = cat, score
+        best   = keyword_matcher.categorize(text)
+        source = "keyword"
+        classifier = get_local_classifier()
+        if classifier is not None:
+            predicted, confidence = classifier.classify(training_text(title, desc, url))
+            if confidence >= LOCAL_MIN_CONFIDENCE and predicted in VALID_CATEGORIES:
+                best, source = predicted, "local"
 
         return {
             "title":       title,
@@ -143,6 +280,7 @@ Respond ONLY with valid JSON (no markdown, no code blocks):
             "category":    best,
             "ai_summary":  f"{title[:60]} — saved from {platform}",
             "tags":        [best, platform],
+            "source":      source,
         }
 
     # ── Legacy compatibility methods ─────────────────────────────────────────
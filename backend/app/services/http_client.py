@@ -0,0 +1,142 @@
+import asyncio
+import importlib.util
+import ipaddress
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import logging
+
+import httpx
+
+try:   # private httpcore API — DNS caching is skipped if a release moves it
+    from httpcore._backends.auto import AutoBackend
+except ImportError:
+    AutoBackend = None
+
+logger = logging.getLogger(__name__)
+
+class _DNSCachingBackend(AutoBackend or object):
+    """httpcore network backend that caches resolved addresses for `ttl` seconds"""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[List[str], float]] = {}
+
+    async def connect_tcp(self, host: str, port: int, **kwargs):
+        addresses = await self._resolve(host, port)
+        error = None
+        for address in list(addresses):
+            try:
+                stream = await super().connect_tcp(address, port, **kwargs)
+            except Exception as exc:
+                # Unreachable address (dead record, no IPv6 route…) — try the next one
+                error = exc
+                continue
+            if address != addresses[0] and address in addresses:
+                # Lead with the address that answered until the entry expires
+                addresses.remove(address)
+                addresses.insert(0, address)
+            return stream
+        # Every address failed — the record may be stale, re-resolve next time
+        self._cache.pop((host, port), None)
+        raise error
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        cached = self._cache.get((host, port))
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (addresses, time.monotonic() + self.ttl)
+        return addresses
+
+
+class HttpClient:
+    """
+    One long-lived async HTTP client shared by the whole scrape layer.
+    Keep-alive pooling, per-host connection limits, DNS caching and HTTP/2
+    (when the `h2` package is installed). Started/closed in the FastAPI lifespan.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_per_host: int = 10,
+        keepalive_expiry: float = 30.0,
+        dns_ttl: float = 300.0,
+    ):
+        self.max_connections  = max_connections
+        self.max_per_host     = max_per_host
+        self.keepalive_expiry = keepalive_expiry
+        self.dns_ttl          = dns_ttl
+        self.http2            = importlib.util.find_spec("h2") is not None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self):
+        if self._client is not None:
+            return
+        transport = httpx.AsyncHTTPTransport(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            retries=1,
+        )
+        # httpx does not expose the network backend — swap it on the pool directly,
+        # keeping httpcore's default backend if its internals have changed
+        pool = getattr(transport, "_pool", None)
+        if AutoBackend is not None and pool is not None and hasattr(pool, "_network_backend"):
+            pool._network_backend = _DNSCachingBackend(ttl=self.dns_ttl)
+        else:
+            logger.warning("httpcore network backend not patchable — DNS caching disabled")
+
+        self._client = httpx.AsyncClient(transport=transport, follow_redirects=True)
+        logger.info(
+            f"HTTP client started (http2={self.http2}, max_connections={self.max_connections}, "
+            f"per_host={self.max_per_host})"
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._host_limits = {}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).hostname or ""
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_limits[host]
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self._client is None:
+            # Scripts and tests that never ran the lifespan
+            await self.start()
+        async with self._host_limit(url):
+            return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+
+http_client = HttpClient(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    max_per_host=int(os.getenv("HTTP_MAX_PER_HOST", "10")),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    dns_ttl=float(os.getenv("HTTP_DNS_TTL", "300")),
+)
@@ -0,0 +1,81 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class IngestJob:
+    """A link waiting to be scraped, enriched and saved in the background"""
+    url: str
+    user_phone: str
+    reply_to: str              # Twilio "From" of the inbound message (whatsapp:+...)
+    reply_from: str            # Twilio "To" of the inbound message — our bot number
+    category_override: Optional[str] = None
+    refresh: bool = False      # re-scrape / re-enrich even if already saved
+
+
+class IngestQueue:
+    """
+    Bounded in-process job queue drained by a fixed pool of worker tasks.
+    Throughput is set by the number of workers, not by how slow upstreams are.
+    """
+
+    def __init__(self, handler: Callable[[IngestJob], Awaitable[None]], workers: int = 4, maxsize: int = 1000):
+        self.handler  = handler
+        self.workers  = max(1, workers)
+        self.maxsize  = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"ingest-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Ingest queue started with {self.workers} workers")
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """Give queued jobs a chance to finish, then cancel the workers"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Ingest queue stopped with {self._queue.qsize()} jobs pending")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job: IngestJob) -> bool:
+        """Enqueue without waiting. Returns False if the queue is not running or full."""
+        if not self._queue or not self._tasks:
+            return False
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Ingest queue full — rejecting {job.url}")
+            return False
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.handler(job)
+            except Exception as e:
+                logger.error(f"Ingest worker {index} failed on {job.url}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
@@ -4,6 +4,7 @@ from typing import Dict, Optional
 from bs4 import BeautifulSoup
 import logging
 from urllib.parse import urlparse, parse_qs
+from .url_utils import extract_instagram_shortcode
 
 logger = logging.getLogger(__name__)
 
@@ -59,18 +60,7 @@ class InstagramService:
 
     def _extract_shortcode(self, url: str) -> Optional[str]:
         """Extract shortcode from Instagram URL"""
-        patterns = [
-            r'instagram\.com/p/([^/?]+)',
-            r'instagram\.com/reel/([^/?]+)',
-            r'instagram\.com/tv/([^/?]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        return None
+        return extract_instagram_shortcode(url)
 
     def _extract_with_oembed(self, url: str) -> Optional[Dict]:
         """Try to extract using Instagram oEmbed endpoint"""
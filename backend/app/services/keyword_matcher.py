@@ -0,0 +1,105 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# The one keyword table for rule-based categorization — the union of the two
+# tables the keyword fallbacks used to keep, except that 'tutorial' is only
+# education (as SimpleAIService had it). Equal scores go to the category
+# listed first, e.g. "Art of coding" → coding.
+CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "fitness":       ['workout', 'gym', 'fitness', 'exercise', 'yoga', 'training', 'health', 'muscle', 'cardio'],
+    "coding":        ['code', 'programming', 'developer', 'software', 'tech', 'python', 'javascript', 'coding'],
+    "food":          ['food', 'recipe', 'cooking', 'restaurant', 'delicious', 'meal', 'dinner', 'lunch', 'breakfast', 'chef'],
+    "travel":        ['travel', 'trip', 'vacation', 'destination', 'hotel', 'flight', 'beach', 'mountain', 'city', 'tour'],
+    "design":        ['design', 'art', 'creative', 'architecture', 'interior', 'graphic', 'style', 'aesthetic', 'ui', 'ux'],
+    "fashion":       ['fashion', 'style', 'outfit', 'clothing', 'dress', 'shirt', 'trend', 'wear', 'ootd'],
+    "business":      ['business', 'entrepreneur', 'startup', 'marketing', 'finance', 'money', 'investment', 'invest'],
+    "education":     ['learn', 'tutorial', 'education', 'course', 'study', 'knowledge', 'skill', 'lesson'],
+    "entertainment": ['fun', 'entertainment', 'movie', 'music', 'game', 'funny', 'meme', 'video', 'comedy'],
+}
+
+
+@dataclass
+class KeywordMatch:
+    """Result of one pass over a text"""
+    scores: Dict[str, int] = field(default_factory=dict)          # category → distinct keywords hit
+    keywords: Dict[str, List[str]] = field(default_factory=dict)  # category → those keywords, in text order
+
+    @property
+    def best(self) -> str:
+        """Highest-scoring category ('other' when nothing matched)"""
+        best, best_score = "other", 0
+        for category, score in self.scores.items():
+            if score > best_score:
+                best, best_score = category, score
+        return best
+
+    def tags(self, category: Optional[str] = None, limit: int = 5) -> List[str]:
+        """The category followed by the keywords that matched for it"""
+        category = category or self.best
+        tags = [category]
+        for keyword in self.keywords.get(category, []):
+            if keyword not in tags:
+                tags.append(keyword)
+        return tags[:limit]
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex alternation shaped as a prefix trie ("cod(?:e|ing)|..."), so the
+    engine tries each character once per position instead of every keyword.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Whole-word keyword matcher compiled once into a single regex, so a text
+    is scanned once for every category ("art" no longer matches "start").
+    A keyword also matches its plural (-s / -es); '_' counts as a separator.
+    """
+
+    def __init__(self, table: Dict[str, List[str]]):
+        self.table = table
+        self._categories: Dict[str, List[str]] = {}
+        for category, keywords in table.items():
+            for keyword in keywords:
+                self._categories.setdefault(keyword.lower(), []).append(category)
+
+        self._pattern = re.compile(rf"(?<![^\W_])({_trie_pattern(self._categories)})(?:e?s)?(?![^\W_])")
+
+    def match(self, text: str) -> KeywordMatch:
+        result = KeywordMatch(scores={category: 0 for category in self.table})
+        seen = set()
+        for keyword in self._pattern.findall((text or "").lower()):
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            for category in self._categories[keyword]:
+                result.scores[category] += 1
+                result.keywords.setdefault(category, []).append(keyword)
+        return result
+
+    def match_many(self, texts: Iterable[str]) -> List[KeywordMatch]:
+        """Batch API: one KeywordMatch per text, in order"""
+        return [self.match(text) for text in texts]
+
+    def categorize(self, text: str) -> str:
+        return self.match(text).best
+
+
+keyword_matcher = KeywordMatcher(CATEGORY_KEYWORDS)
@@ -0,0 +1,296 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:   # the classifier is optional — callers fall back to keyword matching
+    np = None
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[^\W_]+")
+URL_NOISE = {'https', 'http', 'www', 'com', 'net', 'org', 'instagram', 'youtube', 'youtu',
+             'twitter', 'facebook', 'reel', 'reels', 'watch', 'status', 'shorts'}
+
+def features(text: str) -> List[str]:
+    """Lowercased word unigrams + bigrams"""
+    words = [w for w in TOKEN.findall((text or "").lower()) if w not in URL_NOISE]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashingVectorizer:
+    """Feature hashing into `n_features` buckets (crc32 — stable across processes)"""
+
+    def __init__(self, n_features: int = 2 ** 17):
+        self.n_features = n_features
+
+    def hashes(self, text: str) -> List[int]:
+        return [zlib.crc32(f.encode("utf-8")) % self.n_features for f in features(text)]
+
+    def transform(self, texts: Sequence[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Sparse bag-of-hashes for a batch: (indices, offsets), where document i
+        owns indices[offsets[i]:offsets[i + 1]] (CSR without the data array).
+        """
+        rows    = [self.hashes(text) for text in texts]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in rows], out=offsets[1:])
+        indices = np.fromiter((h for r in rows for h in r), dtype=np.int64, count=int(offsets[-1]))
+        return indices, offsets
+
+
+def _hash_texts(texts: Sequence[str], n_features: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """HashingVectorizer.transform in a worker process (module-level so it pickles)"""
+    return HashingVectorizer(n_features).transform(texts)
+
+
+def _softmax(scores: "np.ndarray") -> "np.ndarray":
+    shifted = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+
+class LocalClassifier:
+    """
+    Hashing vectorizer + linear model (multinomial naive Bayes or softmax
+    logistic regression), trained from saved content and run fully in NumPy.
+    """
+
+    def __init__(self, classes: Sequence[str], n_features: int = 2 ** 17, kind: str = "nb"):
+        self.classes    = list(classes)
+        self.kind       = kind
+        self.vectorizer = HashingVectorizer(n_features)
+        self.weights    = np.zeros((n_features, len(self.classes)), dtype=np.float32)
+        self.bias       = np.zeros(len(self.classes), dtype=np.float32)
+
+    # ── Training ─────────────────────────────────────────────────────────────
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], kind: str = "nb",
+              n_features: int = 2 ** 17, alpha: float = 0.1, epochs: int = 30, lr: float = 0.5,
+              l2: float = 1e-5) -> "LocalClassifier":
+        model = cls(sorted(set(labels)), n_features, kind)
+        indices, offsets = model.vectorizer.transform(texts)
+        y = np.array([model.classes.index(label) for label in labels])
+        if kind == "nb":
+            model._fit_nb(indices, offsets, y, alpha)
+        elif kind == "logreg":
+            model._fit_logreg(indices, offsets, y, epochs, lr, l2)
+        else:
+            raise ValueError(f"Unknown model kind: {kind}")
+        return model
+
+    def _fit_nb(self, indices, offsets, y, alpha: float):
+        n_classes = len(self.classes)
+        doc_ids   = np.repeat(np.arange(len(y)), np.diff(offsets))
+        counts    = np.zeros((self.vectorizer.n_features, n_classes), dtype=np.float64)
+        np.add.at(counts, (indices, y[doc_ids]), 1.0)
+
+        smoothed     = counts + alpha
+        self.weights = (np.log(smoothed) - np.log(smoothed.sum(axis=0, keepdims=True))).astype(np.float32)
+        priors       = np.bincount(y, minlength=n_classes) + 1.0
+        self.bias    = np.log(priors / priors.sum()).astype(np.float32)
+
+    def _fit_logreg(self, indices, offsets, y, epochs: int, lr: float, l2: float):
+        """Full-batch AdaGrad on the softmax cross-entropy (per-weight step sizes suit sparse hashes)"""
+        n_docs  = len(y)
+        doc_ids = np.repeat(np.arange(n_docs), np.diff(offsets))
+        scale   = self._feature_scale(offsets)[doc_ids][:, None]
+        target  = np.eye(len(self.classes), dtype=np.float32)[y]
+        w_acc   = np.full_like(self.weights, 1e-8)
+        b_acc   = np.full_like(self.bias, 1e-8)
+
+        for _ in range(epochs):
+            error = ((_softmax(self._linear_scores(indices, offsets)) - target) / n_docs).astype(np.float32)
+            grad  = np.zeros_like(self.weights)
+            np.add.at(grad, indices, error[doc_ids] * scale)
+            grad += l2 * self.weights
+            bias_grad = error.sum(axis=0)
+
+            w_acc += grad ** 2
+            b_acc += bias_grad ** 2
+            self.weights -= lr * grad / np.sqrt(w_acc)
+            self.bias    -= lr * bias_grad / np.sqrt(b_acc)
+
+    # ── Inference ────────────────────────────────────────────────────────────
+    def _feature_scale(self, offsets) -> "np.ndarray":
+        """Per-document feature value: 1 for naive Bayes counts, 1/sqrt(length) for logreg"""
+        lengths = np.maximum(np.diff(offsets), 1).astype(np.float32)
+        return 1.0 / np.sqrt(lengths) if self.kind == "logreg" else np.ones_like(lengths)
+
+    def _linear_scores(self, indices, offsets) -> "np.ndarray":
+        """(docs × classes): bias + the summed weight rows of each document's hashes"""
+        n_docs  = len(offsets) - 1
+        scores  = np.tile(self.bias, (n_docs, 1))
+        lengths = np.diff(offsets)
+        filled  = lengths > 0
+        if filled.any():
+            rows = self.weights[indices] * np.repeat(self._feature_scale(offsets), lengths)[:, None]
+            scores[filled] += np.add.reduceat(rows, offsets[:-1][filled], axis=0)
+        return scores
+
+    def _proba(self, indices, offsets) -> "np.ndarray":
+        return _softmax(self._linear_scores(indices, offsets).astype(np.float64))
+
+    def predict_proba(self, texts: Sequence[str]) -> "np.ndarray":
+        return self._proba(*self.vectorizer.transform(texts))
+
+    def predict(self, texts: Sequence[str], workers: int = 0, chunk: int = 8192) -> List[Tuple[str, float]]:
+        """
+        (category, confidence) per text. Tokenizing and hashing are pure Python
+        and hold the GIL, so batches larger than `chunk` are hashed on a process
+        pool (`workers` 0 = one per core); scoring is vectorized NumPy, one chunk at a time.
+        """
+        if not texts:
+            return []
+        workers = workers or os.cpu_count() or 1
+        if len(texts) <= chunk or workers == 1:
+            probs = self.predict_proba(texts)
+        else:
+            parts = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+            with ProcessPoolExecutor(max_workers=min(workers, len(parts))) as pool:
+                hashed = pool.map(_hash_texts, parts, repeat(self.vectorizer.n_features))
+                probs  = np.vstack([self._proba(indices, offsets) for indices, offsets in hashed])
+        best = probs.argmax(axis=1)
+        return [(self.classes[i], float(probs[n, i])) for n, i in enumerate(best)]
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        return self.predict([text])[0]
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+    def save(self, path: str):
+        np.savez_compressed(
+            path, weights=self.weights, bias=self.bias, classes=np.array(self.classes),
+            kind=np.array(self.kind), n_features=np.array(self.vectorizer.n_features),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalClassifier":
+        with np.load(path) as data:
+            model = cls([str(c) for c in data["classes"]], int(data["n_features"]), str(data["kind"]))
+            model.weights = data["weights"]
+            model.bias    = data["bias"]
+        return model
+
+
+MODEL_PATH     = os.getenv("LOCAL_CLASSIFIER_PATH", "classifier.npz")
+MIN_CONFIDENCE = float(os.getenv("LOCAL_CLASSIFIER_MIN_CONFIDENCE", "0.6"))
+
+_loaded: Optional[LocalClassifier] = None
+_loaded_mtime: Optional[float] = None
+
+def get_local_classifier() -> Optional[LocalClassifier]:
+    """The trained model at LOCAL_CLASSIFIER_PATH (reloaded when the file changes), or None"""
+    global _loaded, _loaded_mtime
+    if np is None or not os.path.exists(MODEL_PATH):
+        return None
+    mtime = os.path.getmtime(MODEL_PATH)
+    if mtime != _loaded_mtime:
+        try:
+            _loaded = LocalClassifier.load(MODEL_PATH)
+            logger.info(f"Loaded local classifier ({_loaded.kind}, {len(_loaded.classes)} classes)")
+        except Exception as e:
+            logger.error(f"Could not load local classifier from {MODEL_PATH}: {e}")
+            _loaded = None
+        _loaded_mtime = mtime
+    return _loaded
+
+def training_text(title: Optional[str], description: Optional[str], url: Optional[str] = None) -> str:
+    return " ".join(part for part in (title, description, url) if part)
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+# Labels worth learning from: Gemini's and the user's own #category. Keyword and
+# local-model labels would teach the model its own (and the matcher's) mistakes,
+# and "other" is what Gemini answers when it cannot tell.
+TRUSTED_SOURCES = ("gemini", "hashtag")
+
+def _load_dataset(min_per_class: int) -> Tuple[List[str], List[str]]:
+    from ..models.database import SessionLocal
+    from ..models.content import Content
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Content.title, Content.description, Content.url, Content.category)\
+            .filter(Content.category_source.in_(TRUSTED_SOURCES), Content.category != "other")\
+            .execution_options(yield_per=1000)
+        texts, labels = [], []
+        for title, description, url, category in rows:
+            texts.append(training_text(title, description, url))
+            labels.append(getattr(category, "value", category))
+    finally:
+        db.close()
+
+    counts = {label: labels.count(label) for label in set(labels)}
+    keep   = [i for i, label in enumerate(labels) if counts[label] >= min_per_class]
+    return [texts[i] for i in keep], [labels[i] for i in keep]
+
+def _evaluate(name: str, predict, texts: List[str], labels: List[str]):
+    started = time.perf_counter()
+    predicted = predict(texts)
+    elapsed = time.perf_counter() - started
+    correct = sum(p == label for p, label in zip(predicted, labels))
+    print(f"{name:<16} accuracy {correct / len(labels):6.1%}   "
+          f"{elapsed / len(labels) * 1e6:8.1f} µs/item   ({len(labels)} items)")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    python -m app.services.local_classifier train    [--model nb|logreg] [--out PATH]
+    python -m app.services.local_classifier evaluate [--model nb|logreg] [--holdout 0.2]
+
+    Both use only Gemini / #hashtag-labelled saves (TRUSTED_SOURCES); evaluate
+    scores on a held-out part of them that the model never trained on.
+    """
+    parser = argparse.ArgumentParser(description="Train / evaluate the local category classifier")
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--model", choices=["nb", "logreg"], default="nb")
+    parser.add_argument("--out", default=MODEL_PATH)
+    parser.add_argument("--features", type=int, default=2 ** 17)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--min-per-class", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("numpy is not installed")
+        return 1
+
+    texts, labels = _load_dataset(args.min_per_class)
+    if len(set(labels)) < 2:
+        print(f"Not enough Gemini / #hashtag-labelled rows ({len(labels)}) to train")
+        return 1
+
+    if args.command == "train":
+        started = time.perf_counter()
+        model = LocalClassifier.train(texts, labels, kind=args.model, n_features=args.features)
+        model.save(args.out)
+        print(f"Trained {args.model} on {len(texts)} rows, {len(model.classes)} classes "
+              f"in {time.perf_counter() - started:.1f}s → {args.out}")
+        return 0
+
+    from .keyword_matcher import keyword_matcher
+
+    # Held out from the trusted rows, so both models are scored against Gemini / #hashtag labels
+    order = list(range(len(texts)))
+    random.Random(42).shuffle(order)
+    cut   = int(len(order) * (1 - args.holdout))
+    train, test = order[:cut], order[cut:]
+    model = LocalClassifier.train([texts[i] for i in train], [labels[i] for i in train],
+                                  kind=args.model, n_features=args.features)
+    test_texts, test_labels = [texts[i] for i in test], [labels[i] for i in test]
+
+    _evaluate(f"local ({args.model})", lambda batch: [c for c, _ in model.predict(batch)], test_texts, test_labels)
+    _evaluate("local (1 by 1)", lambda batch: [model.classify(t)[0] for t in batch], test_texts, test_labels)
+    _evaluate("keyword matcher", lambda batch: [keyword_matcher.categorize(t) for t in batch], test_texts, test_labels)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds — from a cache hit (5 ms) to a slow scrape or Gemini call (60 s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# A collector returns (name, help, labels, value) samples, read only when /metrics is scraped
+Sample    = Tuple[str, str, Dict[str, str], float]
+Collector = Callable[[], Iterable[Sample]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """A metric family: one child per label-value combination, created on first use"""
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name       = name
+        self.help       = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._child())
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def _pairs(self, values: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        return list(zip(self.labelnames, values))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(self._pairs(values), child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _render_child(self, pairs, child):
+        return [f"{self.name}{_labels(pairs)} {_number(child.value)}"]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum    = 0.0
+        self._lock  = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _render_child(self, pairs, child):
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(pairs)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(pairs)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Process-wide metrics in the Prometheus text exposition format. Hot paths
+    only touch in-memory counters; collectors (values other services already
+    keep, e.g. the /status counters) are read when /metrics is scraped.
+    """
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        metric.name = f"{self.namespace}_{metric.name}" if self.namespace else metric.name
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def collector(self, collect: Collector) -> Collector:
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        families: Dict[str, Tuple[str, List[str]]] = {}
+        for collect in self._collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:   # one broken collector must not take /metrics down
+                logger.error(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+                continue
+            for name, help, labels, value in samples:
+                name = f"{self.namespace}_{name}" if self.namespace else name
+                family = families.setdefault(name, (help, []))
+                family[1].append(f"{name}{_labels(sorted(labels.items()))} {_number(value)}")
+        for name, (help, samples) in families.items():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} untyped", *samples]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(namespace="social_saver")
+
+# ── Link pipeline (webhook → scrape → enrich → save) ─────────────────────────
+scrape_provider_seconds = registry.histogram(
+    "scrape_provider_seconds", "Scrape provider call latency by outcome (success, empty, error, url_error, timeout)",
+    ["provider", "outcome"])
+scrape_skipped = registry.counter(
+    "scrape_provider_skipped_total", "Provider calls skipped by an open circuit or the negative cache",
+    ["provider", "reason"])
+scrape_winner = registry.counter(
+    "scrape_winner_total", "Which tier of a fallback chain produced the scrape (tier=none: every tier failed)",
+    ["provider", "tier"])
+enrichment_seconds = registry.histogram(
+    "enrichment_seconds", "Enrichment latency, Gemini versus keyword matching", ["method"])
+category_overrides = registry.counter(
+    "category_overrides_total", "#category overrides sent with a link (new save, existing save, or not a category)",
+    ["kind"])
+db_insert_seconds = registry.histogram(
+    "db_insert_seconds", "Time a new save waits for the write queue to commit it")
+db_flush_seconds = registry.histogram(
+    "db_flush_seconds", "Write queue batch commit latency")
+link_seconds = registry.histogram(
+    "link_seconds", "Whole link pipeline (lookup, scrape, enrich, save) by result", ["result"])
+webhook_seconds = registry.histogram(
+    "webhook_seconds", "WhatsApp webhook request time, end to end", ["mode"])
+
+# ── API ──────────────────────────────────────────────────────────────────────
+http_request_seconds = registry.histogram(
+    "http_request_seconds", "API latency by route template, method and status", ["method", "route", "status"])
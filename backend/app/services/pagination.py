@@ -0,0 +1,22 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not produced by encode_cursor"""
+
+
+def encode_cursor(created_at: datetime, content_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) sort order"""
+    raw = json.dumps([created_at.isoformat(), content_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises InvalidCursor on anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, content_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(content_id)
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {token}") from e
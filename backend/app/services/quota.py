@@ -0,0 +1,204 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+import logging
+
+from ..models.database import SessionLocal
+from ..models.usage import ProviderUsage
+
+logger = logging.getLogger(__name__)
+
+class QuotaExceeded(Exception):
+    """No token became available before the caller's deadline, or the monthly budget is spent"""
+
+
+class TokenBucket:
+    """
+    Classic token bucket with reservations: a caller books the next free token
+    (the balance may go negative), then sleeps until it is due — outside any
+    lock, so waiters are served FIFO and none overshoots its own deadline.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate     = rate_per_sec
+        self.capacity = max(1, burst)
+        self.tokens   = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens   = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > timeout:
+            return False
+        self.tokens -= 1
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.tokens += 1   # hand the reservation back
+                raise
+        return True
+
+
+class QuotaManager:
+    """
+    Central quota accounting for paid / rate-limited providers:
+      - token bucket per provider (rate per minute + burst)
+      - monthly budget, persisted in the provider_usage table and read back
+        off the event loop (preload() at startup, refresh() on month rollover)
+      - should_downgrade() once `downgrade_at` of the budget is used,
+        so callers can switch to a cheaper path before hitting the wall
+    """
+
+    def __init__(self, session_factory=SessionLocal, downgrade_at: float = 0.9):
+        self.session_factory = session_factory
+        self.downgrade_at    = downgrade_at
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._budgets: Dict[str, int] = {}
+        self._used: Dict[str, int] = {}
+        self._periods: Dict[str, str] = {}
+        self._loading = asyncio.Lock()
+
+    def configure(self, provider: str, rate_per_min: float, burst: int, monthly_budget: int = 0):
+        """monthly_budget 0 = unlimited; rate_per_min 0 = no rate limit"""
+        self._buckets[provider] = TokenBucket(rate_per_min / 60.0, burst)
+        self._budgets[provider] = monthly_budget
+
+    @staticmethod
+    def _period() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m")
+
+    def used(self, provider: str) -> int:
+        """This month's usage from memory — never touches the DB (0 until refresh() has loaded it)"""
+        if self._periods.get(provider) != self._period():
+            return 0
+        return self._used[provider]
+
+    async def refresh(self, provider: str):
+        """Load this month's counter from the DB, in a worker thread, if it isn't loaded yet"""
+        period = self._period()
+        if self._periods.get(provider) == period:
+            return
+        async with self._loading:
+            if self._periods.get(provider) != period:
+                self._used[provider]    = await asyncio.to_thread(self._load, provider, period)
+                self._periods[provider] = period
+
+    async def preload(self):
+        """Load every configured provider's counter (called once at startup)"""
+        for provider in self._buckets:
+            await self.refresh(provider)
+
+    def remaining(self, provider: str) -> Optional[int]:
+        budget = self._budgets.get(provider, 0)
+        if not budget:
+            return None
+        return max(0, budget - self.used(provider))
+
+    def should_downgrade(self, provider: str) -> bool:
+        budget = self._budgets.get(provider, 0)
+        return bool(budget) and self.used(provider) >= budget * self.downgrade_at
+
+    async def acquire(self, provider: str, timeout: float = 5.0) -> bool:
+        """Wait (up to `timeout` seconds) for a token; False if none came or the budget is spent"""
+        await self.refresh(provider)
+        remaining = self.remaining(provider)
+        if remaining is not None and remaining <= 0:
+            return False
+        bucket = self._buckets.get(provider)
+        return await bucket.acquire(timeout) if bucket else True
+
+    async def record(self, provider: str, units: int = 1):
+        """Count billable usage (in memory immediately, in the DB off the event loop)"""
+        await self.refresh(provider)
+        self._used[provider] += units
+        await asyncio.to_thread(self._persist, provider, self._periods[provider], units)
+
+    def _load(self, provider: str, period: str) -> int:
+        db = self.session_factory()
+        try:
+            row = db.get(ProviderUsage, (provider, period))
+            return row.used if row else 0
+        except Exception as e:
+            logger.warning(f"Could not load {provider} usage: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def _persist(self, provider: str, period: str, units: int):
+        db = self.session_factory()
+        try:
+            updated = db.query(ProviderUsage)\
+                .filter(ProviderUsage.provider == provider, ProviderUsage.period == period)\
+                .update({ProviderUsage.used: ProviderUsage.used + units}, synchronize_session=False)
+            if not updated:
+                db.add(ProviderUsage(provider=provider, period=period, used=units))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Could not persist {provider} usage: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def snapshot(self) -> dict:
+        snapshot = {}
+        for provider, bucket in self._buckets.items():
+            bucket._refill()
+            snapshot[provider] = {
+                "period":         self._period(),
+                "used":           self.used(provider),
+                "monthly_budget": self._budgets.get(provider) or None,
+                "remaining":      self.remaining(provider),
+                "downgraded":     self.should_downgrade(provider),
+                "tokens":         round(bucket.tokens, 2),
+            }
+        return snapshot
+
+
+quota_manager = QuotaManager(downgrade_at=float(os.getenv("QUOTA_DOWNGRADE_AT", "0.9")))
+# Apify free plan: ~2,000 results/month
+quota_manager.configure(
+    "apify",
+    rate_per_min=float(os.getenv("APIFY_RATE_PER_MIN", "10")),
+    burst=int(os.getenv("APIFY_BURST", "3")),
+    monthly_budget=int(os.getenv("APIFY_MONTHLY_BUDGET", "2000")),
+)
+quota_manager.configure(
+    "gemini",
+    rate_per_min=float(os.getenv("GEMINI_RATE_PER_MIN", "15")),
+    burst=int(os.getenv("GEMINI_BURST", "5")),
+    monthly_budget=int(os.getenv("GEMINI_MONTHLY_BUDGET", "0")),
+)
+
+
+def metered(
+    provider: str,
+    fetch: Callable[[str], Awaitable[Optional[dict]]],
+    wait: float = 5.0,
+) -> Callable[[str], Awaitable[Optional[dict]]]:
+    """
+    Gate a scrape fetcher on its provider's quota: skip it once the monthly
+    budget is nearly spent (the chain falls through to cheaper tiers) and
+    queue for a rate-limit token for at most `wait` seconds.
+    """
+    async def call(url: str) -> Optional[dict]:
+        await quota_manager.refresh(provider)
+        if quota_manager.should_downgrade(provider):
+            logger.info(f"{provider} budget nearly spent — downgrading")
+            return None
+        if not await quota_manager.acquire(provider, timeout=wait):
+            logger.info(f"{provider} rate limit — no token within {wait:.0f}s, skipping")
+            return None
+        return await fetch(url)
+
+    call.__name__ = f"metered_{provider}"
+    return call
@@ -0,0 +1,79 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Optional
+import logging
+
+from .cache import build_cache
+from .url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+class ScrapeCache:
+    """
+    Scrape results keyed by canonical URL, with single-flight coalescing:
+    concurrent requests for the same link share one in-flight fetch.
+    Only successful scrapes are cached.
+    """
+
+    def __init__(self, backend):
+        self.backend   = backend
+        self.hits      = 0
+        self.misses    = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_fetch(self, url: str, fetch: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        key = canonicalize_url(url)
+
+        cached = self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return dict(cached)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            inflight = asyncio.ensure_future(fetch())
+            self._inflight[key] = inflight
+            # Store/forget from the task itself, so a cancelled caller can't leave it behind
+            inflight.add_done_callback(lambda task: self._on_done(key, task))
+
+        result = await asyncio.shield(inflight)
+        return dict(result) if result else result
+
+    def _on_done(self, key: str, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result:
+            try:
+                self.backend.set(key, result)
+            except Exception as e:
+                logger.warning(f"Scrape cache write failed for {key}: {e}")
+
+    def invalidate(self, url: str) -> bool:
+        return self.backend.delete(canonicalize_url(url))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend":   self.backend.backend,
+            "entries":   len(self.backend),
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+scrape_cache = ScrapeCache(build_cache(
+    backend=os.getenv("SCRAPE_CACHE_BACKEND", "memory").lower(),
+    namespace="scrape",
+    max_entries=int(os.getenv("SCRAPE_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("SCRAPE_CACHE_TTL", "86400")),
+    path=os.getenv("CACHE_DB_PATH", "./cache.db"),
+))
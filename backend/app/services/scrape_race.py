@@ -0,0 +1,158 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+import logging
+
+from .metrics import scrape_winner
+
+logger = logging.getLogger(__name__)
+
+Fetcher = Callable[[str], Awaitable[Optional[dict]]]
+
+MODES = ("sequential", "hedged", "parallel")
+
+def has_title(result: Optional[dict]) -> bool:
+    """Default quality check — a scrape only counts if it produced a title"""
+    return bool(result and result.get('title'))
+
+def has_description(result: Optional[dict]) -> bool:
+    return bool(result and result.get('description'))
+
+
+@dataclass
+class Tier:
+    """
+    One provider in a fallback chain. `accept` decides whether a result counts
+    at all; `preempt` (if set) is the stricter bar it must pass to win while a
+    higher-priority tier is still running — otherwise it is held as the fallback.
+    """
+    name: str
+    fetch: Fetcher
+    accept: Callable[[Optional[dict]], bool] = has_title
+    preempt: Optional[Callable[[Optional[dict]], bool]] = None
+
+
+@dataclass
+class RacePolicy:
+    """
+    How a platform's fallback chain is executed:
+      sequential → try each tier only after the previous one failed
+      hedged     → start the next tier after `hedge_delay` seconds (or as soon as one fails)
+      parallel   → start every tier at once (for cheap providers)
+    The first result that passes its tier's quality check wins (unless its tier's
+    `preempt` check holds it back for a better tier still running); the rest are cancelled.
+    """
+    tiers: List[Tier]
+    mode: str = "hedged"
+    hedge_delay: float = 2.0
+
+    @classmethod
+    def from_env(cls, key: str, tiers: List[Tier], mode: str = "hedged", hedge_delay: float = 2.0) -> "RacePolicy":
+        """
+        Build a policy whose defaults can be tuned per platform:
+        SCRAPE_MODE (global), SCRAPE_<KEY>_MODE and SCRAPE_<KEY>_HEDGE_DELAY.
+        """
+        key  = key.upper()
+        mode = os.getenv(f"SCRAPE_{key}_MODE") or os.getenv("SCRAPE_MODE") or mode
+        if mode not in MODES:
+            logger.warning(f"Unknown scrape mode '{mode}' for {key} — using sequential")
+            mode = "sequential"
+        hedge_delay = float(os.getenv(f"SCRAPE_{key}_HEDGE_DELAY", hedge_delay))
+        return cls(tiers=tiers, mode=mode, hedge_delay=hedge_delay)
+
+
+async def _run_tier(tier: Tier, url: str) -> Optional[dict]:
+    try:
+        return await tier.fetch(url)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Scrape tier '{tier.name}' failed: {e}")
+        return None
+
+
+def _won(tiers: List[Tier], index: Optional[int]):
+    """Count which tier produced the scrape — anything past tier 1 is a fallback hit"""
+    if index is None:
+        scrape_winner.labels("none", "none").inc()
+    else:
+        scrape_winner.labels(tiers[index].name, str(index + 1)).inc()
+
+
+async def run_chain(url: str, policy: RacePolicy) -> Optional[dict]:
+    """Execute a fallback chain under its race policy, returns the winning result or None"""
+    tiers = policy.tiers
+    if not tiers:
+        return None
+
+    if policy.mode == "sequential":
+        for index, tier in enumerate(tiers):
+            result = await _run_tier(tier, url)
+            if tier.accept(result):
+                _won(tiers, index)
+                return result
+        _won(tiers, None)
+        return None
+
+    delay = 0.0 if policy.mode == "parallel" else max(0.0, policy.hedge_delay)
+    pending: Dict[asyncio.Task, int] = {}
+    next_index = 0
+
+    def launch():
+        nonlocal next_index
+        task = asyncio.create_task(_run_tier(tiers[next_index], url))
+        pending[task] = next_index
+        next_index += 1
+
+    held: Optional[tuple] = None   # (index, result) kept back by its tier's preempt check
+
+    def win(index: int, result: dict) -> dict:
+        logger.info(f"Scrape won by '{tiers[index].name}' (tier {index + 1}/{len(tiers)})")
+        _won(tiers, index)
+        return result
+
+    launch()
+    try:
+        while pending:
+            if held is None and next_index < len(tiers) and delay == 0:
+                launch()
+                continue
+
+            timeout = delay if held is None and next_index < len(tiers) else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Hedge delay elapsed with no answer — bring in the next tier
+                launch()
+                continue
+
+            # Prefer the higher-priority tier when several finish together
+            for task in sorted(done, key=pending.get):
+                index  = pending.pop(task)
+                result = task.result()
+                if not tiers[index].accept(result):
+                    continue
+                preempt = tiers[index].preempt
+                if preempt is not None and not preempt(result) and any(i < index for i in pending.values()):
+                    if held is None or index < held[0]:
+                        held = (index, result)
+                    continue
+                return win(index, result)
+
+            if held is not None and not any(i < held[0] for i in pending.values()):
+                # Every better tier has failed — the held result stands
+                return win(*held)
+
+            # A tier came back empty — don't wait out the hedge delay
+            if held is None and next_index < len(tiers):
+                launch()
+        if held is not None:
+            return win(*held)
+        _won(tiers, None)
+        return None
+    finally:
+        # Cancel the losers and let them unwind (breaker slots, connections)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
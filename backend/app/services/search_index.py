@@ -0,0 +1,154 @@
+import re
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Column weights: title, description, ai_summary, category
+SQLITE_BM25_WEIGHTS = (10.0, 2.0, 4.0, 1.0)
+SNIPPET_OPEN, SNIPPET_CLOSE = "<mark>", "</mark>"
+
+SQLITE_SCHEMA = [
+    # External-content table: the index stores only tokens, rows live in `contents`
+    """CREATE VIRTUAL TABLE IF NOT EXISTS contents_fts USING fts5(
+        title, description, ai_summary, category,
+        content='contents', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS contents_fts_ai AFTER INSERT ON contents BEGIN
+        INSERT INTO contents_fts(rowid, title, description, ai_summary, category)
+        VALUES (new.id, new.title, new.description, new.ai_summary, new.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contents_fts_ad AFTER DELETE ON contents BEGIN
+        INSERT INTO contents_fts(contents_fts, rowid, title, description, ai_summary, category)
+        VALUES ('delete', old.id, old.title, old.description, old.ai_summary, old.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contents_fts_au AFTER UPDATE OF title, description, ai_summary, category ON contents BEGIN
+        INSERT INTO contents_fts(contents_fts, rowid, title, description, ai_summary, category)
+        VALUES ('delete', old.id, old.title, old.description, old.ai_summary, old.category);
+        INSERT INTO contents_fts(rowid, title, description, ai_summary, category)
+        VALUES (new.id, new.title, new.description, new.ai_summary, new.category);
+    END""",
+]
+
+POSTGRES_SCHEMA = [
+    """ALTER TABLE contents ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(ai_summary, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'C') ||
+            setweight(to_tsvector('simple', coalesce(category, '')), 'D')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_contents_search_vector ON contents USING GIN (search_vector)",
+]
+
+# engine URL → "fts5" | "tsvector" | None
+_backends: Dict[str, Optional[str]] = {}
+
+def ensure_search_index(engine: Engine) -> Optional[str]:
+    """Create the full-text index (idempotent) and backfill it on first creation"""
+    dialect = engine.dialect.name
+    backend = None
+    try:
+        with engine.begin() as conn:
+            if dialect == "sqlite":
+                existed = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contents_fts'"
+                )).first() is not None
+                for statement in SQLITE_SCHEMA:
+                    conn.execute(text(statement))
+                if not existed:
+                    conn.execute(text("INSERT INTO contents_fts(contents_fts) VALUES ('rebuild')"))
+                    logger.info("Built contents_fts index")
+                backend = "fts5"
+            elif dialect == "postgresql":
+                for statement in POSTGRES_SCHEMA:
+                    conn.execute(text(statement))
+                backend = "tsvector"
+    except Exception as e:
+        logger.error(f"Full-text index unavailable ({e}) — search falls back to ILIKE")
+        backend = None
+
+    _backends[str(engine.url)] = backend
+    return backend
+
+def search_backend(db: Session) -> Optional[str]:
+    """Which full-text backend the session's database has (detected once per engine)"""
+    bind = db.get_bind()
+    key  = str(bind.url)
+    if key not in _backends:
+        if bind.dialect.name == "sqlite":
+            exists = db.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contents_fts'"
+            )).first() is not None
+            _backends[key] = "fts5" if exists else None
+        elif bind.dialect.name == "postgresql":
+            exists = db.execute(text(
+                "SELECT 1 FROM information_schema.columns"
+                " WHERE table_name = 'contents' AND column_name = 'search_vector'"
+            )).first() is not None
+            _backends[key] = "tsvector" if exists else None
+        else:
+            _backends[key] = None
+    return _backends[key]
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r'\w+', query.lower())[:16]
+
+def search_ids(db: Session, user_phone: str, query: str, skip: int = 0, limit: int = 50) -> Optional[List[Tuple[int, float, str]]]:
+    """
+    Ranked full-text search over a user's saves; every term is a prefix match.
+    Returns [(content_id, rank, highlighted snippet)] best-first, or None when
+    no full-text backend is available (caller falls back to ILIKE).
+    """
+    backend = search_backend(db)
+    terms   = _terms(query)
+    if backend is None or not terms:
+        return None
+
+    if backend == "fts5":
+        match = " ".join(f'"{t}"*' for t in terms)
+        rows = db.execute(text(
+            f"SELECT c.id, bm25(contents_fts, {', '.join(map(str, SQLITE_BM25_WEIGHTS))}) AS rank,"
+            f" snippet(contents_fts, -1, :open, :close, '…', 12) AS snippet"
+            " FROM contents_fts JOIN contents c ON c.id = contents_fts.rowid"
+            " WHERE contents_fts MATCH :match AND c.user_phone = :phone"
+            " ORDER BY rank LIMIT :limit OFFSET :skip"
+        ), {"match": match, "phone": user_phone, "limit": limit, "skip": skip,
+            "open": SNIPPET_OPEN, "close": SNIPPET_CLOSE}).all()
+        # bm25() is lower-is-better; flip it so callers always see higher = better
+        return [(row.id, -row.rank, row.snippet) for row in rows]
+
+    tsquery = " & ".join(f"{t}:*" for t in terms)
+    rows = db.execute(text(
+        "SELECT c.id, ts_rank_cd(c.search_vector, q) AS rank,"
+        " ts_headline('simple', concat_ws(' ', c.title, c.ai_summary, c.description), q,"
+        "   'StartSel=' || :open || ', StopSel=' || :close || ', MaxWords=24, MinWords=8') AS snippet"
+        " FROM contents c, to_tsquery('simple', :tsquery) q"
+        " WHERE c.user_phone = :phone AND c.search_vector @@ q"
+        " ORDER BY rank DESC LIMIT :limit OFFSET :skip"
+    ), {"tsquery": tsquery, "phone": user_phone, "limit": limit, "skip": skip,
+        "open": SNIPPET_OPEN, "close": SNIPPET_CLOSE}).all()
+    return [(row.id, row.rank, row.snippet) for row in rows]
+
+def count_matches(db: Session, user_phone: str, query: str) -> Optional[int]:
+    """Number of full-text matches for the user, or None without a full-text backend"""
+    backend = search_backend(db)
+    terms   = _terms(query)
+    if backend is None or not terms:
+        return None
+
+    if backend == "fts5":
+        return db.execute(text(
+            "SELECT count(*) FROM contents_fts JOIN contents c ON c.id = contents_fts.rowid"
+            " WHERE contents_fts MATCH :match AND c.user_phone = :phone"
+        ), {"match": " ".join(f'"{t}"*' for t in terms), "phone": user_phone}).scalar()
+
+    return db.execute(text(
+        "SELECT count(*) FROM contents c"
+        " WHERE c.user_phone = :phone AND c.search_vector @@ to_tsquery('simple', :tsquery)"
+    ), {"tsquery": " & ".join(f"{t}:*" for t in terms), "phone": user_phone}).scalar()
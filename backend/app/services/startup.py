@@ -0,0 +1,139 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+import logging
+
+# Stdlib only — this module is imported first, before anything it measures
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """
+    Module-level singleton built on first use instead of at import time.
+    Attribute access is forwarded, so `service = Lazy(Service)` is a
+    drop-in for `service = Service()`; `get()` builds it explicitly (warm-up).
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory  = factory
+        self._instance: Optional[T] = None
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        if self._instance is None:
+            self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
+
+class _TimedImports:
+    """
+    Meta-path hook timing each module's execution: cumulative (with the
+    imports it triggered) and self time. Only loaders owned by one module
+    (source / extension files) are timed; built-ins and frozen are skipped.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, Tuple[float, float]] = {}   # module → (cumulative, self)
+        self._stack: List[float] = []
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in list(sys.meta_path):
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            # Per-module loader instances only: class loaders and finder-as-loader are shared
+            if loader is not None and loader is not finder and not isinstance(loader, type) \
+                    and hasattr(loader, "exec_module"):
+                loader.exec_module = self._timed(fullname, loader.exec_module)
+            return spec
+        return None
+
+    def _timed(self, name: str, exec_module):
+        def exec_and_time(module):
+            started = time.perf_counter()
+            self._stack.append(0.0)
+            try:
+                exec_module(module)
+            finally:
+                elapsed  = time.perf_counter() - started
+                children = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.timings[name] = (elapsed, elapsed - children)
+        return exec_and_time
+
+
+class StartupReport:
+    """Where cold start goes: per-phase wall time and an import breakdown per package / module"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+        self._imports: Optional[_TimedImports] = None
+        self._imports_started = 0.0
+
+    def start_import_timing(self):
+        self._imports = _TimedImports()
+        self._imports_started = time.perf_counter()
+        sys.meta_path.insert(0, self._imports)
+
+    def stop_import_timing(self):
+        if self._imports in sys.meta_path:
+            sys.meta_path.remove(self._imports)
+            self.phases["imports"] = time.perf_counter() - self._imports_started
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def ready(self):
+        self.ready_after = time.perf_counter() - self.started
+        logger.info(self.summary())
+
+    def packages(self, top: int = 10) -> List[Tuple[str, float]]:
+        """Self time of every imported module, summed per top-level package"""
+        totals: Dict[str, float] = {}
+        for name, (_, own) in (self._imports.timings.items() if self._imports else ()):
+            root = name.split(".")[0] if not name.startswith("app.") else ".".join(name.split(".")[:3])
+            totals[root] = totals.get(root, 0.0) + own
+        return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+    def slowest(self, top: int = 10) -> List[Tuple[str, float]]:
+        """Modules with the largest cumulative import time (first import only)"""
+        timings = self._imports.timings if self._imports else {}
+        return sorted(((name, total) for name, (total, _) in timings.items()), key=lambda item: -item[1])[:top]
+
+    def snapshot(self) -> dict:
+        ms = lambda seconds: round(seconds * 1000, 1)
+        return {
+            "ready_ms":    ms(self.ready_after) if self.ready_after is not None else None,
+            "phases_ms":   {name: ms(seconds) for name, seconds in self.phases.items()},
+            "packages_ms": {name: ms(seconds) for name, seconds in self.packages()},
+            "slowest_ms":  {name: ms(seconds) for name, seconds in self.slowest()},
+        }
+
+    def summary(self) -> str:
+        phases   = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items())
+        packages = ", ".join(f"{name} {seconds * 1000:.0f}" for name, seconds in self.packages(5))
+        return f"Ready in {self.ready_after * 1000:.0f} ms ({phases}); imports by package (ms): {packages}"
+
+
+startup_report = StartupReport()
@@ -0,0 +1,279 @@
+import argparse
+import sys
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..models.content import Content
+from ..models.stats import UserStats, UserDailyStats
+
+logger = logging.getLogger(__name__)
+
+def _key(value) -> str:
+    """Enum or plain string → the string stored in the rollup"""
+    return getattr(value, "value", value) or "other"
+
+def _day(value: Optional[datetime]) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).date()
+    return datetime.now(timezone.utc).date()
+
+
+class StatsRollup:
+    """
+    Incrementally maintained per-user stats. The record_* methods run inside
+    the caller's transaction (ContentService commits), so rollups and rows
+    always change together. A user with no rollup row yet is rebuilt from
+    `contents` on first touch.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ── Incremental updates ──────────────────────────────────────────────────
+    def record_created(self, *contents: Content):
+        self._apply(contents, +1)
+
+    def record_deleted(self, *contents: Content):
+        self._apply(contents, -1)
+
+    def record_updated(self, content: Content, old_category):
+        stats = self._locked_row(content.user_phone)
+        if stats is None:
+            return
+        self._bump_version(stats)
+        old, new = _key(old_category), _key(content.category)
+        if old == new:
+            return
+        counts = dict(stats.category_counts or {})
+        counts[old] = counts.get(old, 0) - 1
+        counts[new] = counts.get(new, 0) + 1
+        stats.category_counts = {k: v for k, v in counts.items() if v > 0}
+        day = _day(content.created_at)
+        self._bump_daily(content.user_phone, day, old, -1)
+        self._bump_daily(content.user_phone, day, new, +1)
+
+    def _apply(self, contents, delta: int):
+        by_user: Dict[str, List[Content]] = {}
+        for content in contents:
+            by_user.setdefault(content.user_phone, []).append(content)
+
+        for user_phone, items in by_user.items():
+            stats = self._locked_row(user_phone)
+            if stats is None:
+                continue
+            categories = Counter(stats.category_counts or {})
+            platforms  = Counter(stats.platform_counts or {})
+            daily      = Counter()
+            for content in items:
+                category = _key(content.category)
+                categories[category] += delta
+                platforms[_key(content.platform)] += delta
+                daily[(_day(content.created_at), category)] += delta
+
+            self._bump_version(stats)
+            stats.total_contents  = max(0, (stats.total_contents or 0) + delta * len(items))
+            stats.category_counts = {k: v for k, v in categories.items() if v > 0}
+            stats.platform_counts = {k: v for k, v in platforms.items() if v > 0}
+            for (day, category), change in daily.items():
+                self._bump_daily(user_phone, day, category, change)
+
+    def _locked_row(self, user_phone: str) -> Optional[UserStats]:
+        """
+        The user's rollup row, locked for update. If it does not exist yet the
+        user is rebuilt from `contents` (including the pending change) and None
+        is returned — there is nothing left to apply.
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            # FOR UPDATE is a no-op on SQLite: take the database write lock with a
+            # no-op write first, so concurrent writers cannot interleave here
+            self.db.execute(
+                update(UserStats).where(UserStats.user_phone == user_phone).values(version=UserStats.version)
+            )
+        stats = self.db.query(UserStats)\
+            .filter(UserStats.user_phone == user_phone)\
+            .with_for_update()\
+            .first()
+        if stats is None:
+            self.db.flush()
+            self.rebuild_user(user_phone)
+        return stats
+
+    @staticmethod
+    def _bump_version(stats: UserStats):
+        stats.version = (stats.version or 0) + 1
+
+    def _bump_daily(self, user_phone: str, day: date, category: str, delta: int):
+        updated = self.db.query(UserDailyStats)\
+            .filter(
+                UserDailyStats.user_phone == user_phone,
+                UserDailyStats.day == day,
+                UserDailyStats.category == category
+            )\
+            .update({UserDailyStats.count: UserDailyStats.count + delta}, synchronize_session=False)
+        if not updated and delta > 0:
+            self.db.add(UserDailyStats(user_phone=user_phone, day=day, category=category, count=delta))
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+    def version(self, user_phone: str) -> Optional[tuple]:
+        """(version, total, updated_at) of the user's rollup — changes with every write; None before the first rollup"""
+        row = self.db.query(UserStats.version, UserStats.total_contents, UserStats.updated_at)\
+            .filter(UserStats.user_phone == user_phone)\
+            .first()
+        return tuple(row) if row else None
+
+    def get(self, user_phone: str) -> dict:
+        """Stats for one user — a single primary-key lookup"""
+        stats = self.db.get(UserStats, user_phone)
+        if stats is None:
+            stats = self.rebuild_user(user_phone)
+            if stats is not None:
+                self.db.commit()
+        if stats is None:
+            return {"total_contents": 0, "category_counts": {}, "platform_counts": {}}
+        return {
+            "total_contents":  stats.total_contents,
+            "category_counts": dict(stats.category_counts or {}),
+            "platform_counts": dict(stats.platform_counts or {}),
+        }
+
+    def timeseries(self, user_phone: str, days: int = 30, category: Optional[str] = None) -> dict:
+        """Saves per day per category over the last `days` days (UTC), zero-filled"""
+        end   = datetime.now(timezone.utc).date()
+        start = end - timedelta(days=days - 1)
+        query = self.db.query(UserDailyStats.day, UserDailyStats.category, UserDailyStats.count)\
+            .filter(
+                UserDailyStats.user_phone == user_phone,
+                UserDailyStats.day >= start,
+                UserDailyStats.count > 0
+            )
+        if category:
+            query = query.filter(UserDailyStats.category == category)
+
+        by_day: Dict[date, Dict[str, int]] = {}
+        for day, cat, count in query.all():
+            by_day.setdefault(day, {})[cat] = count
+
+        series = []
+        for offset in range(days):
+            day    = start + timedelta(days=offset)
+            counts = by_day.get(day, {})
+            series.append({"day": day.isoformat(), "total": sum(counts.values()), "categories": counts})
+        return {"start": start.isoformat(), "end": end.isoformat(), "days": days, "series": series}
+
+    # ── Rebuild / verify ─────────────────────────────────────────────────────
+    def _compute(self, user_phone: str) -> dict:
+        """Ground truth straight from `contents`"""
+        rows = self.db.query(Content.category, Content.platform, Content.created_at)\
+            .filter(Content.user_phone == user_phone)\
+            .all()
+        categories, platforms, daily = Counter(), Counter(), Counter()
+        for category, platform, created_at in rows:
+            categories[_key(category)] += 1
+            platforms[_key(platform)] += 1
+            daily[(_day(created_at), _key(category))] += 1
+        return {"total": len(rows), "categories": dict(categories), "platforms": dict(platforms), "daily": daily}
+
+    def rebuild_user(self, user_phone: str) -> Optional[UserStats]:
+        """Recompute one user's rollups from scratch (caller commits). None if the user has no content."""
+        truth = self._compute(user_phone)
+        self.db.query(UserDailyStats).filter(UserDailyStats.user_phone == user_phone).delete(synchronize_session=False)
+        stats = self.db.get(UserStats, user_phone)
+        if not truth["total"]:
+            if stats is not None:
+                self.db.delete(stats)
+            return None
+
+        if stats is None:
+            stats = UserStats(user_phone=user_phone)
+            self.db.add(stats)
+        self._bump_version(stats)
+        stats.total_contents  = truth["total"]
+        stats.category_counts = truth["categories"]
+        stats.platform_counts = truth["platforms"]
+        self.db.add_all([
+            UserDailyStats(user_phone=user_phone, day=day, category=category, count=count)
+            for (day, category), count in truth["daily"].items()
+        ])
+        return stats
+
+    def verify_user(self, user_phone: str) -> Optional[List[str]]:
+        """
+        Differences between the stored rollup and `contents` (empty list = no drift).
+        None when the user has no rollup row yet — rows are built lazily on the
+        first stats read, so a missing one is not drift.
+        """
+        stats = self.db.get(UserStats, user_phone)
+        if stats is None:
+            return None
+        truth = self._compute(user_phone)
+        drift = []
+        if stats.total_contents != truth["total"]:
+            drift.append(f"total {stats.total_contents} != {truth['total']}")
+        if dict(stats.category_counts or {}) != truth["categories"]:
+            drift.append(f"categories {stats.category_counts} != {truth['categories']}")
+        if dict(stats.platform_counts or {}) != truth["platforms"]:
+            drift.append(f"platforms {stats.platform_counts} != {truth['platforms']}")
+
+        daily = {
+            (day, category): count
+            for day, category, count in self.db.query(
+                UserDailyStats.day, UserDailyStats.category, UserDailyStats.count
+            ).filter(UserDailyStats.user_phone == user_phone, UserDailyStats.count != 0).all()
+        }
+        if daily != dict(truth["daily"]):
+            drift.append("daily counts differ")
+        return drift
+
+    def all_users(self) -> List[str]:
+        users = {phone for (phone,) in self.db.query(Content.user_phone).distinct()}
+        users |= {phone for (phone,) in self.db.query(UserStats.user_phone)}
+        return sorted(users)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    python -m app.services.stats_rollup rebuild [--user PHONE]
+    python -m app.services.stats_rollup verify  [--user PHONE]
+    """
+    from ..models.database import SessionLocal, engine, Base
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify per-user stats rollups")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--user", help="Only this user_phone (default: every user)")
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rollup = StatsRollup(db)
+        users  = [args.user] if args.user else rollup.all_users()
+        if args.command == "rebuild":
+            for user_phone in users:
+                rollup.rebuild_user(user_phone)
+            db.commit()
+            print(f"Rebuilt stats for {len(users)} users")
+            return 0
+
+        drifted = skipped = 0
+        for user_phone in users:
+            drift = rollup.verify_user(user_phone)
+            if drift is None:
+                skipped += 1
+            elif drift:
+                drifted += 1
+                print(f"{user_phone}: " + "; ".join(drift))
+        print(f"Verified {len(users) - skipped} users, {drifted} with drift ({skipped} not built yet)")
+        return 1 if drifted else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import asyncio
+import os
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TwilioMessenger:
+    """
+    Sends WhatsApp replies through the Twilio REST messages API.
+    Used when the webhook acks immediately and the summary is delivered later.
+    """
+
+    def __init__(self):
+        self.client = None
+        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+        auth_token  = os.getenv("TWILIO_AUTH_TOKEN")
+        if not account_sid or not auth_token:
+            logger.warning("Twilio credentials not set — outgoing replies disabled")
+            return
+        try:
+            from twilio.rest import Client
+            self.client = Client(account_sid, auth_token)
+        except Exception as e:
+            logger.error(f"Twilio client init failed: {e}")
+
+    def is_available(self) -> bool:
+        return self.client is not None
+
+    async def send(self, to: str, from_: str, body: str) -> Optional[str]:
+        """Send a message, returns the Twilio message SID (None on failure)"""
+        if not self.client:
+            return None
+        try:
+            # The Twilio SDK is blocking — keep it off the event loop
+            message = await asyncio.to_thread(
+                self.client.messages.create, to=to, from_=from_, body=body
+            )
+            logger.info(f"Twilio reply sent: {message.sid}")
+            return message.sid
+        except Exception as e:
+            logger.error(f"Twilio send failed: {e}")
+            return None
+
+
+class StubMessenger:
+    """Local stand-in for TwilioMessenger that records messages instead of sending them"""
+
+    def __init__(self):
+        self.sent: List[dict] = []
+
+    def is_available(self) -> bool:
+        return True
+
+    async def send(self, to: str, from_: str, body: str) -> Optional[str]:
+        sid = f"SM-stub-{len(self.sent) + 1}"
+        self.sent.append({"sid": sid, "to": to, "from_": from_, "body": body})
+        logger.info(f"[stub] reply to {to}: {body[:80]}")
+        return sid
+
+
+def get_messenger():
+    """Real Twilio client when configured, otherwise the local stub (or forced via TWILIO_STUB=1)"""
+    if os.getenv("TWILIO_STUB", "").lower() in ("1", "true", "yes"):
+        return StubMessenger()
+    messenger = TwilioMessenger()
+    return messenger if messenger.is_available() else StubMessenger()
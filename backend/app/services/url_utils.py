@@ -0,0 +1,89 @@
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query params that only track the share, never change the content
+TRACKING_PARAMS = {
+    'igsh', 'igshid', 'si', 'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'ref_url', 'feature', 'share_id',
+}
+
+INSTAGRAM_SHORTCODE = re.compile(r'instagram\.com/(?:[^/?#]+/)?(?:p|reels?|tv)/([^/?#]+)', re.IGNORECASE)
+YOUTUBE_ID          = re.compile(r'^[A-Za-z0-9_-]{6,}$')
+TWITTER_HOSTS       = {'twitter.com', 'x.com', 'mobile.twitter.com', 'mobile.x.com'}
+YOUTUBE_HOSTS       = {'youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtube-nocookie.com'}
+TWEET_PATH          = re.compile(r'^/([^/]+)/status(?:es)?/(\d+)')
+
+# How a message names a link and an optional #category override
+URL_PATTERN   = re.compile(r'https?://[^\s]+')
+CATEGORY_HINT = re.compile(r'#(fitness|coding|food|travel|design|fashion|business|education|entertainment)')
+
+def extract_links(text: str) -> List[Tuple[str, Optional[str]]]:
+    """Every URL in `text`, each paired with the text's #category hint (if any)"""
+    category_match = CATEGORY_HINT.search(text.lower())
+    category = category_match.group(1) if category_match else None
+    return [(url, category) for url in URL_PATTERN.findall(text)]
+
+def extract_instagram_shortcode(url: str) -> Optional[str]:
+    """Shortcode of an Instagram post / reel / IGTV link"""
+    match = INSTAGRAM_SHORTCODE.search(url)
+    return match.group(1) if match else None
+
+def extract_youtube_id(url: str) -> Optional[str]:
+    """Video ID from youtu.be, /watch?v=, /shorts/, /embed/ and /live/ links"""
+    parts = urlsplit(url if '://' in url else f'https://{url}')
+    host  = (parts.hostname or '').lower().removeprefix('www.')
+    path  = [p for p in parts.path.split('/') if p]
+
+    video_id = None
+    if host == 'youtu.be' and path:
+        video_id = path[0]
+    elif host in YOUTUBE_HOSTS:
+        if path[:1] == ['watch']:
+            video_id = dict(parse_qsl(parts.query)).get('v')
+        elif len(path) >= 2 and path[0] in ('shorts', 'embed', 'live', 'v'):
+            video_id = path[1]
+    return video_id if video_id and YOUTUBE_ID.match(video_id) else None
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith('utm_')
+
+def canonicalize_url(url: str) -> str:
+    """
+    Stable identity for a link, used as cache / dedupe key:
+      Instagram  → https://www.instagram.com/p/<shortcode>/
+      YouTube    → https://www.youtube.com/watch?v=<id>
+      Twitter/X  → https://twitter.com/<user>/status/<id> (no query)
+      Other      → lower-cased host, no fragment, tracking params removed, sorted query
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = f'https://{url}'
+
+    shortcode = extract_instagram_shortcode(url)
+    if shortcode:
+        return f'https://www.instagram.com/p/{shortcode}/'
+
+    video_id = extract_youtube_id(url)
+    if video_id:
+        return f'https://www.youtube.com/watch?v={video_id}'
+
+    parts  = urlsplit(url)
+    scheme = parts.scheme.lower() if parts.scheme in ('http', 'https') else 'https'
+    host   = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    path = parts.path.rstrip('/') or '/'
+
+    if host.removeprefix('www.') in TWITTER_HOSTS:
+        tweet = TWEET_PATH.match(path)
+        if tweet:
+            path = f'/{tweet.group(1).lower()}/status/{tweet.group(2)}'
+        return urlunsplit(('https', 'twitter.com', path, '', ''))
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(k)
+    ))
+    return urlunsplit((scheme, host, path, query, ''))
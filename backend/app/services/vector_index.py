@@ -0,0 +1,346 @@
+import argparse
+import os
+import re
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:   # similar / semantic search is optional
+    np = None
+
+try:
+    import fcntl
+except ImportError:   # Windows — writes are still serialised within the process
+    fcntl = None
+
+from .local_classifier import features
+
+logger = logging.getLogger(__name__)
+
+DIM = int(os.getenv("VECTOR_DIM", "256"))
+
+# Field weights in the embedding — titles and tags say the most about a save
+FIELD_WEIGHTS = (("title", 2.0), ("ai_summary", 1.5), ("tags", 1.5), ("description", 1.0))
+
+def embed_text(parts: Sequence[Tuple[str, float]], dim: int = DIM) -> "np.ndarray":
+    """
+    Signed feature hashing of word unigrams/bigrams into `dim` float32 slots,
+    log-scaled term weights, L2-normalised (dot product = cosine similarity).
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for text, weight in parts:
+        for feature in features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % dim] += weight if (h >> 31) & 1 else -weight
+    np.copysign(np.log1p(np.abs(vector)), vector, out=vector)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def embed_content(content, dim: int = DIM) -> "np.ndarray":
+    parts = []
+    for field, weight in FIELD_WEIGHTS:
+        value = getattr(content, field, None)
+        if isinstance(value, list):
+            value = " ".join(map(str, value))
+        if value:
+            parts.append((str(value), weight))
+    return embed_text(parts, dim)
+
+
+class UserVectors:
+    """
+    One user's vectors: `<key>.f32` is an N × DIM float32 matrix and `<key>.ids`
+    the matching content ids (-1 = deleted), both append-only on disk and
+    memory-mapped for reads. Writers hold `<key>.lock` (shared by every
+    worker process); a pair left uneven by a crash is cut back to its
+    common length. Cached maps and the IVF are keyed on the files' inode and
+    size, so a rewrite by another process is noticed even at the same size.
+    """
+
+    def __init__(self, directory: str, user_phone: str, dim: int):
+        key = re.sub(r"[^0-9A-Za-z]+", "_", user_phone).strip("_") or "anon"
+        self.vectors_path = os.path.join(directory, f"{key}.f32")
+        self.ids_path     = os.path.join(directory, f"{key}.ids")
+        self.lock_path    = os.path.join(directory, f"{key}.lock")
+        self.dim          = dim
+        self.lock         = threading.Lock()
+        self._key: Optional[tuple] = None   # (ids inode, ids size, vectors inode) behind the current maps
+        self._matrix: Optional["np.ndarray"] = None
+        self._ids: Optional["np.ndarray"] = None
+        # (generation, rows covered, centroids, lists) — generation = the files' inodes when trained
+        self._ivf: Optional[Tuple[tuple, int, "np.ndarray", List["np.ndarray"]]] = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.ids_path)
+
+    @contextmanager
+    def writing(self):
+        """Exclusive write access: this process's threads, then other processes"""
+        with self.lock:
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _rows(self) -> int:
+        """Complete (vector, id) pairs on disk"""
+        if not self.exists():
+            return 0
+        vectors = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        return min(os.path.getsize(self.ids_path) // 8, vectors // (4 * self.dim))
+
+    def _repair(self) -> int:
+        """Cut both files back to their complete pairs (call while writing); returns the row count"""
+        rows = self._rows()
+        for path, size in ((self.vectors_path, rows * 4 * self.dim), (self.ids_path, rows * 8)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                logger.warning(f"Truncating {path} to {rows} rows (interrupted write)")
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+        return rows
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            ids, vectors = os.stat(self.ids_path), os.stat(self.vectors_path)
+        except FileNotFoundError:
+            return None
+        return ids.st_ino, ids.st_size, vectors.st_ino
+
+    @property
+    def generation(self) -> Optional[tuple]:
+        """Identity of the files currently mapped — changes when any process rewrites them"""
+        return (self._key[0], self._key[2]) if self._key else None
+
+    def load(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """(matrix, ids), re-mapped whenever the files grew or were replaced; only complete pairs are mapped"""
+        key = self._stat()
+        if key is None or key != self._key:
+            rows = self._rows() if key else 0
+            if rows:
+                self._ids    = np.memmap(self.ids_path, dtype=np.int64, mode="r", shape=(rows,))
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            else:
+                self._ids    = np.zeros(0, dtype=np.int64)
+                self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+            self._key = key
+        return self._matrix, self._ids
+
+    def append(self, ids: Sequence[int], vectors: "np.ndarray"):
+        with self.writing():
+            self._repair()
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with open(self.ids_path, "ab") as f:
+                f.write(np.asarray(ids, dtype=np.int64).tobytes())
+
+    def remove(self, content_ids: Iterable[int]):
+        """Tombstone rows in place"""
+        if not self.exists():
+            return
+        with self.writing():
+            if not self._repair():
+                return
+            ids = np.memmap(self.ids_path, dtype=np.int64, mode="r+")
+            ids[np.isin(ids, np.fromiter(content_ids, dtype=np.int64))] = -1
+            ids.flush()
+            del ids
+            self._key = None
+
+    def rewrite(self, ids: Sequence[int], vectors: "np.ndarray"):
+        with self.writing():
+            # Without the ids file the pair does not exist, so a crash midway
+            # leaves no mismatched generation behind — just a rebuild on next use
+            if self.exists():
+                os.remove(self.ids_path)
+            for path, data in ((self.vectors_path, np.asarray(vectors, dtype=np.float32)),
+                               (self.ids_path, np.asarray(ids, dtype=np.int64))):
+                tmp = f"{path}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(np.ascontiguousarray(data).tobytes())
+                os.replace(tmp, path)
+            self._key = None
+            self._ivf = None
+
+
+class VectorIndex:
+    """
+    Local "similar saves" index: per-user float32 matrices memory-mapped from
+    `directory`, exact top-k cosine by one matrix-vector product, and an
+    IVF (k-means partitions, probe the `nprobe` closest) for users with at
+    least `ivf_min_rows` vectors.
+    """
+
+    def __init__(self, directory: str, dim: int = DIM, ivf_min_rows: int = 20000, nprobe: int = 8):
+        self.directory    = directory
+        self.dim          = dim
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe       = nprobe
+        self._users: Dict[str, UserVectors] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def user(self, user_phone: str) -> UserVectors:
+        with self._lock:
+            if user_phone not in self._users:
+                os.makedirs(self.directory, exist_ok=True)
+                self._users[user_phone] = UserVectors(self.directory, user_phone, self.dim)
+            return self._users[user_phone]
+
+    # ── Writes (called by ContentService after commit) ───────────────────────
+    def embed(self, contents: Sequence) -> Dict[str, Tuple[List[int], "np.ndarray"]]:
+        """user_phone → (content ids, vectors), computed while the rows are still loaded"""
+        by_user: Dict[str, list] = {}
+        if self.available:
+            for content in contents:
+                by_user.setdefault(content.user_phone, []).append(content)
+        return {
+            user_phone: ([c.id for c in items], np.vstack([embed_content(c, self.dim) for c in items]))
+            for user_phone, items in by_user.items()
+        }
+
+    def store(self, embedded: Dict[str, Tuple[List[int], "np.ndarray"]]):
+        """Append to users that already have vectors — others are built whole on first search"""
+        for user_phone, (ids, vectors) in embedded.items():
+            store = self.user(user_phone)
+            if store.exists():
+                store.append(ids, vectors)
+
+    def add(self, contents: Sequence):
+        self.store(self.embed(contents))
+
+    def update(self, content):
+        if not self.available:
+            return
+        store = self.user(content.user_phone)
+        if store.exists():
+            store.remove([content.id])
+            store.append([content.id], embed_content(content, self.dim)[None, :])
+
+    def remove(self, user_phone: str, content_id: int):
+        if self.available:
+            self.user(user_phone).remove([content_id])
+
+    def rebuild(self, user_phone: str, contents: Sequence):
+        """Replace a user's vectors (also compacts away tombstones)"""
+        if not self.available:
+            return
+        vectors = np.vstack([embed_content(c, self.dim) for c in contents]) if contents \
+            else np.zeros((0, self.dim), dtype=np.float32)
+        self.user(user_phone).rewrite([c.id for c in contents], vectors)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+    def vector_for(self, user_phone: str, content_id: int) -> Optional["np.ndarray"]:
+        matrix, ids = self.user(user_phone).load()
+        rows = np.flatnonzero(ids == content_id)
+        return np.array(matrix[rows[-1]]) if len(rows) else None
+
+    def search(self, user_phone: str, query: "np.ndarray", k: int = 10,
+               exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Top-k (content_id, cosine) for a unit query vector, best first"""
+        store = self.user(user_phone)
+        matrix, ids = store.load()
+        if not len(ids):
+            return []
+
+        rows = self._candidates(store, matrix, query)
+        scores = matrix[rows] @ query if rows is not None else matrix @ query
+        candidate_ids = ids[rows] if rows is not None else ids
+        valid = candidate_ids >= 0
+        if exclude is not None:
+            valid &= candidate_ids != exclude
+        scores = np.where(valid, scores, -np.inf)
+
+        k = min(k, int(valid.sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidate_ids[i]), float(scores[i])) for i in top]
+
+    def _candidates(self, store: UserVectors, matrix, query) -> Optional["np.ndarray"]:
+        """Row numbers to scan — None means all of them (exact search)"""
+        n = len(matrix)
+        if n < self.ivf_min_rows:
+            return None
+        ivf = store._ivf
+        # Retrain when the files were replaced (here or by another worker), shrank, or grew by 20 %
+        if ivf is None or ivf[0] != store.generation or not ivf[1] <= n <= ivf[1] * 1.2:
+            ivf = store._ivf = (store.generation, n, *self._train_ivf(matrix))
+        _, covered, centroids, lists = ivf
+        probe = np.argsort(-(centroids @ query))[:self.nprobe]
+        # Rows appended since the partitions were built are always scanned
+        return np.concatenate([lists[p] for p in probe] + [np.arange(covered, n)])
+
+    @staticmethod
+    def _train_ivf(matrix, iterations: int = 8, sample: int = 50000):
+        """Spherical k-means with sqrt(n) lists, trained on a sample, then every row assigned"""
+        n = len(matrix)
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(0)
+        train = np.asarray(matrix[rng.choice(n, size=min(n, sample), replace=False)])
+        centroids = train[rng.choice(len(train), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = (train @ centroids.T).argmax(axis=1)
+            for c in range(nlist):
+                members = train[assign == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        assign = np.empty(n, dtype=np.int64)
+        for start in range(0, n, 65536):
+            assign[start:start + 65536] = (np.asarray(matrix[start:start + 65536]) @ centroids.T).argmax(axis=1)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(nlist + 1))
+        lists = [order[bounds[c]:bounds[c + 1]] for c in range(nlist)]
+        logger.info(f"Built IVF index: {n} vectors in {nlist} lists")
+        return centroids, lists
+
+
+vector_index = VectorIndex(
+    os.getenv("VECTOR_INDEX_DIR", "vectors"),
+    ivf_min_rows=int(os.getenv("VECTOR_IVF_MIN_ROWS", "20000")),
+    nprobe=int(os.getenv("VECTOR_IVF_NPROBE", "8")),
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """python -m app.services.vector_index rebuild [--user PHONE]"""
+    from ..models.database import SessionLocal
+    from ..models.content import Content
+
+    parser = argparse.ArgumentParser(description="Rebuild the local similar-search vectors")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--user", help="Only this user_phone (default: every user)")
+    args = parser.parse_args(argv)
+
+    if not vector_index.available:
+        print("numpy is not installed")
+        return 1
+
+    db = SessionLocal()
+    try:
+        users = [args.user] if args.user else [u for (u,) in db.query(Content.user_phone).distinct()]
+        for user_phone in users:
+            contents = db.query(Content).filter(Content.user_phone == user_phone).order_by(Content.id).all()
+            vector_index.rebuild(user_phone, contents)
+        print(f"Rebuilt vectors for {len(users)} users")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
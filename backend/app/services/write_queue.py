@@ -0,0 +1,173 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from ..models.content import Content
+from ..models.database import session_scope
+from ..models.schemas import ContentCreate
+from .content_service import AsyncContentService, ContentService, DuplicateContent
+from .metrics import db_flush_seconds
+from .url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+Pending = Tuple[ContentCreate, asyncio.Future]
+
+
+class WriteQueue:
+    """
+    Single writer for new saves. Callers await `create()`; one task collects
+    whatever arrives within `flush_ms` (up to `max_batch` rows) and inserts
+    it in one transaction — one commit/fsync per batch instead of per row,
+    and no writers fighting over the SQLite lock.
+    """
+
+    def __init__(self, flush_ms: float = 5, max_batch: int = 500, maxsize: int = 10000,
+                 session_scope=session_scope):
+        self.flush_ms      = flush_ms
+        self.max_batch     = max(1, max_batch)
+        self.maxsize       = maxsize
+        self.session_scope = session_scope
+        self.batches       = 0
+        self.rows          = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def stats(self) -> dict:
+        return {"running": self.running, "pending": self.qsize(), "batches": self.batches, "rows": self.rows}
+
+    async def start(self):
+        if self._task:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task  = asyncio.create_task(self._writer(), name="write-queue")
+        logger.info(f"Write queue started ({self.flush_ms} ms window, up to {self.max_batch} rows)")
+
+    async def stop(self):
+        """Write what is queued, then stop the writer"""
+        if not self._task:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def create(self, content: ContentCreate) -> Content:
+        """Save one content through the next batch; raises DuplicateContent like create_content"""
+        if not self._task:
+            async with self.session_scope() as db:
+                return await AsyncContentService(db).create_content(content)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((content, future))
+        return await future
+
+    async def _writer(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch: List[Pending] = [item]
+            deadline = time.monotonic() + self.flush_ms / 1000
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else \
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Write queue batch failed: {e}", exc_info=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _flush(self, batch: List[Pending]):
+        # First save of a link in the batch wins, repeats are answered with it
+        firsts: Dict[Tuple[str, str], Pending] = {}
+        for content, future in batch:
+            firsts.setdefault((content.user_phone, canonicalize_url(str(content.url))), (content, future))
+
+        try:
+            with db_flush_seconds.time():
+                async with self.session_scope() as db:
+                    rows = await AsyncContentService(db).run(
+                        lambda service: self._insert(service, [content for content, _ in firsts.values()])
+                    )
+            self.batches += 1
+            self.rows    += sum(created for _, created in rows.values())
+        except Exception as e:
+            # One bad row must not fail its neighbours — fall back to row-by-row
+            logger.warning(f"Batch of {len(firsts)} failed ({e}), writing rows one by one")
+            await self._one_by_one(batch)
+            return
+
+        for content, future in batch:
+            key = (content.user_phone, canonicalize_url(str(content.url)))
+            row, created = rows.get(key, (None, False))
+            if future.done():       # caller went away
+                continue
+            if row is None:
+                future.set_exception(RuntimeError(f"{content.url} was not saved"))
+            elif created and firsts[key][1] is future:
+                future.set_result(row)
+            else:
+                future.set_exception(DuplicateContent(row))
+
+    @staticmethod
+    def _insert(service: ContentService, contents: List[ContentCreate]) -> Dict[Tuple[str, str], Tuple[Content, bool]]:
+        """
+        (user_phone, canonical_url) → (row, created) for every link of the
+        batch — links saved before come back with created=False. Rows are
+        fully loaded so they stay usable after the session closes.
+        """
+        by_user: Dict[str, List[ContentCreate]] = {}
+        for content in contents:
+            by_user.setdefault(content.user_phone, []).append(content)
+        fresh = []
+        for user_phone, items in by_user.items():
+            existing = service.existing_urls(user_phone, [str(c.url) for c in items])
+            fresh += [c for c in items if canonicalize_url(str(c.url)) not in existing]
+
+        saved = service.create_contents(fresh)
+        rows = {}
+        if saved:
+            for row in service.db.query(Content).filter(Content.id.in_([row.id for row in saved])):
+                rows[(row.user_phone, row.canonical_url)] = (row, True)
+        for content in contents:
+            key = (content.user_phone, canonicalize_url(str(content.url)))
+            if key not in rows:
+                existing = service.find_by_url(content.user_phone, str(content.url))
+                if existing is not None:
+                    rows[key] = (existing, False)
+        return rows
+
+    async def _one_by_one(self, batch: List[Pending]):
+        for content, future in batch:
+            if future.done():
+                continue
+            try:
+                async with self.session_scope() as db:
+                    future.set_result(await AsyncContentService(db).create_content(content))
+            except Exception as e:
+                future.set_exception(e)
+
+
+write_queue = WriteQueue(
+    flush_ms=float(os.getenv("WRITE_BATCH_MS", "5")),
+    max_batch=int(os.getenv("WRITE_BATCH_MAX", "500")),
+)
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import tempfile
+
+# Point every store at a throwaway directory before the app is imported
+# (database.py, the caches and the vector index read these at import time)
+_tmp = tempfile.mkdtemp(prefix="social_saver_tests_")
+os.environ["DATABASE_URL"]             = f"sqlite:///{_tmp}/test.db"
+os.environ["CACHE_DB_PATH"]            = f"{_tmp}/cache.db"
+os.environ["VECTOR_INDEX_DIR"]         = f"{_tmp}/vectors"
+os.environ["LOCAL_CLASSIFIER_PATH"]    = f"{_tmp}/classifier.npz"
+os.environ["ENRICHMENT_CACHE_BACKEND"] = "memory"
+
+import pytest
+
+from app.main import init_db
+from app.models.database import Base, SessionLocal, engine
+from app.models.schemas import ContentCreate
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    init_db()
+
+
+@pytest.fixture
+def db():
+    """A session on an emptied database"""
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_content():
+    """ContentCreate factory: make_content(url, user_phone=..., **fields)"""
+    def make(url: str, user_phone: str = "15550001111", **fields) -> ContentCreate:
+        return ContentCreate(**{
+            "url": url, "user_phone": user_phone, "platform": "other",
+            "title": url, "category": "coding", **fields,
+        })
+    return make
+
+
+@pytest.fixture
+def run():
+    """asyncio.run() for a test coroutine; pooled async connections are closed with its loop"""
+    from app.models.database import async_engine
+
+    async def scoped(coro):
+        try:
+            return await coro
+        finally:
+            if async_engine is not None:
+                await async_engine.dispose()
+    return lambda coro: asyncio.run(scoped(coro))
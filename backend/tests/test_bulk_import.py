@@ -0,0 +1,22 @@
+import asyncio
+
+from app.services.bulk_import import read_links
+
+
+async def _chunks(text: str, size: int = 7):
+    data = text.encode("utf-8")
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_read_links_dedupes_and_reports_what_the_cap_cut():
+    upload = "\n".join([
+        "12/05/24, 10:00 - Ana: https://example.com/a #travel",
+        "12/05/24, 10:01 - Ana: https://example.com/a?utm_source=wa",
+        "12/05/24, 10:02 - Ana: https://example.com/b https://example.com/c",
+        "https://example.com/d",
+    ])
+    links, duplicates, truncated = asyncio.run(read_links(_chunks(upload), max_links=2))
+
+    assert links == [("https://example.com/a", "travel"), ("https://example.com/b", None)]
+    assert (duplicates, truncated) == (1, 2)
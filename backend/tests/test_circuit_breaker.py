@@ -0,0 +1,40 @@
+import asyncio
+
+import httpx
+
+from app.services.circuit_breaker import ProviderError, breakers, guarded, negative_cache
+
+
+def _outcome(name: str, error: BaseException, url: str = "https://example.com/a"):
+    async def fetch(url):
+        raise error
+    call = guarded(name, fetch, timeout=1)
+    assert asyncio.run(call(url)) is None
+    breaker = breakers.get(name)
+    return breaker.snapshot()["errors"], bool(negative_cache.get(f"{name}:{url}"))
+
+
+def test_provider_errors_trip_the_breaker_without_marking_the_url():
+    assert _outcome("test_provider_error", ProviderError("503")) == (1, False)
+
+
+def test_url_errors_mark_the_url_without_tripping_the_breaker():
+    assert _outcome("test_url_error", httpx.ConnectError("dead host")) == (0, True)
+
+
+def test_transport_errors_count_for_fixed_host_providers():
+    async def fetch(url):
+        raise httpx.ConnectError("provider down")
+    call = guarded("test_host_error", fetch, timeout=1, provider_errors=(ProviderError, httpx.TransportError))
+    assert asyncio.run(call("https://example.com/b")) is None
+    assert breakers.get("test_host_error").snapshot()["errors"] == 1
+    assert not negative_cache.get("test_host_error:https://example.com/b")
+
+
+def test_timeouts_trip_the_breaker_without_marking_the_url():
+    async def fetch(url):
+        await asyncio.sleep(1)
+    call = guarded("test_timeout", fetch, timeout=0.01)
+    assert asyncio.run(call("https://example.com/c")) is None
+    assert breakers.get("test_timeout").snapshot()["errors"] == 1
+    assert not negative_cache.get("test_timeout:https://example.com/c")
@@ -0,0 +1,22 @@
+from starlette.requests import Request
+
+from app.api.content import _etag, _not_modified
+
+
+def request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_etag_is_weak_because_gzip_may_rewrite_the_body():
+    assert _etag("content", 1, 3).startswith('W/"')
+    assert _etag("content", 1, 3) == _etag("content", 1, 3) != _etag("content", 1, 4)
+
+
+def test_if_none_match_compares_weakly():
+    etag   = _etag("stats", "+1555", 7)
+    opaque = etag.removeprefix("W/")
+    for header in (etag, opaque, f'"other", {etag}', "*"):
+        assert _not_modified(request(header), etag).status_code == 304
+    assert _not_modified(request('W/"other"'), etag) is None
+    assert _not_modified(request(), etag) is None
@@ -0,0 +1,62 @@
+import asyncio
+
+from app.services.cache import MemoryCache, SQLiteCache
+from app.services.enrichment_cache import EnrichmentCache
+
+PROFILE = {"title": "Leg day", "category": "fitness", "tags": ["fitness", "gym"]}
+
+
+def _cache() -> EnrichmentCache:
+    return EnrichmentCache(MemoryCache(max_entries=10, ttl=60))
+
+
+def test_stored_profile_is_a_copy():
+    cache   = _cache()
+    profile = {**PROFILE, "tags": list(PROFILE["tags"])}
+    cache.set("k", profile)
+
+    profile["tags"].append("changed after set")
+    assert cache.get("k") == PROFILE
+
+
+def test_returned_profile_is_a_copy():
+    cache = _cache()
+    cache.set("k", PROFILE)
+
+    first = cache.get("k")
+    first["tags"].insert(0, "travel")
+    first["category"] = "travel"
+    assert cache.get("k") == PROFILE
+    assert cache.get("k") is not cache.get("k")
+
+
+def test_hits_and_misses():
+    cache = _cache()
+    assert cache.get("missing") is None
+    cache.set("k", PROFILE)
+    cache.get("k")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_ignores_url_variants_and_whitespace():
+    a = EnrichmentCache.key_for("m", "v1", "https://youtu.be/dQw4w9WgXcQ?si=x", "YouTube", " Never  gonna ")
+    b = EnrichmentCache.key_for("m", "v1", "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "youtube", "never gonna")
+    assert a == b
+    assert a != EnrichmentCache.key_for("m", "v2", "https://youtu.be/dQw4w9WgXcQ", "youtube", "never gonna")
+
+
+def test_sqlite_backend_opens_on_first_use_behind_a_front_tier(tmp_path):
+    path  = tmp_path / "cache.db"
+    cache = EnrichmentCache(SQLiteCache(str(path), "enrichment", max_entries=10, ttl=60))
+    assert not path.exists()
+
+    async def scenario():
+        await cache.aset("k", PROFILE)
+        cache.front.clear()                # force a read from disk
+        from_disk = await cache.aget("k")
+        from_front = await cache.aget("k")
+        return from_disk, from_front
+
+    assert asyncio.run(scenario()) == (PROFILE, PROFILE)
+    assert path.exists()
+    assert (cache.hits, len(cache.front)) == (2, 1)
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpcore
+import pytest
+
+from app.services import http_client
+from app.services.http_client import _DNSCachingBackend
+
+
+@pytest.fixture
+def dialled(monkeypatch):
+    """Addresses connect_tcp dialled; 10.0.0.1 always refuses"""
+    calls = []
+
+    async def connect_tcp(self, host, port, **kwargs):
+        calls.append(host)
+        if host == "10.0.0.1":
+            raise httpcore.ConnectError("refused")
+        return f"stream:{host}"
+
+    async def getaddrinfo(self, host, port, **kwargs):
+        return [(2, 1, 6, "", (address, port)) for address in ("10.0.0.1", "10.0.0.2", "10.0.0.1")]
+
+    monkeypatch.setattr(http_client.AutoBackend, "connect_tcp", connect_tcp)
+    monkeypatch.setattr(asyncio.BaseEventLoop, "getaddrinfo", getaddrinfo)
+    return calls
+
+
+def test_dead_address_falls_through_to_the_next(dialled, run):
+    backend = _DNSCachingBackend(ttl=60)
+    assert run(backend.connect_tcp("example.com", 443)) == "stream:10.0.0.2"
+    assert dialled == ["10.0.0.1", "10.0.0.2"]
+    # The working address leads until the entry expires; duplicates are dropped
+    assert backend._cache[("example.com", 443)][0] == ["10.0.0.2", "10.0.0.1"]
+    assert run(backend.connect_tcp("example.com", 443)) == "stream:10.0.0.2"
+    assert dialled[2:] == ["10.0.0.2"]
+
+
+def test_cache_entry_dropped_only_when_every_address_fails(dialled, run):
+    backend = _DNSCachingBackend(ttl=60)
+    backend._cache[("example.com", 443)] = (["10.0.0.1"], float("inf"))
+    with pytest.raises(httpcore.ConnectError):
+        run(backend.connect_tcp("example.com", 443))
+    assert ("example.com", 443) not in backend._cache
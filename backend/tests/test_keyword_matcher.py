@@ -0,0 +1,19 @@
+import pytest
+
+from app.services.keyword_matcher import keyword_matcher
+
+
+@pytest.mark.parametrize("text, category", [
+    ("Watercolor tutorial for beginners", "education"),   # 'tutorial' is education only
+    ("Python tutorial", "coding"),                        # 1–1 tie: coding is listed first
+    ("Art of coding", "coding"),                          # 1–1 tie: coding before design
+    ("How to start a startup", "business"),               # whole words: 'start' is not 'art'
+    ("Best beaches and hotels in Lisbon", "travel"),      # plurals match their keyword
+    ("nothing to see here", "other"),
+])
+def test_categorize(text, category):
+    assert keyword_matcher.categorize(text) == category
+
+
+def test_tags_lead_with_the_category():
+    assert keyword_matcher.match("gym workout and cardio").tags() == ["fitness", "gym", "workout", "cardio"]
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.models.content import Content, ContentRaw
+from app.models.database import Base
+from app.models.migrations import EMPTY_REPORT, applied_migrations, upgrade_schema
+
+# `contents` exactly as the first release created it
+BASELINE_CONTENTS = """
+CREATE TABLE contents (
+    id INTEGER NOT NULL PRIMARY KEY,
+    user_phone VARCHAR(20) NOT NULL,
+    url VARCHAR(500) NOT NULL,
+    platform VARCHAR(50) NOT NULL,
+    title VARCHAR(500),
+    description TEXT,
+    category VARCHAR(50) NOT NULL,
+    tags JSON,
+    ai_summary TEXT,
+    media_url VARCHAR(500),
+    thumbnail_url VARCHAR(500),
+    raw_data JSON,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    updated_at DATETIME
+)
+"""
+
+BASELINE_ROWS = [
+    # id, user, url, title, description, tags, raw_data
+    (1, "111", "https://www.instagram.com/reel/ABC123/?igsh=x", "Leg day", None, ["fitness"],
+     {"url": "https://www.instagram.com/reel/ABC123/?igsh=x", "title": "Leg day", "likes": 42}),
+    (2, "111", "https://instagram.com/p/ABC123", "Leg day (again)", "Squats", ["gym", "fitness"],
+     {"title": "Leg day (again)"}),
+    (3, "222", "https://www.instagram.com/p/ABC123/", "Someone else's save", None, [], None),
+    (4, "111", "https://example.com/article", "Article", None, [], "null"),
+    (5, "111", "https://example.com/notes", "Notes", None, [], {"title": "Notes"}),
+]
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    with engine.begin() as conn:
+        conn.execute(text(BASELINE_CONTENTS))
+        for id_, user, url, title, description, tags, raw in BASELINE_ROWS:
+            conn.execute(
+                text("INSERT INTO contents (id, user_phone, url, platform, title, description, category, tags, raw_data) "
+                     "VALUES (:id, :user, :url, 'instagram', :title, :description, 'fitness', :tags, :raw)"),
+                {"id": id_, "user": user, "url": url, "title": title, "description": description,
+                 "tags": json.dumps(tags), "raw": raw if raw == "null" else json.dumps(raw) if raw else None},
+            )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _columns(engine) -> set:
+    return {column["name"] for column in inspect(engine).get_columns("contents")}
+
+
+def test_startup_upgrade_leaves_destructive_steps_pending(baseline_engine):
+    report = upgrade_schema(baseline_engine)
+
+    assert report == EMPTY_REPORT
+    assert applied_migrations(baseline_engine) == set()
+    assert {"canonical_url", "raw_data"} <= _columns(baseline_engine)
+    assert "ux_contents_user_canonical_url" not in {i["name"] for i in inspect(baseline_engine).get_indexes("contents")}
+    with Session(bind=baseline_engine) as db:
+        assert db.query(Content).count() == len(BASELINE_ROWS)
+        assert db.query(Content).filter(Content.canonical_url.is_(None)).count() == 0
+
+
+def test_upgrade_brings_a_baseline_database_up_to_date(baseline_engine):
+    report = upgrade_schema(baseline_engine, destructive=True)
+
+    inspector = inspect(baseline_engine)
+    columns   = {column["name"] for column in inspector.get_columns("contents")}
+    assert {"canonical_url", "category_source"} <= columns
+    assert "raw_data" not in columns
+    assert "ux_contents_user_canonical_url" in {index["name"] for index in inspector.get_indexes("contents")}
+
+    # Row 2 was merged away and row 4 holds JSON null; of rows 1 and 5 only
+    # row 1 has raw_data beyond its own columns
+    assert (report["rows"], report["kept"]) == (2, 1)
+
+    with Session(bind=baseline_engine) as db:
+        rows = {row.id: row for row in db.query(Content)}
+        raw  = {row.content_id: row.data for row in db.query(ContentRaw)}
+
+    # Same reel twice for user 111: the oldest row stays, filled in from the newer copy
+    assert sorted(rows) == [1, 3, 4, 5]
+    assert rows[1].canonical_url == "https://www.instagram.com/p/ABC123/"
+    assert rows[1].title == "Leg day"
+    assert rows[1].description == "Squats"
+    assert rows[1].tags == ["fitness", "gym"]
+    assert rows[3].canonical_url == rows[1].canonical_url   # other users are untouched
+    assert raw == {1: {"likes": 42}}
+
+
+def test_destructive_steps_run_once(baseline_engine):
+    upgrade_schema(baseline_engine, destructive=True)
+    assert applied_migrations(baseline_engine) == {"dedupe_contents", "compact_raw_data"}
+
+    report = upgrade_schema(baseline_engine, destructive=True)
+    assert report == EMPTY_REPORT
+    with Session(bind=baseline_engine) as db:
+        assert db.query(Content).count() == 4
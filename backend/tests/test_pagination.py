@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.models.content import Content
+from app.services.content_service import ContentService
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2024, 5, 1, 12, 30, 15),
+    datetime(2024, 5, 1, 12, 30, 15, 123456),
+    datetime(2024, 5, 1, 12, 30, 15, tzinfo=timezone.utc),
+])
+def test_cursor_round_trip(created_at):
+    token = encode_cursor(created_at, 42)
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, 42)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", encode_cursor(datetime(2024, 1, 1), 1)[:-3]])
+def test_malformed_cursor(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token)
+
+
+def test_pages_cover_every_row_once(db, make_content):
+    service = ContentService(db)
+    service.create_contents([make_content(f"https://example.com/{n}") for n in range(7)])
+    # Rows saved within the same second tie on created_at; id breaks the tie
+    # (written in SQLite's CURRENT_TIMESTAMP format, as server_default stores it)
+    db.execute(text("UPDATE contents SET created_at = '2024-05-01 12:00:00' WHERE id <= 4"))
+    db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = service.list_contents("15550001111", cursor=cursor, limit=3)
+        seen += [row.id for row in page]
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 7
+    ordered = db.query(Content.id).order_by(Content.created_at.desc(), Content.id.desc())
+    assert seen == [content_id for (content_id,) in ordered]
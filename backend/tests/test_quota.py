@@ -0,0 +1,35 @@
+import asyncio
+import time
+
+from app.services.quota import TokenBucket
+
+
+def test_waiters_never_overshoot_their_deadline():
+    bucket = TokenBucket(rate_per_sec=20, burst=1)
+
+    async def acquire():
+        started = time.monotonic()
+        ok = await bucket.acquire(timeout=0.12)
+        return ok, time.monotonic() - started
+
+    async def scenario():
+        return await asyncio.gather(*(acquire() for _ in range(6)))
+
+    results = asyncio.run(scenario())
+    # One token now, then one every 50 ms: the first three fit in 120 ms
+    assert [ok for ok, _ in results] == [True, True, True, False, False, False]
+    assert all(elapsed < 0.12 + 0.05 for _, elapsed in results)
+
+
+def test_cancelled_waiter_returns_its_reservation():
+    bucket = TokenBucket(rate_per_sec=10, burst=1)
+
+    async def scenario():
+        assert await bucket.acquire(timeout=0)
+        waiter = asyncio.create_task(bucket.acquire(timeout=1))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return bucket.tokens
+
+    assert asyncio.run(scenario()) > -0.5
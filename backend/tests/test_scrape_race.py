@@ -0,0 +1,61 @@
+import asyncio
+
+from app.services.scrape_race import RacePolicy, Tier, has_description, run_chain
+
+CAPTION = {"title": "Leg day", "description": "Full caption #fitness"}
+TITLE   = {"title": "Leg day", "description": ""}
+
+
+def _fetcher(result, delay: float, log: list = None, name: str = ""):
+    async def fetch(url):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(name)
+            raise
+        return result
+    return fetch
+
+
+def _race(*tiers, hedge_delay: float = 0.01):
+    policy = RacePolicy(tiers=list(tiers), mode="hedged", hedge_delay=hedge_delay)
+    return asyncio.run(run_chain("https://example.com/p", policy))
+
+
+def test_title_only_result_waits_for_the_richer_tier():
+    result = _race(
+        Tier("rich", _fetcher(CAPTION, 0.1)),
+        Tier("title_only", _fetcher(TITLE, 0.0), preempt=has_description),
+    )
+    assert result == CAPTION
+
+
+def test_held_result_wins_when_the_richer_tier_fails():
+    result = _race(
+        Tier("rich", _fetcher(None, 0.05)),
+        Tier("title_only", _fetcher(TITLE, 0.0), preempt=has_description),
+    )
+    assert result == TITLE
+
+
+def test_first_acceptable_result_wins_without_a_preempt_check():
+    result = _race(
+        Tier("slow", _fetcher(CAPTION, 0.2)),
+        Tier("fast", _fetcher(TITLE, 0.0)),
+    )
+    assert result == TITLE
+
+
+def test_losers_are_cancelled_and_awaited():
+    cancelled = []
+
+    async def scenario():
+        policy = RacePolicy(tiers=[
+            Tier("fast", _fetcher(CAPTION, 0.0)),
+            Tier("slow", _fetcher(TITLE, 1.0, cancelled, "slow")),
+        ], mode="parallel")
+        result = await run_chain("https://example.com/p", policy)
+        return result, list(cancelled)   # snapshot taken right as run_chain returns
+
+    assert asyncio.run(scenario()) == (CAPTION, ["slow"])
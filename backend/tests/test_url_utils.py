@@ -0,0 +1,29 @@
+import pytest
+
+from app.services.url_utils import canonicalize_url
+
+
+@pytest.mark.parametrize("url, canonical", [
+    # Instagram: posts, reels and IGTV collapse to /p/<shortcode>/
+    ("https://www.instagram.com/reel/Cx1_a-B/?igsh=abc", "https://www.instagram.com/p/Cx1_a-B/"),
+    ("instagram.com/p/Cx1_a-B", "https://www.instagram.com/p/Cx1_a-B/"),
+    ("https://www.instagram.com/someone/reels/Cx1_a-B/", "https://www.instagram.com/p/Cx1_a-B/"),
+    # YouTube: every link shape becomes /watch?v=<id>
+    ("https://youtu.be/dQw4w9WgXcQ?si=share", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=42", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("https://www.youtube.com/shorts/dQw4w9WgXcQ", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    # Twitter / X: one host, lower-cased user, no query
+    ("https://x.com/SomeUser/status/12345?s=20", "https://twitter.com/someuser/status/12345"),
+    ("https://mobile.twitter.com/someuser/statuses/12345/", "https://twitter.com/someuser/status/12345"),
+    # Anything else: host case, fragment, trailing slash and tracking params dropped, query sorted
+    ("HTTPS://Example.COM/a/b/?utm_source=x&b=2&a=1#section", "https://example.com/a/b?a=1&b=2"),
+    ("http://example.com:8080/?fbclid=1", "http://example.com:8080/"),
+    ("  example.com  ", "https://example.com/"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def test_canonical_form_is_stable():
+    url = "https://Example.com/path/?q=1&utm_medium=social"
+    assert canonicalize_url(canonicalize_url(url)) == canonicalize_url(url)
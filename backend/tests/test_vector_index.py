@@ -0,0 +1,26 @@
+import numpy as np
+
+from app.services.vector_index import VectorIndex
+
+
+def _unit(n: int, dim: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_rewrite_by_another_process_is_picked_up(tmp_path):
+    # Two instances over one directory stand in for two worker processes
+    reader = VectorIndex(str(tmp_path), dim=16, ivf_min_rows=10, nprobe=2)
+    writer = VectorIndex(str(tmp_path), dim=16, ivf_min_rows=10, nprobe=2)
+
+    writer.user("u").rewrite(list(range(100)), _unit(100, 16, 0))
+    query = _unit(1, 16, 1)[0]
+    assert reader.search("u", query, k=5)          # maps the files and trains the IVF
+
+    # Compaction elsewhere: fewer rows than the reader's IVF covers
+    writer.user("u").rewrite(list(range(1000, 1040)), _unit(40, 16, 2))
+    assert all(content_id >= 1000 for content_id, _ in reader.search("u", query, k=5))
+
+    # Same row count, different rows — the file size alone does not change
+    writer.user("u").rewrite(list(range(2000, 2040)), _unit(40, 16, 3))
+    assert all(content_id >= 2000 for content_id, _ in reader.search("u", query, k=5))
@@ -0,0 +1,24 @@
+from app.api.whatsapp import process_link, recategorized_tags
+from app.models.content import Content
+from app.models.database import session_scope
+from app.services.content_service import ContentService
+
+
+def test_recategorized_tags_swap_the_category_tag():
+    assert recategorized_tags(["coding", "python", "travel"], "coding", "travel") == ["travel", "python"]
+    assert recategorized_tags(None, "coding", "food") == ["food"]
+
+
+def test_hashtag_on_an_existing_save_moves_it_and_its_tag(db, run, make_content):
+    url   = "https://example.com/trip-report"
+    saved = ContentService(db).create_content(make_content(url, category="coding", tags=["coding", "notes"]))
+
+    async def resend():
+        async with session_scope() as session:
+            return await process_link(url, saved.user_phone, session, category_override="travel")
+
+    assert "moved to *Travel*" in run(resend())
+    db.expire_all()
+    row = db.get(Content, saved.id)
+    assert (row.category, row.category_source) == ("travel", "hashtag")
+    assert row.tags == ["travel", "notes"]
@@ -0,0 +1,59 @@
+import asyncio
+
+from sqlalchemy.exc import IntegrityError
+
+from app.models.content import Content
+from app.services.content_service import ContentService, DuplicateContent
+from app.services.write_queue import WriteQueue
+
+
+async def _save_all(queue: WriteQueue, contents):
+    await queue.start()
+    try:
+        return await asyncio.gather(*(queue.create(c) for c in contents), return_exceptions=True)
+    finally:
+        await queue.stop()
+
+
+def test_concurrent_saves_share_one_batch(db, run, make_content):
+    queue   = WriteQueue(flush_ms=50)
+    results = run(_save_all(queue, [make_content(f"https://example.com/post/{n}") for n in range(5)]))
+
+    assert all(isinstance(row, Content) for row in results)
+    assert len({row.id for row in results}) == 5
+    assert (queue.batches, queue.rows) == (1, 5)
+    assert db.query(Content).count() == 5
+
+
+def test_repeats_within_a_batch_are_duplicates_of_the_first(db, run, make_content):
+    ContentService(db).create_content(make_content("https://example.com/old"))
+    queue   = WriteQueue(flush_ms=50)
+    first, repeat, old = run(_save_all(queue, [
+        make_content("https://example.com/new"),
+        make_content("https://EXAMPLE.com/new/?utm_source=share"),
+        make_content("https://example.com/old#top"),
+    ]))
+
+    assert isinstance(first, Content)
+    assert isinstance(repeat, DuplicateContent) and repeat.existing.id == first.id
+    assert isinstance(old, DuplicateContent) and old.existing.url == "https://example.com/old"
+    assert queue.rows == 1
+    assert db.query(Content).count() == 2
+
+
+def test_failed_batch_falls_back_to_one_insert_per_row(db, run, make_content, monkeypatch):
+    def collide(self, contents):
+        raise IntegrityError("INSERT INTO contents", {}, Exception("UNIQUE constraint failed"))
+    monkeypatch.setattr(ContentService, "create_contents", collide)
+
+    queue = WriteQueue(flush_ms=50)
+    saved, repeat, other = run(_save_all(queue, [
+        make_content("https://example.com/a"),
+        make_content("https://example.com/a?fbclid=xyz"),
+        make_content("https://example.com/b"),
+    ]))
+
+    assert queue.batches == 0
+    assert isinstance(saved, Content) and isinstance(other, Content)
+    assert isinstance(repeat, DuplicateContent) and repeat.existing.id == saved.id
+    assert sorted(url for (url,) in db.query(Content.url)) == ["https://example.com/a", "https://example.com/b"]
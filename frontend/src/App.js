@@ -418,6 +418,7 @@ export default function App() {
   const [activeCat, setActiveCat]     = useState('all');
   const [searchInput, setSearchInput] = useState('');
   const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState([]);
   const [showInspo, setShowInspo]     = useState(false);   // ← NEW
   const userPhone = '+918088655740';
 
@@ -435,11 +436,43 @@ export default function App() {
   },[]);
 
   useEffect(()=>{ loadAll(); },[loadAll]);
-  useEffect(()=>{ const t=setInterval(loadAll,15000); return()=>clearInterval(t); },[loadAll]);
+  // Live updates: push over SSE, poll only when EventSource is unavailable
+  useEffect(()=>{
+    if(typeof EventSource==='undefined'){
+      const t=setInterval(loadAll,15000); return()=>clearInterval(t);
+    }
+    const es=new EventSource(contentApi.eventsUrl(userPhone));
+    const on=(type,fn)=>es.addEventListener(type,e=>fn(JSON.parse(e.data||'{}')));
+    on('content-created',({content})=>setContents(cs=>[content,...cs.filter(c=>c.id!==content.id)]));
+    on('content-updated',({content})=>setContents(cs=>cs.map(c=>c.id===content.id?content:c)));
+    on('content-deleted',({id})=>setContents(cs=>cs.filter(c=>c.id!==id)));
+    on('stats-changed',({stats})=>setStats(stats));
+    on('resync',()=>loadAll());
+    // The browser reconnects on its own; reload to catch anything missed while away
+    let dropped=false;
+    es.onerror=()=>{ dropped=true; };
+    es.onopen=()=>{ if(dropped){ dropped=false; loadAll(); } };
+    return()=>es.close();
+  },[loadAll]);
+
+  // Search runs on the server (full-text over title, description, AI summary and category):
+  // list pages only carry card fields, and only the first page is loaded here
+  useEffect(()=>{
+    if(!searchQuery){ setSearchResults([]); return; }
+    let live=true;
+    contentApi.searchContents(userPhone, searchQuery)
+      .then(r=>{ if(live) setSearchResults(r.contents||[]); })
+      .catch(e=>console.error(e));
+    return()=>{ live=false; };
+  },[searchQuery]);
 
   const del = async id => {
     if(!window.confirm('Delete?')) return;
-    try{ await contentApi.deleteContent(id); loadAll(); }catch(e){}
+    try{
+      await contentApi.deleteContent(id);
+      setContents(cs=>cs.filter(c=>c.id!==id));
+      setSearchResults(cs=>cs.filter(c=>c.id!==id));
+    }catch(e){}
   };
 
   // Derived
@@ -448,12 +481,7 @@ export default function App() {
     if(view==='category' && activeCat && activeCat!=='all')
       items = items.filter(c=>c.category===activeCat);
     if(view==='search' && searchQuery)
-      items = items.filter(c=>
-        c.title?.toLowerCase().includes(searchQuery.toLowerCase())||
-        c.description?.toLowerCase().includes(searchQuery.toLowerCase())||
-        c.ai_summary?.toLowerCase().includes(searchQuery.toLowerCase())||
-        c.tags?.some(t=>t.toLowerCase().includes(searchQuery.toLowerCase()))
-      );
+      items = [...searchResults];
     return items;
   })();
 
@@ -53,7 +53,11 @@ export const contentApi = {
       params: { user_phone: userPhone, category, ...params }
     });
     return response.data;
-  }
+  },
+
+  // Server-Sent Events stream of this user's saves/edits/deletes and stats
+  eventsUrl: (userPhone) =>
+    `${API_BASE_URL}/api/events/?user_phone=${encodeURIComponent(userPhone)}`
 };
 
 export const whatsappApi = {